@@ -0,0 +1,108 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("picture", sa.String(), nullable=True),
+        sa.Column("google_id", sa.String(), nullable=True),
+        sa.Column("tokens", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_users_email"), "users", ["email"], unique=True)
+    op.create_index(op.f("ix_users_id"), "users", ["id"], unique=False)
+    op.create_table(
+        "channels",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("custom_url", sa.String(), nullable=True),
+        sa.Column("uploads_playlist_id", sa.String(), nullable=True),
+        sa.Column("published_at", sa.String(), nullable=True),
+        sa.Column("view_count", sa.BigInteger(), nullable=False),
+        sa.Column("subscriber_count", sa.BigInteger(), nullable=False),
+        sa.Column("video_count", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_channels_user_id"), "channels", ["user_id"], unique=False)
+    op.create_table(
+        "daily_metrics",
+        sa.Column("channel_id", sa.String(), nullable=False),
+        sa.Column("video_id", sa.String(), nullable=False),
+        sa.Column("dimension", sa.String(), nullable=False),
+        sa.Column("dimension_value", sa.String(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("views", sa.BigInteger(), nullable=False),
+        sa.Column("estimated_minutes_watched", sa.BigInteger(), nullable=False),
+        sa.Column("estimated_revenue", sa.Float(), nullable=False),
+        sa.Column("estimated_ad_revenue", sa.Float(), nullable=False),
+        sa.Column("likes", sa.BigInteger(), nullable=False),
+        sa.Column("comments", sa.BigInteger(), nullable=False),
+        sa.Column("shares", sa.BigInteger(), nullable=False),
+        sa.Column("subscribers_gained", sa.BigInteger(), nullable=False),
+        sa.Column("subscribers_lost", sa.BigInteger(), nullable=False),
+        sa.Column("cpm", sa.Float(), nullable=False),
+        sa.Column("playback_based_cpm", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint(
+            "channel_id", "video_id", "dimension", "dimension_value", "day"
+        ),
+    )
+    op.create_index(
+        "ix_daily_metrics_channel_day",
+        "daily_metrics",
+        ["channel_id", "day"],
+        unique=False,
+    )
+    op.create_table(
+        "videos",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("channel_id", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("published_at", sa.String(), nullable=True),
+        sa.Column("duration_seconds", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.String(), nullable=True),
+        sa.Column("view_count", sa.BigInteger(), nullable=False),
+        sa.Column("like_count", sa.BigInteger(), nullable=False),
+        sa.Column("comment_count", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_videos_channel_id"), "videos", ["channel_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_videos_channel_id"), table_name="videos")
+    op.drop_table("videos")
+    op.drop_index("ix_daily_metrics_channel_day", table_name="daily_metrics")
+    op.drop_table("daily_metrics")
+    op.drop_index(op.f("ix_channels_user_id"), table_name="channels")
+    op.drop_table("channels")
+    op.drop_index(op.f("ix_users_id"), table_name="users")
+    op.drop_index(op.f("ix_users_email"), table_name="users")
+    op.drop_table("users")
@@ -0,0 +1,82 @@
+"""metric rollups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SUMS = """
+    sum(views), sum(estimated_minutes_watched), sum(estimated_revenue),
+    sum(estimated_ad_revenue), sum(likes), sum(comments), sum(shares),
+    sum(subscribers_gained), sum(subscribers_lost)
+"""
+COLUMNS = """
+    channel_id, video_id, grain, period_start, days, views,
+    estimated_minutes_watched, estimated_revenue, estimated_ad_revenue, likes,
+    comments, shares, subscribers_gained, subscribers_lost, cpm_views,
+    playback_based_cpm_views
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "metric_rollups",
+        sa.Column("channel_id", sa.String(), nullable=False),
+        sa.Column("video_id", sa.String(), nullable=False),
+        sa.Column("grain", sa.String(), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("days", sa.Integer(), nullable=False),
+        sa.Column("views", sa.BigInteger(), nullable=False),
+        sa.Column("estimated_minutes_watched", sa.BigInteger(), nullable=False),
+        sa.Column("estimated_revenue", sa.Float(), nullable=False),
+        sa.Column("estimated_ad_revenue", sa.Float(), nullable=False),
+        sa.Column("likes", sa.BigInteger(), nullable=False),
+        sa.Column("comments", sa.BigInteger(), nullable=False),
+        sa.Column("shares", sa.BigInteger(), nullable=False),
+        sa.Column("subscribers_gained", sa.BigInteger(), nullable=False),
+        sa.Column("subscribers_lost", sa.BigInteger(), nullable=False),
+        sa.Column("cpm_views", sa.Float(), nullable=False),
+        sa.Column("playback_based_cpm_views", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("channel_id", "video_id", "grain", "period_start"),
+    )
+
+    # Backfill from the history synced so far: weeks and months from the
+    # daily rows, years from the months
+    for grain in ("week", "month"):
+        op.execute(
+            f"""
+            INSERT INTO metric_rollups ({COLUMNS})
+            SELECT channel_id, video_id, '{grain}',
+                   date_trunc('{grain}', day)::date, count(*), {SUMS},
+                   sum(cpm * views), sum(playback_based_cpm * views)
+            FROM daily_metrics
+            WHERE dimension = ''
+            GROUP BY channel_id, video_id, date_trunc('{grain}', day)
+            """
+        )
+    op.execute(
+        f"""
+        INSERT INTO metric_rollups ({COLUMNS})
+        SELECT channel_id, video_id, 'year',
+               date_trunc('year', period_start)::date, sum(days), {SUMS},
+               sum(cpm_views), sum(playback_based_cpm_views)
+        FROM metric_rollups
+        WHERE grain = 'month'
+        GROUP BY channel_id, video_id, date_trunc('year', period_start)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("metric_rollups")
@@ -0,0 +1,64 @@
+"""channel managers
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "channel_managers",
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("channel_id", sa.String(), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["channel_id"], ["channels.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "channel_id"),
+    )
+    op.create_index(
+        op.f("ix_channel_managers_channel_id"),
+        "channel_managers",
+        ["channel_id"],
+        unique=False,
+    )
+    op.execute(
+        "INSERT INTO channel_managers (user_id, channel_id, synced_at) "
+        "SELECT user_id, id, updated_at FROM channels"
+    )
+    op.drop_index(op.f("ix_channels_user_id"), table_name="channels")
+    op.drop_column("channels", "user_id")
+
+
+def downgrade() -> None:
+    op.add_column("channels", sa.Column("user_id", sa.String(), nullable=True))
+    # A channel goes back to the manager who synced it last
+    op.execute(
+        "UPDATE channels SET user_id = ("
+        "SELECT user_id FROM channel_managers "
+        "WHERE channel_managers.channel_id = channels.id "
+        "ORDER BY synced_at DESC LIMIT 1)"
+    )
+    op.execute("DELETE FROM channels WHERE user_id IS NULL")
+    op.alter_column("channels", "user_id", nullable=False)
+    op.create_foreign_key(
+        "channels_user_id_fkey",
+        "channels",
+        "users",
+        ["user_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(op.f("ix_channels_user_id"), "channels", ["user_id"], unique=False)
+    op.drop_index(op.f("ix_channel_managers_channel_id"), table_name="channel_managers")
+    op.drop_table("channel_managers")
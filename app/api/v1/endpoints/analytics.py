@@ -1,775 +1,290 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Optional, Dict, List
-from app.dependencies import get_current_user
-from app.services.auth_service import auth_service
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional, Dict, Tuple
+from app.core.responses import (
+    dumps,
+    etag,
+    is_not_modified,
+    json_response,
+    not_modified_response,
+    version_headers,
+)
+from app.dependencies import CurrentUser, get_current_user, get_http_client
+from app.services.analytics_service import (
+    DASHBOARD_SECTIONS,
+    EMPTY_REPORT,
+    analytics_service,
+    dashboard_etag,
+)
+from app.services.growth_service import (
+    CHANNEL_METRICS,
+    REVENUE_METRICS,
+    growth_service,
+)
+from app.services.request_scheduler import gather_dict
 import httpx
-from datetime import datetime, timedelta
-import json
+from datetime import date, datetime, timedelta
 
-from app.utils.user_storage import user_storage
+from app.utils.fields import FieldTree, parse_fields, parse_names, prune, selects
+from app.utils.series import MAX_PERIOD_DAYS, grain_for, last_days
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
-YOUTUBE_DATA_URL = "https://www.googleapis.com/youtube/v3/channels"
-YOUTUBE_ANALYTICS_URL = "https://youtubeanalytics.googleapis.com/v2/reports"
+router = APIRouter()
 
+REVENUE_BREAKDOWN_SECTIONS = ("trafficSources", "geography", "devices")
 
-def calculate_estimated_revenue(
-    views: int, watch_time_minutes: int, region: str = "US"
-) -> Dict:
-    """
-    Calculate estimated revenue based on views and watch time
-    These are rough estimates based on industry averages
-    """
-    # RPM (Revenue Per Mille) varies by region and content type
-    rpm_rates = {
-        "US": {"min": 1.0, "max": 5.0, "avg": 2.5},
-        "UK": {"min": 0.8, "max": 4.0, "avg": 2.0},
-        "CA": {"min": 0.7, "max": 3.5, "avg": 1.8},
-        "global": {"min": 0.3, "max": 2.0, "avg": 1.0},
-    }
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated dotted paths to return, "
+    "e.g. channelData,detailed_videos.id,detailed_videos.trendData",
+)
+INCLUDE_QUERY = Query(None, description="Comma-separated top-level sections to return")
 
-    rpm = rpm_rates.get(region, rpm_rates["global"])
 
-    # Calculate estimated revenue
-    estimated_revenue = {
-        "ad_revenue": {
-            "min": (views / 1000) * rpm["min"],
-            "max": (views / 1000) * rpm["max"],
-            "estimated": (views / 1000) * rpm["avg"],
-        },
-        "cpm": rpm["avg"],
-        "total_monetizable_views": int(views * 0.6),  # Assuming 60% monetization rate
-        "engagement_multiplier": (
-            min(2.0, watch_time_minutes / (views * 3)) if views > 0 else 1.0
-        ),
-    }
+def _fieldset(
+    fields: Optional[str], include: Optional[str], sections: Tuple[str, ...]
+) -> Optional[FieldTree]:
+    """Merge ?fields= paths and ?include= sections into one field tree"""
+    try:
+        names = parse_names(include, sections)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"include: {e}")
+    return parse_fields(",".join(filter(None, [fields, *sorted(names or ())])))
 
-    return estimated_revenue
 
+@router.get("/dashboard")
+async def get_dashboard_analytics(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    current_user: CurrentUser = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    fieldset = _fieldset(fields, include, DASHBOARD_SECTIONS)
+
+    # A poll that already has the cached version is answered before any build
+    version = await analytics_service.get_dashboard_version(
+        current_user["id"], fieldset
+    )
+    if version is not None and is_not_modified(request.headers, version):
+        return not_modified_response(version)
 
-def calculate_growth_metrics(current_data: Dict, previous_data: Dict) -> Dict:
-    """Calculate growth percentages and trends"""
-    growth = {}
+    try:
+        access_token = await current_user.get_access_token()
 
-    metrics = ["views", "estimatedMinutesWatched", "subscribersGained", "likes"]
+        response = await analytics_service.get_cached_dashboard(
+            client, current_user, access_token, fieldset
+        )
 
-    for metric in metrics:
-        current_value = current_data.get(metric, 0)
-        previous_value = previous_data.get(metric, 0)
+        if version is None:
+            version = {"etag": dashboard_etag(response), "lastModified": None}
+        if is_not_modified(request.headers, version):
+            return not_modified_response(version)
+        return json_response(response, headers=version_headers(version))
+    except Exception as e:
+        logger.exception("Dashboard failed for user %s", current_user["id"])
+        return json_response(
+            {
+                "message": "Error fetching analytics data",
+                "error": str(e),
+            }
+        )
 
-        if previous_value > 0:
-            growth[metric] = ((current_value - previous_value) / previous_value) * 100
-        else:
-            growth[metric] = 0
 
-    return growth
+async def _encode_events(
+    first: Tuple[str, Dict], events: AsyncIterator[Tuple[str, Dict]], sse: bool
+) -> AsyncIterator[bytes]:
+    """Serialize dashboard events as NDJSON lines or Server-Sent Events"""
 
+    def encode(event: str, data: Dict) -> bytes:
+        if sse:
+            return b"event: %s\ndata: %s\n\n" % (event.encode(), dumps(data))
+        return dumps({"event": event, "data": data}) + b"\n"
 
-@router.get("/dashboard")
-async def get_dashboard_analytics(current_user: Dict = Depends(get_current_user)):
+    yield encode(*first)
     try:
-        user_tokens = user_storage.get_user_tokens(current_user["id"])
-        if not user_tokens:
-            raise HTTPException(status_code=401, detail="Google tokens not found")
-
-        access_token = user_tokens.get("access_token")
-        if not access_token:
-            raise HTTPException(status_code=401, detail="Google access token missing")
-
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        async with httpx.AsyncClient() as client:
-            # Get Channel Info
-            channel_response = await client.get(
-                "https://www.googleapis.com/youtube/v3/channels",
-                headers=headers,
-                params={
-                    "part": "snippet,statistics,brandingSettings,contentDetails",
-                    "mine": "true",
-                },
-            )
-
-            if channel_response.status_code != 200:
-                raise HTTPException(
-                    status_code=500, detail="Failed to fetch channel info"
-                )
-
-            channel_data = channel_response.json()
-            print(channel_data)
-            channel = channel_data["items"][0]
-            channel_id = channel["id"]
-
-            # Get date ranges
-            today = datetime.utcnow().date()
-            last_30 = today - timedelta(days=30)
-            last_60 = today - timedelta(days=60)
-            last_90 = today - timedelta(days=90)
-
-            # Get current period analytics (last 30 days)
-            current_analytics_response = await client.get(
-                "https://youtubeanalytics.googleapis.com/v2/reports",
-                headers=headers,
-                params={
-                    "ids": "channel==MINE",
-                    "startDate": str(last_30),
-                    "endDate": str(today),
-                    "metrics": "views,estimatedMinutesWatched,averageViewDuration,likes,subscribersGained,subscribersLost,estimatedRevenue,estimatedAdRevenue,cpm,playbackBasedCpm",
-                },
-            )
-
-            # Get previous period analytics (30-60 days ago)
-            previous_analytics_response = await client.get(
-                "https://youtubeanalytics.googleapis.com/v2/reports",
-                headers=headers,
-                params={
-                    "ids": "channel==MINE",
-                    "startDate": str(last_60),
-                    "endDate": str(last_30),
-                    "metrics": "views,estimatedMinutesWatched,averageViewDuration,likes,subscribersGained,subscribersLost,estimatedRevenue,estimatedAdRevenue,cpm,playbackBasedCpm",
-                },
-            )
-
-            # Get 90-day trend data
-            trend_analytics_response = await client.get(
-                "https://youtubeanalytics.googleapis.com/v2/reports",
-                headers=headers,
-                params={
-                    "ids": "channel==MINE",
-                    "startDate": str(last_90),
-                    "endDate": str(today),
-                    "metrics": "views,estimatedMinutesWatched,estimatedRevenue,subscribersGained",
-                    "dimensions": "day",
-                },
-            )
-
-            # Get top performing videos
-            top_videos_response = await client.get(
-                "https://youtubeanalytics.googleapis.com/v2/reports",
-                headers=headers,
-                params={
-                    "ids": "channel==MINE",
-                    "startDate": str(last_30),
-                    "endDate": str(today),
-                    "metrics": "views,estimatedMinutesWatched,estimatedRevenue,likes,comments",
-                    "dimensions": "video",
-                    "sort": "-views",
-                    "maxResults": 10,
-                },
-            )
-
-            # Get Playlists
-            playlists_response = await client.get(
-                "https://www.googleapis.com/youtube/v3/playlists",
-                headers=headers,
-                params={
-                    "part": "snippet,contentDetails",
-                    "channelId": channel_id,
-                    "maxResults": 50,
-                },
-            )
-
-            # Get Videos from Uploads Playlist
-            uploads_playlist_id = channel["contentDetails"]["relatedPlaylists"][
-                "uploads"
-            ]
-            videos_response = await client.get(
-                "https://www.googleapis.com/youtube/v3/playlistItems",
-                headers=headers,
-                params={
-                    "part": "snippet,contentDetails",
-                    "playlistId": uploads_playlist_id,
-                    "maxResults": 50,
-                },
-            )
-
-            # Process analytics data
-            current_analytics = (
-                current_analytics_response.json()
-                if current_analytics_response.status_code == 200
-                else {"rows": []}
-            )
-            previous_analytics = (
-                previous_analytics_response.json()
-                if previous_analytics_response.status_code == 200
-                else {"rows": []}
-            )
-            trend_analytics = (
-                trend_analytics_response.json()
-                if trend_analytics_response.status_code == 200
-                else {"rows": []}
-            )
-            top_videos = (
-                top_videos_response.json()
-                if top_videos_response.status_code == 200
-                else {"rows": []}
-            )
-
-            # Extract current period data
-            current_data = {}
-            if current_analytics.get("rows"):
-                row = current_analytics["rows"][0]
-                current_data = {
-                    "views": row[0] if len(row) > 0 else 0,
-                    "estimatedMinutesWatched": row[1] if len(row) > 1 else 0,
-                    "averageViewDuration": row[2] if len(row) > 2 else 0,
-                    "likes": row[3] if len(row) > 3 else 0,
-                    "subscribersGained": row[4] if len(row) > 4 else 0,
-                    "subscribersLost": row[5] if len(row) > 5 else 0,
-                    "estimatedRevenue": row[6] if len(row) > 6 else 0,
-                    "estimatedAdRevenue": row[7] if len(row) > 7 else 0,
-                    "cpm": row[8] if len(row) > 8 else 0,
-                    "playbackBasedCpm": row[9] if len(row) > 9 else 0,
-                }
-
-            # Extract previous period data
-            previous_data = {}
-            if previous_analytics.get("rows"):
-                row = previous_analytics["rows"][0]
-                previous_data = {
-                    "views": row[0] if len(row) > 0 else 0,
-                    "estimatedMinutesWatched": row[1] if len(row) > 1 else 0,
-                    "estimatedRevenue": row[6] if len(row) > 6 else 0,
-                    "subscribersGained": row[4] if len(row) > 4 else 0,
-                }
-
-            # Calculate growth metrics
-            growth_metrics = calculate_growth_metrics(current_data, previous_data)
-
-            # Calculate estimated revenue if YouTube Analytics doesn't provide it
-            if current_data.get("estimatedRevenue", 0) == 0:
-                estimated_revenue = calculate_estimated_revenue(
-                    current_data.get("views", 0),
-                    current_data.get("estimatedMinutesWatched", 0),
-                )
-                current_data["estimatedRevenue"] = estimated_revenue["ad_revenue"][
-                    "estimated"
-                ]
-                current_data["cpm"] = estimated_revenue["cpm"]
-
-            # Process trend data for charts
-            trend_data = []
-            if trend_analytics.get("rows"):
-                for row in trend_analytics["rows"]:
-                    trend_data.append(
-                        {
-                            "date": row[0],
-                            "views": row[1],
-                            "watchTime": row[2],
-                            "revenue": row[3] if len(row) > 3 else 0,
-                            "subscribers": row[4] if len(row) > 4 else 0,
-                        }
-                    )
-
-            # Process top videos
-            top_performing_videos = []
-            if top_videos.get("rows"):
-                for row in top_videos["rows"]:
-                    top_performing_videos.append(
-                        {
-                            "videoId": row[0],
-                            "views": row[1],
-                            "watchTime": row[2],
-                            "revenue": row[3] if len(row) > 3 else 0,
-                            "likes": row[4] if len(row) > 4 else 0,
-                            "comments": row[5] if len(row) > 5 else 0,
-                        }
-                    )
-
-            # Calculate additional metrics
-            watch_time_hours = current_data.get("estimatedMinutesWatched", 0) / 60
-            rpm = (
-                (
-                    current_data.get("estimatedRevenue", 0)
-                    / (current_data.get("views", 1) / 1000)
-                )
-                if current_data.get("views", 0) > 0
-                else 0
-            )
-
-            # Calculate projected monthly revenue
-            daily_revenue = current_data.get("estimatedRevenue", 0) / 30
-            projected_monthly = daily_revenue * 30
-            projected_yearly = projected_monthly * 12
-
-            uploads_playlist_id = channel["contentDetails"]["relatedPlaylists"][
-                "uploads"
-            ]
-
-            # Step 1: Get video IDs from uploads playlist
-            videos_response = await client.get(
-                "https://www.googleapis.com/youtube/v3/playlistItems",
-                headers=headers,
-                params={
-                    "part": "snippet,contentDetails",
-                    "playlistId": uploads_playlist_id,
-                    "maxResults": 50,  # Can be increased up to 50
-                },
-            )
-
-            video_items = videos_response.json().get("items", [])
-            video_ids = [item["contentDetails"]["videoId"] for item in video_items]
-
-            # Step 2: Get detailed video statistics for all videos
-            detailed_videos = []
-            if video_ids:
-                # Batch request for video statistics (up to 50 IDs per request)
-                video_stats_response = await client.get(
-                    "https://www.googleapis.com/youtube/v3/videos",
-                    headers=headers,
-                    params={
-                        "part": "snippet,statistics,contentDetails,status,topicDetails,localizations",
-                        "id": ",".join(video_ids),
-                    },
-                )
-
-                video_stats = video_stats_response.json().get("items", [])
-
-                # Step 3: Get individual video analytics from YouTube Analytics API
-                for video_stat in video_stats:
-                    video_id = video_stat["id"]
-
-                    # Get analytics for this specific video (last 30 days)
-                    video_analytics_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "views,estimatedMinutesWatched,averageViewDuration,likes,dislikes,comments,shares,estimatedRevenue,estimatedAdRevenue,cpm,impressions,impressionClickThroughRate,averageViewPercentage,subscribersGained,subscribersLost,annotationClickThroughRate,annotationCloseRate,cardClickRate,cardTeaserClickRate,cardImpressions,cardTeaserImpressions,endScreenElementClickRate,endScreenElementImpressions",
-                            "filters": f"video=={video_id}",
-                        },
-                    )
-
-                    # Get video performance over time (daily breakdown)
-                    video_trend_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "views,estimatedMinutesWatched,estimatedRevenue",
-                            "dimensions": "day",
-                            "filters": f"video=={video_id}",
-                        },
-                    )
-
-                    # Get traffic sources for this video
-                    traffic_sources_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "views,estimatedMinutesWatched",
-                            "dimensions": "insightTrafficSourceType",
-                            "filters": f"video=={video_id}",
-                            "sort": "-views",
-                        },
-                    )
-
-                    # Get audience retention data
-                    retention_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "audienceWatchRatio,relativeRetentionPerformance",
-                            "dimensions": "elapsedVideoTimeRatio",
-                            "filters": f"video=={video_id}",
-                        },
-                    )
-
-                    # Get demographics data
-                    demographics_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "views,estimatedMinutesWatched",
-                            "dimensions": "ageGroup,gender",
-                            "filters": f"video=={video_id}",
-                        },
-                    )
-
-                    # Get geography data
-                    geography_response = await client.get(
-                        "https://youtubeanalytics.googleapis.com/v2/reports",
-                        headers=headers,
-                        params={
-                            "ids": "channel==MINE",
-                            "startDate": str(last_30),
-                            "endDate": str(today),
-                            "metrics": "views,estimatedMinutesWatched,estimatedRevenue",
-                            "dimensions": "country",
-                            "filters": f"video=={video_id}",
-                            "sort": "-views",
-                            "maxResults": 10,
-                        },
-                    )
-
-                    # Parse analytics data
-                    analytics_data = {}
-                    if video_analytics_response.status_code == 200:
-                        analytics_json = video_analytics_response.json()
-                        if analytics_json.get("rows"):
-                            row = analytics_json["rows"][0]
-                            analytics_data = {
-                                "views_30d": row[0] if len(row) > 0 else 0,
-                                "watchTime_30d": row[1] if len(row) > 1 else 0,
-                                "averageViewDuration_30d": (
-                                    row[2] if len(row) > 2 else 0
-                                ),
-                                "likes_30d": row[3] if len(row) > 3 else 0,
-                                "dislikes_30d": row[4] if len(row) > 4 else 0,
-                                "comments_30d": row[5] if len(row) > 5 else 0,
-                                "shares_30d": row[6] if len(row) > 6 else 0,
-                                "revenue_30d": row[7] if len(row) > 7 else 0,
-                                "adRevenue_30d": row[8] if len(row) > 8 else 0,
-                                "cpm_30d": row[9] if len(row) > 9 else 0,
-                                "impressions_30d": row[10] if len(row) > 10 else 0,
-                                "clickThroughRate_30d": row[11] if len(row) > 11 else 0,
-                                "viewPercentage_30d": row[12] if len(row) > 12 else 0,
-                                "subscribersGained_30d": (
-                                    row[13] if len(row) > 13 else 0
-                                ),
-                                "subscribersLost_30d": row[14] if len(row) > 14 else 0,
-                            }
-
-                    # Parse trend data
-                    trend_data = []
-                    if video_trend_response.status_code == 200:
-                        trend_json = video_trend_response.json()
-                        if trend_json.get("rows"):
-                            for row in trend_json["rows"]:
-                                trend_data.append(
-                                    {
-                                        "date": row[0],
-                                        "views": row[1],
-                                        "watchTime": row[2],
-                                        "revenue": row[3] if len(row) > 3 else 0,
-                                    }
-                                )
-
-                    # Parse traffic sources
-                    traffic_sources = []
-                    if traffic_sources_response.status_code == 200:
-                        traffic_json = traffic_sources_response.json()
-                        if traffic_json.get("rows"):
-                            for row in traffic_json["rows"]:
-                                traffic_sources.append(
-                                    {
-                                        "source": row[0],
-                                        "views": row[1],
-                                        "watchTime": row[2],
-                                    }
-                                )
-
-                    # Parse retention data
-                    retention_data = []
-                    if retention_response.status_code == 200:
-                        retention_json = retention_response.json()
-                        if retention_json.get("rows"):
-                            for row in retention_json["rows"]:
-                                retention_data.append(
-                                    {
-                                        "timeRatio": row[0],
-                                        "audienceWatchRatio": row[1],
-                                        "relativeRetention": (
-                                            row[2] if len(row) > 2 else 0
-                                        ),
-                                    }
-                                )
-
-                    # Parse demographics
-                    demographics = []
-                    if demographics_response.status_code == 200:
-                        demo_json = demographics_response.json()
-                        if demo_json.get("rows"):
-                            for row in demo_json["rows"]:
-                                demographics.append(
-                                    {
-                                        "ageGroup": row[0],
-                                        "gender": row[1],
-                                        "views": row[2],
-                                        "watchTime": row[3],
-                                    }
-                                )
-
-                    # Parse geography
-                    geography = []
-                    if geography_response.status_code == 200:
-                        geo_json = geography_response.json()
-                        if geo_json.get("rows"):
-                            for row in geo_json["rows"]:
-                                geography.append(
-                                    {
-                                        "country": row[0],
-                                        "views": row[1],
-                                        "watchTime": row[2],
-                                        "revenue": row[3] if len(row) > 3 else 0,
-                                    }
-                                )
-
-                    # Convert duration from ISO 8601 to seconds
-                    def parse_duration(duration_str):
-                        import re
-
-                        match = re.match(
-                            r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", duration_str
-                        )
-                        if match:
-                            hours = int(match.group(1) or 0)
-                            minutes = int(match.group(2) or 0)
-                            seconds = int(match.group(3) or 0)
-                            return hours * 3600 + minutes * 60 + seconds
-                        return 0
-
-                    # Calculate additional metrics
-                    stats = video_stat.get("statistics", {})
-                    snippet = video_stat.get("snippet", {})
-                    content_details = video_stat.get("contentDetails", {})
-
-                    total_views = int(stats.get("viewCount", 0))
-                    total_likes = int(stats.get("likeCount", 0))
-                    total_comments = int(stats.get("commentCount", 0))
-                    duration_seconds = parse_duration(
-                        content_details.get("duration", "PT0S")
-                    )
-
-                    # Calculate engagement rate
-                    engagement_rate = (
-                        ((total_likes + total_comments) / total_views * 100)
-                        if total_views > 0
-                        else 0
-                    )
-
-                    # Calculate RPM
-                    rpm = (
-                        (
-                            analytics_data.get("revenue_30d", 0)
-                            / (analytics_data.get("views_30d", 1) / 1000)
-                        )
-                        if analytics_data.get("views_30d", 0) > 0
-                        else 0
-                    )
-
-                    detailed_video = {
-                        "id": video_id,
-                        "title": snippet.get("title", ""),
-                        "description": snippet.get("description", ""),
-                        "thumbnails": snippet.get("thumbnails", {}),
-                        "publishedAt": snippet.get("publishedAt", ""),
-                        "channelTitle": snippet.get("channelTitle", ""),
-                        "tags": snippet.get("tags", []),
-                        "categoryId": snippet.get("categoryId", ""),
-                        "defaultLanguage": snippet.get("defaultLanguage", ""),
-                        "duration": duration_seconds,
-                        "durationFormatted": content_details.get("duration", ""),
-                        "definition": content_details.get("definition", ""),
-                        "caption": content_details.get("caption", ""),
-                        "licensedContent": content_details.get(
-                            "licensedContent", False
-                        ),
-                        "projection": content_details.get("projection", ""),
-                        # Lifetime Statistics
-                        "statistics": {
-                            "viewCount": total_views,
-                            "likeCount": total_likes,
-                            "commentCount": total_comments,
-                            "favoriteCount": int(stats.get("favoriteCount", 0)),
-                            "engagementRate": round(engagement_rate, 2),
-                        },
-                        # 30-day Performance
-                        "analytics": analytics_data,
-                        "rpm": round(rpm, 2),
-                        "trendData": trend_data,
-                        "trafficSources": traffic_sources,
-                        "retentionData": retention_data,
-                        "demographics": demographics,
-                        "geography": geography,
-                        # Status and Metadata
-                        "status": video_stat.get("status", {}),
-                        "topicDetails": video_stat.get("topicDetails", {}),
-                        "localizations": video_stat.get("localizations", {}),
-                    }
-
-                    detailed_videos.append(detailed_video)
-
-            response = {
-                "message": "Complete Revenue & Analytics Dashboard",
-                "user": current_user["name"],
-                "channelData": {
-                    "id": channel_id,
-                    "title": channel["snippet"]["title"],
-                    "description": channel["snippet"]["description"],
-                    "thumbnails": channel["snippet"]["thumbnails"],
-                    "totalViews": int(channel["statistics"]["viewCount"]),
-                    "subscribers": int(channel["statistics"]["subscriberCount"]),
-                    "totalVideos": int(channel["statistics"]["videoCount"]),
-                    "watchTime": int(watch_time_hours),
-                    "customUrl": channel["snippet"].get("customUrl", ""),
-                    "publishedAt": channel["snippet"]["publishedAt"],
-                },
-                "analyticsData": {
-                    "views": current_data.get("views", 0),
-                    "estimatedMinutesWatched": current_data.get(
-                        "estimatedMinutesWatched", 0
-                    ),
-                    "averageViewDuration": current_data.get("averageViewDuration", 0),
-                    "likes": current_data.get("likes", 0),
-                    "subscribersGained": current_data.get("subscribersGained", 0),
-                    "subscribersLost": current_data.get("subscribersLost", 0),
-                    "netSubscribers": current_data.get("subscribersGained", 0)
-                    - current_data.get("subscribersLost", 0),
-                },
-                "revenueData": {
-                    "currentPeriod": {
-                        "estimatedRevenue": current_data.get("estimatedRevenue", 0),
-                        "estimatedAdRevenue": current_data.get("estimatedAdRevenue", 0),
-                        "cpm": current_data.get("cpm", 0),
-                        "playbackBasedCpm": current_data.get("playbackBasedCpm", 0),
-                        "rpm": rpm,
-                    },
-                    "projections": {
-                        "daily": daily_revenue,
-                        "monthly": projected_monthly,
-                        "yearly": projected_yearly,
-                    },
-                    "growth": {
-                        "revenueGrowth": growth_metrics.get("estimatedRevenue", 0),
-                        "viewsGrowth": growth_metrics.get("views", 0),
-                        "watchTimeGrowth": growth_metrics.get(
-                            "estimatedMinutesWatched", 0
-                        ),
-                        "subscribersGrowth": growth_metrics.get("subscribersGained", 0),
-                    },
-                },
-                "trendData": trend_data,
-                "topVideos": top_performing_videos,
-                "playlists": playlists_response.json().get("items", []),
-                "videos": videos_response.json().get("items", []),
-                "lastUpdated": datetime.utcnow().isoformat(),
-                "detailed_videos": detailed_videos,
-            }
+        async for event, data in events:
+            yield encode(event, data)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        yield encode(
+            "error", {"message": "Error fetching analytics data", "error": str(e)}
+        )
+    finally:
+        await events.aclose()
 
-            print(response)
 
-            return response
-    except Exception as e:
-        import traceback
+@router.get("/dashboard/stream")
+async def stream_dashboard_analytics(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$"),
+    current_user: CurrentUser = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    """Stream the dashboard: summary first, then each video as it's ready
 
-        traceback.print_exc()
-        return {
-            "message": "Error fetching analytics data",
-            "error": str(e),
-        }
+    Sent as Server-Sent Events for format=sse, or without a format when the
+    client accepts text/event-stream (EventSource does); NDJSON otherwise.
+    """
+    if format is None:
+        accept = request.headers.get("accept", "")
+        format = "sse" if "text/event-stream" in accept else "ndjson"
+    access_token = await current_user.get_access_token()
+    events = analytics_service.stream_dashboard(client, current_user, access_token)
+
+    # Wait for the summary so early failures still get a proper status code
+    first = await anext(events)
+
+    if format == "sse":
+        return StreamingResponse(
+            _encode_events(first, events, sse=True),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    return StreamingResponse(
+        _encode_events(first, events, sse=False), media_type="application/x-ndjson"
+    )
 
 
 @router.get("/revenue-breakdown")
-async def get_revenue_breakdown(current_user: Dict = Depends(get_current_user)):
+async def get_revenue_breakdown(
+    request: Request,
+    fields: Optional[str] = FIELDS_QUERY,
+    include: Optional[str] = INCLUDE_QUERY,
+    current_user: CurrentUser = Depends(get_current_user),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     """Get detailed revenue breakdown by traffic source, geography, etc."""
-    user_tokens = user_storage.get_user_tokens(current_user["id"])
-    if not user_tokens:
-        raise HTTPException(status_code=401, detail="Google tokens not found")
-
-    access_token = user_tokens.get("access_token")
+    fieldset = _fieldset(fields, include, REVENUE_BREAKDOWN_SECTIONS)
+    access_token = await current_user.get_access_token()
     headers = {"Authorization": f"Bearer {access_token}"}
 
     today = datetime.utcnow().date()
     last_30 = today - timedelta(days=30)
 
-    async with httpx.AsyncClient() as client:
-        # Revenue by traffic source
-        traffic_source_response = await client.get(
-            "https://youtubeanalytics.googleapis.com/v2/reports",
-            headers=headers,
-            params={
-                "ids": "channel==MINE",
-                "startDate": str(last_30),
-                "endDate": str(today),
-                "metrics": "estimatedRevenue,views",
-                "dimensions": "insightTrafficSourceType",
-                "sort": "-estimatedRevenue",
-            },
+    def report(dimensions: str, **extra):
+        params = {
+            "ids": "channel==MINE",
+            "startDate": str(last_30),
+            "endDate": str(today),
+            "metrics": "estimatedRevenue,views",
+            "dimensions": dimensions,
+            "sort": "-estimatedRevenue",
+            **extra,
+        }
+        return lambda: analytics_service.fetch_report(
+            client, current_user["id"], headers, params
         )
 
+    calls = {
+        # Revenue by traffic source
+        "trafficSources": report("insightTrafficSourceType"),
         # Revenue by geography
-        geography_response = await client.get(
-            "https://youtubeanalytics.googleapis.com/v2/reports",
-            headers=headers,
-            params={
-                "ids": "channel==MINE",
-                "startDate": str(last_30),
-                "endDate": str(today),
-                "metrics": "estimatedRevenue,views",
-                "dimensions": "country",
-                "sort": "-estimatedRevenue",
-                "maxResults": 10,
-            },
-        )
-
+        "geography": report("country", maxResults=10),
         # Revenue by device type
-        device_response = await client.get(
-            "https://youtubeanalytics.googleapis.com/v2/reports",
-            headers=headers,
-            params={
-                "ids": "channel==MINE",
-                "startDate": str(last_30),
-                "endDate": str(today),
-                "metrics": "estimatedRevenue,views",
-                "dimensions": "deviceType",
-                "sort": "-estimatedRevenue",
-            },
-        )
+        "devices": report("deviceType"),
+    }
+    results, _ = await gather_dict(
+        {name: call for name, call in calls.items() if selects(fieldset, name)}
+    )
+
+    breakdown = prune(
+        {
+            "trafficSources": results.get("trafficSources", EMPTY_REPORT),
+            "geography": results.get("geography", EMPTY_REPORT),
+            "devices": results.get("devices", EMPTY_REPORT),
+        },
+        fieldset,
+    )
+    version = {"etag": etag(breakdown), "lastModified": None}
+    if is_not_modified(request.headers, version):
+        return not_modified_response(version)
+    return json_response(breakdown, headers=version_headers(version))
 
-        print(
-            traffic_source_response.json(),
-            "traffic source-----------------------------------------",
-        )
-        print(
-            geography_response.json(),
-            "geography-----------------------------------------",
-        )
-        print(device_response.json(), "device-----------------------------------------")
-
-        return {
-            "trafficSources": (
-                traffic_source_response.json()
-                if traffic_source_response.status_code == 200
-                else {"rows": []}
-            ),
-            "geography": (
-                geography_response.json()
-                if geography_response.status_code == 200
-                else {"rows": []}
-            ),
-            "devices": (
-                device_response.json()
-                if device_response.status_code == 200
-                else {"rows": []}
-            ),
-        }
+
+GRANULARITY_QUERY = Query(
+    "auto",
+    pattern="^(auto|day|week|month|year)$",
+    description="Trend buckets; auto picks one that keeps the chart short",
+)
+
+
+def _grain(granularity: str, period: Tuple[date, date]) -> str:
+    return grain_for(period) if granularity == "auto" else granularity
 
 
 @router.get("/channel/{channel_id}")
-async def get_channel_analytics(channel_id: str):
-    """Get analytics for a specific channel"""
-    return {
-        "message": f"Channel analytics for {channel_id}",
-        "channel_id": channel_id,
-        "analytics": {},
-    }
+async def get_channel_analytics(
+    channel_id: str,
+    days: int = Query(365, ge=1, le=MAX_PERIOD_DAYS),
+    granularity: str = GRANULARITY_QUERY,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Get analytics for a specific channel
+
+    Stored channel statistics and its trend over the last `days` days,
+    read from the week/month/year rollups for long ranges.
+    """
+    period = last_days(days, datetime.utcnow().date())
+    analytics = await growth_service.channel_trend(
+        current_user["id"],
+        channel_id,
+        CHANNEL_METRICS,
+        period,
+        _grain(granularity, period),
+    )
+    return json_response(
+        {
+            "message": f"Channel analytics for {channel_id}",
+            "channel_id": channel_id,
+            "analytics": analytics,
+        }
+    )
 
 
 @router.get("/revenue")
-async def get_revenue_analytics(days: Optional[int] = 30):
-    """Get revenue analytics for specified period"""
-    return {"message": f"Revenue analytics for {days} days", "revenue_data": []}
+async def get_revenue_analytics(
+    days: int = Query(30, ge=1, le=MAX_PERIOD_DAYS),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    compare: str = Query("previous", pattern="^(previous|year)$"),
+    videos: bool = False,
+    granularity: str = GRANULARITY_QUERY,
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Get revenue analytics for specified period
+
+    The last `days` days up to end (default today), or start..end, against
+    the period before or the same dates a year earlier; served from the
+    synced daily series and rollups without calling the Analytics API.
+    """
+    end = end or datetime.utcnow().date()
+    try:
+        period = (start, end) if start else last_days(days, end)
+    except OverflowError:
+        raise HTTPException(status_code=422, detail="Period starts before 0001-01-01")
+    if period[0] > period[1]:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+    if (period[1] - period[0]).days >= MAX_PERIOD_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Period must not be longer than {MAX_PERIOD_DAYS} days",
+        )
+
+    growth = await growth_service.query(
+        current_user["id"],
+        REVENUE_METRICS,
+        period,
+        compare,
+        videos=videos,
+        grain=_grain(granularity, period),
+    )
+    return json_response(
+        {
+            "message": f"Revenue analytics for {(period[1] - period[0]).days + 1} days",
+            "revenue_data": growth.pop("trend"),
+            **growth,
+        }
+    )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
-from typing import Dict
 from app.services.auth_service import auth_service
+from app.services.token_service import token_manager
 from app.schemas.auth import (
     GoogleOAuthRequest,
     GoogleOAuthResponse,
@@ -10,7 +10,7 @@ from app.schemas.auth import (
     GoogleUserInfo,
 )
 from app.utils.user_storage import user_storage
-from app.dependencies import get_current_user
+from app.dependencies import CurrentUser, get_current_user
 
 router = APIRouter()
 
@@ -43,7 +43,7 @@ async def google_oauth(request: GoogleOAuthRequest):
         )
 
         # Create or update user in storage
-        user_data = user_storage.create_or_update_user(google_user, tokens)
+        user_data = await user_storage.create_or_update_user(google_user, tokens)
 
         # Create our internal JWT token
         jwt_token = auth_service.create_access_token(
@@ -66,31 +66,17 @@ async def google_oauth(request: GoogleOAuthRequest):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: Dict = Depends(get_current_user)):
+async def get_current_user_info(current_user: CurrentUser = Depends(get_current_user)):
     """Get current authenticated user"""
     return UserResponse(**current_user)
 
 
 @router.post("/refresh")
-async def refresh_token(current_user: Dict = Depends(get_current_user)):
+async def refresh_token(current_user: CurrentUser = Depends(get_current_user)):
     """Refresh Google access token"""
     try:
-        # Get user's refresh token
-        user_tokens = user_storage.get_user_tokens(current_user["id"])
-
-        if not user_tokens or not user_tokens.get("refresh_token"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="No refresh token available. Please re-authenticate.",
-            )
-
-        # Refresh the token
-        new_tokens = await auth_service.refresh_access_token(
-            user_tokens["refresh_token"]
-        )
-
-        # Update stored tokens
-        user_storage.update_user_tokens(current_user["id"], new_tokens)
+        # Coalesced with any refresh already in flight for this user
+        await token_manager.refresh(current_user["id"])
 
         return {"message": "Token refreshed successfully"}
 
@@ -108,7 +94,7 @@ async def verify_token(token: str):
 
 
 @router.post("/logout")
-async def logout(current_user: Dict = Depends(get_current_user)):
+async def logout(current_user: CurrentUser = Depends(get_current_user)):
     """Logout current user"""
     # In a real app, you might want to revoke the Google tokens
     # For now, we'll just return a success message
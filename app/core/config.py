@@ -9,6 +9,16 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 256
+
+    # User storage: "database" (shared across workers) or "memory"
+    USER_STORAGE_BACKEND: str = "database"
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_ENTRIES: int = 10000
 
     # Redis
     REDIS_URL: str
@@ -17,17 +27,110 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    # Verified JWT payloads kept in-process until they expire (0 disables)
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
 
     # Google OAuth
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     GOOGLE_REDIRECT_URI: str
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_USERINFO_URL: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+
+    # Google access token refresh
+    TOKEN_REFRESH_MARGIN_SECONDS: int = 60
+    TOKEN_PROACTIVE_REFRESH_SECONDS: int = 600
+    TOKEN_REFRESH_CHECK_SECONDS: int = 60
 
     # YouTube API
     YOUTUBE_API_KEY: Optional[str] = ""
     YOUTUBE_DATA_URL: Optional[str] = ""
     YOUTUBE_ANALYTICS_URL: Optional[str] = ""
 
+    # Public video/channel metadata shared across users (needs YOUTUBE_API_KEY)
+    METADATA_CACHE_ENABLED: bool = True
+    METADATA_STATISTICS_TTL_SECONDS: int = 300
+    METADATA_TTL_SECONDS: int = 3600
+    # contentDetails: duration, definition, uploads playlist
+    METADATA_IMMUTABLE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Outbound request fan-out
+    YOUTUBE_MAX_CONCURRENCY: int = 64
+    YOUTUBE_PER_USER_CONCURRENCY: int = 12
+
+    # Shared outbound HTTP client
+    HTTP_HTTP2: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 40
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_POOL_TIMEOUT: float = 30.0
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_RETRY_BACKOFF: float = 0.5
+
+    # Local analytics warehouse (channels, videos, daily_metrics tables)
+    WAREHOUSE_ENABLED: bool = True
+
+    # Incremental sync: days of history kept per channel / per video, and how
+    # many of the most recent synced days are re-fetched because Google may
+    # still restate them
+    SYNC_CHANNEL_HISTORY_DAYS: int = 90
+    SYNC_VIDEO_HISTORY_DAYS: int = 30
+    SYNC_RESTATEMENT_DAYS: int = 3
+
+    # Response cache (Analytics data refreshes at most a few times a day)
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: int = 900
+    CACHE_STALE_TTL_SECONDS: int = 3600
+    CACHE_LOCAL_MAX_ENTRIES: int = 4096
+
+    # Shared YouTube API quota budget (units; see quota_service.QUOTA_COSTS)
+    QUOTA_ENABLED: bool = True
+    QUOTA_YOUTUBE_DAILY_UNITS: int = 10000
+    QUOTA_ANALYTICS_DAILY_UNITS: int = 50000
+    QUOTA_BURST_UNITS: int = 600
+    QUOTA_REFILL_UNITS_PER_SECOND: float = 20.0
+    # Share of the bucket and daily budget background jobs may not touch
+    QUOTA_BACKGROUND_RESERVE: float = 0.2
+    QUOTA_INTERACTIVE_MAX_WAIT_SECONDS: float = 10.0
+    QUOTA_BACKGROUND_MAX_WAIT_SECONDS: float = 120.0
+    # Google resets daily quota at midnight Pacific time
+    QUOTA_RESET_UTC_OFFSET_HOURS: int = -8
+
+    # Videos whose per-video reports are in flight at once on the dashboard
+    DASHBOARD_VIDEO_WINDOW: int = 50
+    # Most recent uploads given per-video details. Each costs about five
+    # Analytics reports (day, country, traffic, retention and demographic
+    # breakdowns can't be batched), so 0 (every upload) can spend a large
+    # channel's whole QUOTA_ANALYTICS_DAILY_UNITS on one dashboard build
+    DASHBOARD_MAX_VIDEOS: int = 200
+    # JSON list of {country?, category?, min, avg, max} RPM entries for revenue
+    # estimates (unset = built-in US/GB/CA/default table)
+    RPM_TABLE_PATH: Optional[str] = None
+    # Render analytics responses with orjson, bypassing jsonable_encoder
+    FAST_JSON_RESPONSES: bool = True
+
+    # Negotiated brotli/gzip response compression
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Prometheus metrics (/metrics on the API; the worker serves its own port)
+    METRICS_ENABLED: bool = True
+    WORKER_METRICS_PORT: Optional[int] = None
+
+    # Background worker (python -m app.worker) that precomputes dashboards
+    DASHBOARD_TTL_SECONDS: int = 1800
+    WORKER_CONCURRENCY: int = 8
+    WORKER_REFRESH_INTERVAL_SECONDS: int = 900
+    WORKER_POLL_SECONDS: float = 1.0
+    WORKER_MAX_RETRIES: int = 3
+    WORKER_RETRY_BACKOFF_SECONDS: float = 30.0
+    # A claimed job that isn't finished within the lease may be enqueued again
+    WORKER_JOB_LEASE_SECONDS: int = 600
+
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
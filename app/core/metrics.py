@@ -0,0 +1,227 @@
+"""
+Prometheus metrics: HTTP routes, upstream Google calls, cache, quota and token
+refreshes.
+
+Routes are labelled by their path template (/api/v1/analytics/channel/{channel_id})
+and upstream calls by API, resource and, for Analytics reports, the report's
+dimensions, so label cardinality stays bounded whatever the traffic.
+"""
+
+import time
+from typing import Awaitable, Dict, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Dashboard builds and upstream reports run from milliseconds to tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(2**exponent for exponent in range(8, 25, 2))
+
+HTTP_REQUESTS = Counter(
+    "spytube_http_requests_total",
+    "HTTP requests handled",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "spytube_http_request_duration_seconds",
+    "Time to send the full HTTP response",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_RESPONSE_BYTES = Histogram(
+    "spytube_http_response_bytes",
+    "HTTP response body size as sent (after compression)",
+    ["method", "route"],
+    buckets=SIZE_BUCKETS,
+)
+HTTP_IN_PROGRESS = Gauge(
+    "spytube_http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method", "route"],
+)
+
+UPSTREAM_REQUESTS = Counter(
+    "spytube_upstream_requests_total",
+    "Google API calls made",
+    ["api", "endpoint", "report", "status"],
+)
+UPSTREAM_LATENCY = Histogram(
+    "spytube_upstream_request_duration_seconds",
+    "Google API call latency, excluding time queued in the scheduler",
+    ["api", "endpoint", "report"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_RESPONSE_BYTES = Counter(
+    "spytube_upstream_response_bytes_total",
+    "Google API response bytes received",
+    ["api", "endpoint", "report"],
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "spytube_upstream_requests_in_flight",
+    "Google API calls awaiting a response",
+    ["api"],
+)
+
+METADATA_LOOKUPS = Counter(
+    "spytube_metadata_lookups_total",
+    "Shared video/channel metadata lookups by ID",
+    ["resource", "result"],
+)
+
+TOKEN_REFRESHES = Counter(
+    "spytube_token_refreshes_total",
+    "Google access token refreshes",
+    ["outcome"],
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+def report_type(params: Dict) -> str:
+    """Label for an Analytics report: its dimensions, e.g. "day" or "video" """
+    return params.get("dimensions") or "none"
+
+
+async def observe_upstream(
+    api: str, endpoint: str, report: str, request: Awaitable[httpx.Response]
+) -> httpx.Response:
+    """Await one upstream call, recording its count, latency, status and size"""
+    in_flight = UPSTREAM_IN_FLIGHT.labels(api)
+    in_flight.inc()
+    started = time.perf_counter()
+    status = "error"
+    try:
+        response = await request
+        status = str(response.status_code)
+        UPSTREAM_RESPONSE_BYTES.labels(api, endpoint, report).inc(len(response.content))
+        return response
+    finally:
+        UPSTREAM_LATENCY.labels(api, endpoint, report).observe(
+            time.perf_counter() - started
+        )
+        UPSTREAM_REQUESTS.labels(api, endpoint, report, status).inc()
+        in_flight.dec()
+
+
+class CacheStatsCollector:
+    """Exports a CacheService's stats as spytube_cache_lookups_total by result
+
+    Hit ratio: sum(rate(spytube_cache_lookups_total{result=~".*_hits"}[5m]))
+    / sum(rate(spytube_cache_lookups_total[5m])).
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def collect(self):
+        stats = dict(self.cache.stats)
+        errors = CounterMetricFamily(
+            "spytube_cache_redis_errors",
+            "Redis errors that degraded the cache to its local tier",
+            value=stats.pop("redis_errors", 0),
+        )
+        lookups = CounterMetricFamily(
+            "spytube_cache_lookups",
+            "Upstream response cache lookups by result",
+            labels=["result"],
+        )
+        for result, count in stats.items():
+            lookups.add_metric([result], count)
+        yield lookups
+        yield errors
+
+
+class QuotaStatsCollector:
+    """Exports a QuotaLimiter's remaining bucket tokens and daily units per API
+
+    Levels are the last ones this process saw: every acquire updates them, and
+    the API's /metrics route refreshes them from Redis before each scrape.
+    """
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+
+    def collect(self):
+        tokens = GaugeMetricFamily(
+            "spytube_quota_bucket_tokens",
+            "Quota units left in the shared token bucket",
+            labels=["api"],
+        )
+        used = GaugeMetricFamily(
+            "spytube_quota_daily_used_units",
+            "Quota units spent today (quota day in QUOTA_RESET_UTC_OFFSET_HOURS)",
+            labels=["api"],
+        )
+        remaining = GaugeMetricFamily(
+            "spytube_quota_daily_remaining_units",
+            "Quota units left in today's budget",
+            labels=["api"],
+        )
+        for api, daily_limit in self.limiter.daily_limits.items():
+            levels = self.limiter.levels.get(api, {})
+            spent = levels.get("used", 0)
+            tokens.add_metric([api], levels.get("tokens", self.limiter.burst))
+            used.add_metric([api], spent)
+            remaining.add_metric([api], max(0, daily_limit - spent))
+        rejected = CounterMetricFamily(
+            "spytube_quota_rejections",
+            "Calls refused with a 429 because the quota ran out",
+            value=self.limiter.stats["rejected"],
+        )
+        yield tokens
+        yield used
+        yield remaining
+        yield rejected
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, latency, size and concurrency per route"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self.route_template(scope)
+        in_progress = HTTP_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        started = time.perf_counter()
+        status = "500"
+        size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_RESPONSE_BYTES.labels(method, route).observe(size)
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            in_progress.dec()
+
+    @staticmethod
+    def route_template(scope: Scope) -> str:
+        """Path template of the route a request will be dispatched to"""
+        router = scope["app"].router
+        partial: Optional[str] = None
+        for route in router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+            if match == Match.PARTIAL and partial is None:
+                # Right path, wrong method
+                partial = route.path
+        return partial or UNMATCHED_ROUTE
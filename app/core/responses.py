@@ -0,0 +1,99 @@
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+
+from app.core.config import settings
+from app.schemas.video import JSON_ENCODERS
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# {"etag": 'W/"..."', "lastModified": epoch seconds or None}
+Version = Dict[str, Any]
+
+
+def encode_default(obj: Any) -> Any:
+    """orjson default=: packed models (app.schemas.video) in their JSON shape"""
+    encode = JSON_ENCODERS.get(type(obj))
+    if encode is None:
+        raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+    return encode(obj)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also renders the packed models"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=encode_default, option=ORJSON_OPTIONS)
+
+
+def json_response(
+    content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Any:
+    """Render a JSON-native payload with orjson, skipping FastAPI's jsonable_encoder
+
+    Only for payloads that are already plain dicts/lists/str/numbers (dates,
+    NumPy arrays and the packed models are fine too). With FAST_JSON_RESPONSES
+    off the content is encoded the default FastAPI way.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        content = jsonable_encoder(content, custom_encoder=JSON_ENCODERS)
+        if headers is None:
+            return content
+        return JSONResponse(content, status_code=status_code, headers=headers)
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize a JSON-native payload for a streamed response"""
+    if settings.FAST_JSON_RESPONSES:
+        return orjson.dumps(content, default=encode_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=encode_default).encode()
+
+
+def etag(content: Any) -> str:
+    """Weak ETag of a JSON-native payload: a hash of its key-sorted serialization"""
+    digest = hashlib.blake2b(
+        orjson.dumps(
+            content,
+            default=encode_default,
+            option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS,
+        ),
+        digest_size=16,
+    )
+    return f'W/"{digest.hexdigest()}"'
+
+
+def version_headers(version: Version) -> Dict[str, str]:
+    """ETag / Last-Modified headers; private, and revalidated on every use"""
+    headers = {"ETag": version["etag"], "Cache-Control": "private, no-cache"}
+    if version.get("lastModified"):
+        headers["Last-Modified"] = formatdate(version["lastModified"], usegmt=True)
+    return headers
+
+
+def is_not_modified(request_headers: Mapping[str, str], version: Version) -> bool:
+    """Conditional GET: If-None-Match (weak comparison) wins over If-Modified-Since"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return version["etag"].removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and version.get("lastModified"):
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(version["lastModified"]) <= since
+    return False
+
+
+def not_modified_response(version: Version) -> Response:
+    return Response(status_code=304, headers=version_headers(version))
@@ -1,18 +1,75 @@
+import httpx
+from collections.abc import Mapping
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional
 from app.services.auth_service import auth_service
+from app.services.http_client import http_client
+from app.services.token_service import token_manager
 from app.utils.user_storage import user_storage
 
 security = HTTPBearer()
 
+USER_FIELDS = (
+    "id",
+    "email",
+    "name",
+    "picture",
+    "google_id",
+    "created_at",
+    "updated_at",
+)
+
+
+class CurrentUser(Mapping):
+    """The authenticated user, resolved once per request
+
+    Reads like the user dict (current_user["id"], UserResponse(**current_user));
+    the Google tokens are only looked up when get_tokens() or
+    get_access_token() is awaited, and then at most once.
+    """
+
+    __slots__ = (*USER_FIELDS, "_tokens")
+
+    def __init__(self, user: Dict, tokens: Optional[Dict] = None):
+        for field in USER_FIELDS:
+            setattr(self, field, user.get(field))
+        self._tokens = tokens
+
+    async def get_tokens(self) -> Dict:
+        """The user's Google tokens ({} if none are stored)"""
+        if self._tokens is None:
+            self._tokens = await user_storage.get_user_tokens(self.id) or {}
+        return self._tokens
+
+    async def get_access_token(self) -> str:
+        """A usable Google access token, refreshed only when about to expire"""
+        self._tokens = await token_manager.valid_tokens(
+            self.id, await self.get_tokens()
+        )
+        return self._tokens["access_token"]
+
+    def __getitem__(self, key: str):
+        if key not in USER_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(USER_FIELDS)
+
+    def __len__(self) -> int:
+        return len(USER_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"CurrentUser(id={self.id!r}, email={self.email!r})"
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> Dict:
+) -> CurrentUser:
     """Get current authenticated user from JWT token"""
     try:
-        # Verify the JWT token
+        # Verify the JWT token (cached until it expires)
         payload = auth_service.verify_token(credentials.credentials)
         user_id = payload.get("sub")
 
@@ -23,18 +80,13 @@ async def get_current_user(
             )
 
         # Get user from storage
-        user = user_storage.get_user(user_id)
+        user = await user_storage.get_user(user_id)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
 
-        tokens = user_storage.get_user_tokens(user_id) or {}
-
-        # Merge tokens into user dict so caller has all info
-        user_with_tokens = {**user, **tokens}
-
-        return user_with_tokens
+        return CurrentUser(user)
 
     except HTTPException:
         raise
@@ -46,7 +98,7 @@ async def get_current_user(
 
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-) -> Optional[Dict]:
+) -> Optional[CurrentUser]:
     """Get current user if authenticated, None otherwise"""
     if credentials is None:
         return None
@@ -58,10 +110,10 @@ async def get_current_user_optional(
 
 
 async def get_user_google_tokens(
-    current_user: Dict = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ) -> Dict:
     """Get current user's Google tokens"""
-    tokens = user_storage.get_user_tokens(current_user["id"])
+    tokens = await current_user.get_tokens()
 
     if not tokens:
         raise HTTPException(
@@ -70,3 +122,8 @@ async def get_user_google_tokens(
         )
 
     return tokens
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared outbound HTTP client"""
+    return http_client.client
@@ -2,6 +2,9 @@ from app.database import engine
 from app.models.user import (
     User,
 )
+from app.models.channel import Channel, ChannelManager
+from app.models.sync_state import SyncState
+from app.models.video import DailyMetric, MetricRollup, Video
 from app.database import Base
 
 
@@ -1,13 +1,38 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from app.api.v1.api import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.metrics import (
+    CacheStatsCollector,
+    MetricsMiddleware,
+    QuotaStatsCollector,
+)
+from app.database import async_engine
+from app.dependencies import CurrentUser, get_current_user
+from app.services.cache_service import cache_service
+from app.services.http_client import http_client
+from app.services.quota_service import quota_limiter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.start()
+    yield
+    await http_client.close()
+    await cache_service.close()
+    await quota_limiter.close()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="YouTube Analytics API",
     description="API for YouTube channel and video analytics",
     version="1.0.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -19,6 +44,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+if settings.METRICS_ENABLED:
+    # Outermost, so latency and bytes cover compression too
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register(CacheStatsCollector(cache_service))
+    REGISTRY.register(QuotaStatsCollector(quota_limiter))
+
 # Include API routes
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -33,6 +72,22 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/quota")
+async def quota_status(current_user: CurrentUser = Depends(get_current_user)):
+    """Remaining YouTube API budget shared by all API processes and workers"""
+    return await quota_limiter.snapshot()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this process"""
+    # Quota gauges report the shared Redis levels, not just this process's view
+    await quota_limiter.snapshot()
+    return Response(
+        generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
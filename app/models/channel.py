@@ -0,0 +1,38 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, String
+from app.database import Base
+
+
+class Channel(Base):
+    __tablename__ = "channels"
+
+    # YouTube channel ID
+    id = Column(String, primary_key=True)
+    title = Column(String, nullable=False)
+    custom_url = Column(String, nullable=True)
+    uploads_playlist_id = Column(String, nullable=True)
+    published_at = Column(String, nullable=True)
+
+    # Lifetime statistics as of updated_at
+    view_count = Column(BigInteger, nullable=False, default=0)
+    subscriber_count = Column(BigInteger, nullable=False, default=0)
+    video_count = Column(BigInteger, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False)
+
+
+class ChannelManager(Base):
+    """A user with access to a channel; several users may manage the same one"""
+
+    __tablename__ = "channel_managers"
+
+    user_id = Column(
+        String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    channel_id = Column(
+        String,
+        ForeignKey("channels.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    # Last time this user's sync saw the channel
+    synced_at = Column(DateTime, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, String
+from app.database import Base
+
+
+class SyncState(Base):
+    """High-water mark of the daily_metrics history synced for one report"""
+
+    __tablename__ = "sync_state"
+
+    channel_id = Column(
+        String, ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True
+    )
+    # "" for the channel-wide report
+    video_id = Column(String, primary_key=True, default="")
+    report = Column(String, primary_key=True)
+
+    # Every day in [synced_from, synced_through] has been fetched at least once
+    synced_from = Column(Date, nullable=False)
+    synced_through = Column(Date, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
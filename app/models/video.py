@@ -0,0 +1,103 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from app.database import Base
+
+
+class Video(Base):
+    __tablename__ = "videos"
+
+    # YouTube video ID
+    id = Column(String, primary_key=True)
+    channel_id = Column(
+        String,
+        ForeignKey("channels.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+    title = Column(String, nullable=False, default="")
+    published_at = Column(String, nullable=True)
+    duration_seconds = Column(Integer, nullable=False, default=0)
+    category_id = Column(String, nullable=True)
+
+    # Lifetime statistics as of updated_at
+    view_count = Column(BigInteger, nullable=False, default=0)
+    like_count = Column(BigInteger, nullable=False, default=0)
+    comment_count = Column(BigInteger, nullable=False, default=0)
+
+    updated_at = Column(DateTime, nullable=False)
+
+
+class DailyMetric(Base):
+    """One row of Analytics metrics per (channel, video, dimension value, day)"""
+
+    __tablename__ = "daily_metrics"
+
+    channel_id = Column(
+        String, ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True
+    )
+    # "" for channel-wide totals
+    video_id = Column(String, primary_key=True, default="")
+    # "" for totals, otherwise the breakdown dimension (e.g. "country") and value
+    dimension = Column(String, primary_key=True, default="")
+    dimension_value = Column(String, primary_key=True, default="")
+    day = Column(Date, primary_key=True)
+
+    views = Column(BigInteger, nullable=False, default=0)
+    estimated_minutes_watched = Column(BigInteger, nullable=False, default=0)
+    estimated_revenue = Column(Float, nullable=False, default=0)
+    estimated_ad_revenue = Column(Float, nullable=False, default=0)
+    likes = Column(BigInteger, nullable=False, default=0)
+    comments = Column(BigInteger, nullable=False, default=0)
+    shares = Column(BigInteger, nullable=False, default=0)
+    subscribers_gained = Column(BigInteger, nullable=False, default=0)
+    subscribers_lost = Column(BigInteger, nullable=False, default=0)
+    cpm = Column(Float, nullable=False, default=0)
+    playback_based_cpm = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        # Window scans across all videos of a channel (top videos, rollups)
+        Index("ix_daily_metrics_channel_day", "channel_id", "day"),
+    )
+
+
+class MetricRollup(Base):
+    """daily_metrics totals summed per week, month and year
+
+    Kept current by WarehouseService.upsert_daily_rows, which re-aggregates
+    the buckets touched by each upsert; only un-broken-down rows roll up.
+    """
+
+    __tablename__ = "metric_rollups"
+
+    channel_id = Column(
+        String, ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True
+    )
+    # "" for channel-wide totals
+    video_id = Column(String, primary_key=True, default="")
+    # "week" (starting Monday), "month" or "year"
+    grain = Column(String, primary_key=True)
+    period_start = Column(Date, primary_key=True)
+
+    # Stored days summed into the bucket
+    days = Column(Integer, nullable=False, default=0)
+    views = Column(BigInteger, nullable=False, default=0)
+    estimated_minutes_watched = Column(BigInteger, nullable=False, default=0)
+    estimated_revenue = Column(Float, nullable=False, default=0)
+    estimated_ad_revenue = Column(Float, nullable=False, default=0)
+    likes = Column(BigInteger, nullable=False, default=0)
+    comments = Column(BigInteger, nullable=False, default=0)
+    shares = Column(BigInteger, nullable=False, default=0)
+    subscribers_gained = Column(BigInteger, nullable=False, default=0)
+    subscribers_lost = Column(BigInteger, nullable=False, default=0)
+    # Daily CPMs weighted by daily views; divide by views for the bucket's CPM
+    cpm_views = Column(Float, nullable=False, default=0)
+    playback_based_cpm_views = Column(Float, nullable=False, default=0)
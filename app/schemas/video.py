@@ -0,0 +1,174 @@
+"""
+Compact in-memory form of the dashboard's detailed videos.
+
+A detailed video used to be a dict holding a list of row dicts per report:
+30 trend days, 100 retention points, top countries, traffic sources and
+demographics, each row repeating its keys. Here each report is a Series,
+one packed array per output key, and the video itself is a slotted Mapping.
+Both are turned back into the row-dict JSON shape only when serialized at
+the edge (app.core.responses) and kept packed in the cache's Redis tier.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.reports import ReportTable, pack_column, row_decoder
+
+DETAILED_VIDEO_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "thumbnails",
+    "publishedAt",
+    "channelTitle",
+    "tags",
+    "categoryId",
+    "defaultLanguage",
+    "duration",
+    "durationFormatted",
+    "definition",
+    "caption",
+    "licensedContent",
+    "projection",
+    "statistics",
+    "analytics",
+    "rpm",
+    "estimatedRevenue",
+    "trendData",
+    "trafficSources",
+    "retentionData",
+    "demographics",
+    "geography",
+    "status",
+    "topicDetails",
+    "localizations",
+)
+
+# Marks a packed object in the cache's JSON encoding
+STATE_KEY = "__packed__"
+
+
+def _intern(column: np.ndarray) -> np.ndarray:
+    """Share label strings (dates, countries) between every series holding them"""
+    if column.dtype != object:
+        return column
+    return np.fromiter(
+        (sys.intern(value) if type(value) is str else value for value in column),
+        dtype=object,
+        count=len(column),
+    )
+
+
+class Series:
+    """Rows of a report as one packed array per output key"""
+
+    __slots__ = ("fields", "columns")
+
+    def __init__(self, fields: Tuple[str, ...], columns: Tuple[np.ndarray, ...]):
+        self.fields = fields
+        self.columns = columns
+
+    @classmethod
+    def from_table(cls, table: ReportTable, fields: Dict[str, str]) -> "Series":
+        """Pack the named report columns, like table.records(fields) would decode them"""
+        return cls(
+            tuple(fields),
+            tuple(_intern(table.get(name)) for name in fields.values()),
+        )
+
+    @classmethod
+    def from_records(cls, records: List[Dict], fields: Sequence[str]) -> "Series":
+        """Pack row dicts that all have the given keys"""
+        return cls(
+            tuple(fields),
+            tuple(
+                _intern(pack_column([record[key] for record in records], None))
+                for key in fields
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        return self.columns[self.fields.index(key)]
+
+    def select(self, keys) -> "Series":
+        """The series with only the given keys, in their current order"""
+        selected = [i for i, key in enumerate(self.fields) if key in keys]
+        return Series(
+            tuple(self.fields[i] for i in selected),
+            tuple(self.columns[i] for i in selected),
+        )
+
+    def records(self) -> List[Dict]:
+        """One dict per row: the report's JSON shape"""
+        decode = row_decoder(tuple((key, i) for i, key in enumerate(self.fields)))
+        return list(map(decode, zip(*(column.tolist() for column in self.columns))))
+
+    def __repr__(self) -> str:
+        return f"Series({', '.join(self.fields)}; {len(self)} rows)"
+
+
+class DetailedVideo(Mapping):
+    """One dashboard video: reads like the detailed_video dict it replaces"""
+
+    __slots__ = DETAILED_VIDEO_FIELDS
+
+    def __init__(self, **fields):
+        for name in DETAILED_VIDEO_FIELDS:
+            setattr(self, name, fields[name])
+
+    def __getitem__(self, key: str):
+        if key not in DETAILED_VIDEO_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(DETAILED_VIDEO_FIELDS)
+
+    def __len__(self) -> int:
+        return len(DETAILED_VIDEO_FIELDS)
+
+    def to_dict(self) -> Dict:
+        """The detailed_video dict, with every series as a list of row dicts"""
+        return {
+            name: value.records() if isinstance(value, Series) else value
+            for name, value in self.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"DetailedVideo(id={self.id!r})"
+
+
+# Type -> JSON-native form, for orjson's default= and jsonable_encoder
+JSON_ENCODERS = {Series: Series.records, DetailedVideo: DetailedVideo.to_dict}
+
+
+def encode_state(obj: Any) -> Dict:
+    """json.dumps default= that keeps series packed (column lists), for caching"""
+    if isinstance(obj, Series):
+        return {
+            STATE_KEY: "series",
+            "fields": obj.fields,
+            "columns": [column.tolist() for column in obj.columns],
+        }
+    if isinstance(obj, DetailedVideo):
+        return {STATE_KEY: "video", **obj}
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def decode_state(obj: Dict) -> Any:
+    """json.loads object_hook reversing encode_state; other dicts pass through"""
+    kind: Optional[str] = obj.pop(STATE_KEY, None)
+    if kind == "series":
+        return Series(
+            tuple(obj["fields"]),
+            tuple(_intern(pack_column(column, None)) for column in obj["columns"]),
+        )
+    if kind == "video":
+        return DetailedVideo(**obj)
+    return obj
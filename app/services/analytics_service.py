@@ -0,0 +1,1273 @@
+import asyncio
+import logging
+import time
+import httpx
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+from app.core.config import settings
+from app.core.metrics import observe_upstream, report_type
+from app.core.responses import Version, etag
+from app.database import AsyncSessionLocal
+from app.schemas.video import DetailedVideo, Series
+from app.services.cache_service import CacheService, cache_service
+from app.services.metadata_service import (
+    CHANNEL_PARTS,
+    VIDEO_PARTS,
+    MetadataService,
+    metadata_service,
+)
+from app.utils.fields import FieldTree, child, format_fields, prune, selects
+from app.utils.helpers import parse_duration
+from app.utils.reports import ReportTable
+from app.utils.revenue import WILDCARD, estimate_revenue, revenue_range, rpm_table
+from app.services.request_scheduler import (
+    RequestScheduler,
+    gather_dict,
+    prefetch,
+    rebatch,
+    request_scheduler,
+)
+from app.services.quota_service import (
+    INTERACTIVE,
+    YOUTUBE_ANALYTICS_API,
+    YOUTUBE_DATA_API,
+    QuotaLimiter,
+    quota_limiter,
+)
+from app.services.sync_service import sync_service
+from app.services.warehouse_service import warehouse_service
+from app.services.youtube_service import youtube_service
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_DATA_URL = settings.YOUTUBE_DATA_URL or "https://www.googleapis.com/youtube/v3"
+YOUTUBE_ANALYTICS_URL = (
+    settings.YOUTUBE_ANALYTICS_URL
+    or "https://youtubeanalytics.googleapis.com/v2/reports"
+)
+
+CHANNEL_METRICS = "views,estimatedMinutesWatched,averageViewDuration,likes,subscribersGained,subscribersLost,estimatedRevenue,estimatedAdRevenue,cpm,playbackBasedCpm"
+# Daily channel series synced into the warehouse; current/previous period
+# summaries are summed from it instead of being requested separately
+CHANNEL_DAILY_METRICS = "views,estimatedMinutesWatched,estimatedRevenue,estimatedAdRevenue,likes,subscribersGained,subscribersLost,cpm,playbackBasedCpm"
+VIDEO_METRICS = "views,estimatedMinutesWatched,averageViewDuration,likes,dislikes,comments,shares,estimatedRevenue,estimatedAdRevenue,cpm,impressions,impressionClickThroughRate,averageViewPercentage,subscribersGained,subscribersLost,annotationClickThroughRate,annotationCloseRate,cardClickRate,cardTeaserClickRate,cardImpressions,cardTeaserImpressions,endScreenElementClickRate,endScreenElementImpressions"
+
+EMPTY_REPORT = {"rows": []}
+# Per-video report -> the detailed_video keys built from it
+VIDEO_REPORT_OUTPUTS = {
+    "analytics": ("analytics", "rpm", "estimatedRevenue"),
+    "trend": ("trendData",),
+    "trafficSources": ("trafficSources",),
+    "retention": ("retentionData",),
+    "demographics": ("demographics",),
+    "geography": ("geography", "estimatedRevenue"),
+}
+# Dashboard key -> channel-level calls it is built from
+DASHBOARD_SOURCES = {
+    "channelData": ("current",),
+    "analyticsData": ("current",),
+    "revenueData": ("current", "previous"),
+    "trendData": ("trend",),
+    "topVideos": ("topVideos",),
+    "playlists": ("playlists",),
+    "videos": ("videos",),
+    "detailed_videos": ("videos",),
+}
+DASHBOARD_SECTIONS = (
+    "message",
+    "user",
+    *DASHBOARD_SOURCES,
+    "lastUpdated",
+    "failedReports",
+)
+
+
+def calculate_estimated_revenue(
+    views: int, watch_time_minutes: int, region: str = "US"
+) -> Dict:
+    """
+    Calculate estimated revenue based on views and watch time
+    These are rough estimates based on industry averages
+    """
+    # RPM (Revenue Per Mille) varies by region and content type
+    rpm = rpm_table().lookup(region)
+
+    # Calculate estimated revenue
+    estimated_revenue = {
+        "ad_revenue": {
+            "min": (views / 1000) * rpm["min"],
+            "max": (views / 1000) * rpm["max"],
+            "estimated": (views / 1000) * rpm["avg"],
+        },
+        "cpm": rpm["avg"],
+        "total_monetizable_views": int(views * 0.6),  # Assuming 60% monetization rate
+        "engagement_multiplier": (
+            min(2.0, watch_time_minutes / (views * 3)) if views > 0 else 1.0
+        ),
+    }
+
+    return estimated_revenue
+
+
+def calculate_growth_metrics(current_data: Dict, previous_data: Dict) -> Dict:
+    """Calculate growth percentages and trends"""
+    growth = {}
+
+    metrics = ["views", "estimatedMinutesWatched", "subscribersGained", "likes"]
+
+    for metric in metrics:
+        current_value = current_data.get(metric, 0)
+        previous_value = previous_data.get(metric, 0)
+
+        if previous_value > 0:
+            growth[metric] = ((current_value - previous_value) / previous_value) * 100
+        else:
+            growth[metric] = 0
+
+    return growth
+
+
+def video_report_params(video_id: str, start_date, end_date) -> Dict[str, Dict]:
+    """Analytics report parameters fetched for every video on the dashboard"""
+    base = {
+        "ids": "channel==MINE",
+        "startDate": str(start_date),
+        "endDate": str(end_date),
+        "filters": f"video=={video_id}",
+    }
+
+    return {
+        "analytics": {**base, "metrics": VIDEO_METRICS},
+        "trend": {
+            **base,
+            "metrics": "views,estimatedMinutesWatched,estimatedRevenue,likes,comments",
+            "dimensions": "day",
+        },
+        "trafficSources": {
+            **base,
+            "metrics": "views,estimatedMinutesWatched",
+            "dimensions": "insightTrafficSourceType",
+            "sort": "-views",
+        },
+        "retention": {
+            **base,
+            "metrics": "audienceWatchRatio,relativeRetentionPerformance",
+            "dimensions": "elapsedVideoTimeRatio",
+        },
+        "demographics": {
+            **base,
+            "metrics": "views,estimatedMinutesWatched",
+            "dimensions": "ageGroup,gender",
+        },
+        "geography": {
+            **base,
+            "metrics": "views,estimatedMinutesWatched,estimatedRevenue",
+            "dimensions": "country",
+            "sort": "-views",
+            "maxResults": 10,
+        },
+    }
+
+
+# Output key -> Analytics column for each parsed report
+PERIOD_SUMMARY_FIELDS = {
+    name: name
+    for name in (
+        "views",
+        "estimatedMinutesWatched",
+        "averageViewDuration",
+        "likes",
+        "subscribersGained",
+        "subscribersLost",
+        "estimatedRevenue",
+        "estimatedAdRevenue",
+        "cpm",
+        "playbackBasedCpm",
+    )
+}
+CHANNEL_TREND_FIELDS = {
+    "date": "day",
+    "views": "views",
+    "watchTime": "estimatedMinutesWatched",
+    "revenue": "estimatedRevenue",
+    "subscribers": "subscribersGained",
+}
+TOP_VIDEO_FIELDS = {
+    "videoId": "video",
+    "views": "views",
+    "watchTime": "estimatedMinutesWatched",
+    "revenue": "estimatedRevenue",
+    "likes": "likes",
+    "comments": "comments",
+}
+VIDEO_ANALYTICS_FIELDS = {
+    "views_30d": "views",
+    "watchTime_30d": "estimatedMinutesWatched",
+    "averageViewDuration_30d": "averageViewDuration",
+    "likes_30d": "likes",
+    "dislikes_30d": "dislikes",
+    "comments_30d": "comments",
+    "shares_30d": "shares",
+    "revenue_30d": "estimatedRevenue",
+    "adRevenue_30d": "estimatedAdRevenue",
+    "cpm_30d": "cpm",
+    "impressions_30d": "impressions",
+    "clickThroughRate_30d": "impressionClickThroughRate",
+    "viewPercentage_30d": "averageViewPercentage",
+    "subscribersGained_30d": "subscribersGained",
+    "subscribersLost_30d": "subscribersLost",
+}
+VIDEO_REPORT_FIELDS = {
+    "trendData": (
+        "trend",
+        {
+            "date": "day",
+            "views": "views",
+            "watchTime": "estimatedMinutesWatched",
+            "revenue": "estimatedRevenue",
+        },
+    ),
+    "trafficSources": (
+        "trafficSources",
+        {
+            "source": "insightTrafficSourceType",
+            "views": "views",
+            "watchTime": "estimatedMinutesWatched",
+        },
+    ),
+    "retentionData": (
+        "retention",
+        {
+            "timeRatio": "elapsedVideoTimeRatio",
+            "audienceWatchRatio": "audienceWatchRatio",
+            "relativeRetention": "relativeRetentionPerformance",
+        },
+    ),
+    "demographics": (
+        "demographics",
+        {
+            "ageGroup": "ageGroup",
+            "gender": "gender",
+            "views": "views",
+            "watchTime": "estimatedMinutesWatched",
+        },
+    ),
+    "geography": (
+        "geography",
+        {
+            "country": "country",
+            "views": "views",
+            "watchTime": "estimatedMinutesWatched",
+            "revenue": "estimatedRevenue",
+        },
+    ),
+}
+
+
+def parse_period_summary(report: Dict) -> Dict:
+    """Parse a CHANNEL_METRICS summary report for one period"""
+    return ReportTable.from_report(report).first(PERIOD_SUMMARY_FIELDS)
+
+
+def parse_channel_trend(report: Dict) -> List[Dict]:
+    """Parse the channel's daily trend report for charts"""
+    return ReportTable.from_report(report).records(CHANNEL_TREND_FIELDS)
+
+
+def parse_top_videos(report: Dict) -> List[Dict]:
+    """Parse the top videos report"""
+    return ReportTable.from_report(report).records(TOP_VIDEO_FIELDS)
+
+
+def parse_video_analytics(report: Dict) -> Dict:
+    """Parse the per-video 30-day summary report"""
+    return ReportTable.from_report(report).first(VIDEO_ANALYTICS_FIELDS)
+
+
+def parse_video_reports(reports: Dict[str, Dict]) -> Dict:
+    """Parse the per-video breakdown reports into packed dashboard series"""
+    parsed = {
+        "analytics": parse_video_analytics(reports.get("analytics", EMPTY_REPORT))
+    }
+    for key, (name, fields) in VIDEO_REPORT_FIELDS.items():
+        report = reports.get(name, EMPTY_REPORT)
+        parsed[key] = Series.from_table(ReportTable.from_report(report), fields)
+    return parsed
+
+
+def estimate_videos_revenue(
+    parsed_videos: Sequence[Dict], category_ids: Sequence[str]
+) -> List[Dict]:
+    """Revenue ranges for many videos in one pass, priced per country
+
+    Every video's geography rows go into one set of arrays, grouped by video
+    index. The report only lists the top countries, so each video also gets
+    a row for the rest of its views, at the default RPM.
+    """
+    countries: List[str] = []
+    categories: List[str] = []
+    views: List[float] = []
+    watch_time: List[float] = []
+    groups: List[int] = []
+    for index, (parsed, category_id) in enumerate(zip(parsed_videos, category_ids)):
+        geography = parsed["geography"]
+        video_views = geography["views"].tolist()
+        video_watch_time = geography["watchTime"].tolist()
+        analytics = parsed["analytics"]
+        countries += geography["country"].tolist()
+        countries.append(WILDCARD)
+        views += video_views
+        views.append(max(0, analytics.get("views_30d", 0) - sum(video_views)))
+        watch_time += video_watch_time
+        watch_time.append(
+            max(0, analytics.get("watchTime_30d", 0) - sum(video_watch_time))
+        )
+        rows = len(video_views) + 1
+        categories += [category_id or WILDCARD] * rows
+        groups += [index] * rows
+
+    estimate = estimate_revenue(views, watch_time, countries, categories, groups)
+    return revenue_range(estimate)
+
+
+def estimate_video_revenue(parsed: Dict, category_id: str = WILDCARD) -> Dict:
+    """Revenue range for one video, priced per country from its geography report"""
+    return estimate_videos_revenue([parsed], [category_id])[0]
+
+
+def build_detailed_video(
+    video_stat: Dict, parsed: Dict, estimated_revenue: Optional[Dict] = None
+) -> DetailedVideo:
+    """Combine videos.list metadata with parsed analytics for one video
+
+    Pass estimated_revenue when it was estimated for a batch of videos.
+    """
+    stats = video_stat.get("statistics", {})
+    snippet = video_stat.get("snippet", {})
+    content_details = video_stat.get("contentDetails", {})
+    analytics_data = parsed["analytics"]
+
+    total_views = int(stats.get("viewCount", 0))
+    total_likes = int(stats.get("likeCount", 0))
+    total_comments = int(stats.get("commentCount", 0))
+    duration_seconds = parse_duration(content_details.get("duration", "PT0S"))
+
+    # Calculate engagement rate
+    engagement_rate = (
+        ((total_likes + total_comments) / total_views * 100) if total_views > 0 else 0
+    )
+
+    # Calculate RPM
+    rpm = (
+        (
+            analytics_data.get("revenue_30d", 0)
+            / (analytics_data.get("views_30d", 1) / 1000)
+        )
+        if analytics_data.get("views_30d", 0) > 0
+        else 0
+    )
+
+    if estimated_revenue is None:
+        estimated_revenue = estimate_video_revenue(
+            parsed, snippet.get("categoryId", "")
+        )
+
+    return DetailedVideo(
+        id=video_stat["id"],
+        title=snippet.get("title", ""),
+        description=snippet.get("description", ""),
+        thumbnails=snippet.get("thumbnails", {}),
+        publishedAt=snippet.get("publishedAt", ""),
+        channelTitle=snippet.get("channelTitle", ""),
+        tags=snippet.get("tags", []),
+        categoryId=snippet.get("categoryId", ""),
+        defaultLanguage=snippet.get("defaultLanguage", ""),
+        duration=duration_seconds,
+        durationFormatted=content_details.get("duration", ""),
+        definition=content_details.get("definition", ""),
+        caption=content_details.get("caption", ""),
+        licensedContent=content_details.get("licensedContent", False),
+        projection=content_details.get("projection", ""),
+        # Lifetime Statistics
+        statistics={
+            "viewCount": total_views,
+            "likeCount": total_likes,
+            "commentCount": total_comments,
+            "favoriteCount": int(stats.get("favoriteCount", 0)),
+            "engagementRate": round(engagement_rate, 2),
+        },
+        # 30-day Performance
+        analytics=analytics_data,
+        rpm=round(rpm, 2),
+        estimatedRevenue=estimated_revenue,
+        trendData=parsed["trendData"],
+        trafficSources=parsed["trafficSources"],
+        retentionData=parsed["retentionData"],
+        demographics=parsed["demographics"],
+        geography=parsed["geography"],
+        # Status and Metadata
+        status=video_stat.get("status", {}),
+        topicDetails=video_stat.get("topicDetails", {}),
+        localizations=video_stat.get("localizations", {}),
+    )
+
+
+def dashboard_etag(dashboard: Dict) -> str:
+    """ETag of a dashboard's data, ignoring when it was built and the order its
+    videos finished in"""
+    content = {**dashboard, "lastUpdated": None}
+    if "detailed_videos" in content:
+        content["detailed_videos"] = sorted(map(etag, content["detailed_videos"]))
+    return etag(content)
+
+
+class AnalyticsService:
+    """Builds dashboard payloads from the YouTube Data and Analytics APIs"""
+
+    def __init__(
+        self,
+        scheduler: Optional[RequestScheduler] = None,
+        cache: Optional[CacheService] = None,
+        session_factory: Optional[async_sessionmaker] = None,
+        use_warehouse: Optional[bool] = None,
+        quota: Optional[QuotaLimiter] = None,
+        priority: str = INTERACTIVE,
+        metadata: Optional[MetadataService] = None,
+    ):
+        self.scheduler = scheduler or request_scheduler
+        self.cache = cache or cache_service
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.use_warehouse = (
+            settings.WAREHOUSE_ENABLED if use_warehouse is None else use_warehouse
+        )
+        self.quota = quota or quota_limiter
+        # Quota priority for every upstream call this instance makes
+        self.priority = priority
+        self.metadata = metadata or metadata_service
+
+    async def _get_json(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        api: str,
+        resource: str,
+        url: str,
+        headers: Dict,
+        params: Dict,
+    ) -> Dict:
+        """GET a Google API URL under the quota budget and scheduler, raising on non-200"""
+        await self.quota.acquire(api, resource, self.priority)
+        report = report_type(params) if resource == "reports" else ""
+        response = await self.scheduler.run(
+            user_id,
+            lambda: observe_upstream(
+                api,
+                resource,
+                report,
+                client.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    extensions=self.quota.extensions(api, resource, self.priority),
+                ),
+            ),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch_report(
+        self, client: httpx.AsyncClient, user_id: str, headers: Dict, params: Dict
+    ) -> Dict:
+        """Fetch one Analytics report through the response cache"""
+        return await self.cache.get_or_fetch(
+            self.cache.build_key(user_id, "reports", params),
+            lambda: self._get_json(
+                client,
+                user_id,
+                YOUTUBE_ANALYTICS_API,
+                "reports",
+                YOUTUBE_ANALYTICS_URL,
+                headers,
+                params,
+            ),
+        )
+
+    async def fetch_data(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        resource: str,
+        headers: Dict,
+        params: Dict,
+    ) -> Dict:
+        """Fetch one YouTube Data API resource (channels, playlists, ...) through the cache"""
+        return await self.cache.get_or_fetch(
+            self.cache.build_key(user_id, resource, params),
+            lambda: self._get_json(
+                client,
+                user_id,
+                YOUTUBE_DATA_API,
+                resource,
+                f"{YOUTUBE_DATA_URL}/{resource}",
+                headers,
+                params,
+            ),
+        )
+
+    async def fetch_channel(
+        self, client: httpx.AsyncClient, user_id: str, headers: Dict
+    ) -> Dict:
+        """channels.list for the user's own channel
+
+        Once the user's channel ID is known it is read by ID from the shared
+        metadata cache, so users managing the same channel share one copy.
+        The mine=true response itself is never shared: fetched with the
+        owner's token, it can carry owner-only fields (hidden subscriber
+        count, branding tracking IDs) that the keyed lookup does not return.
+        """
+        params = {"part": ",".join(CHANNEL_PARTS), "mine": "true"}
+        if not self.metadata.enabled:
+            return await self.fetch_data(client, user_id, "channels", headers, params)
+
+        owner_key = self.metadata.key("owner", user_id)
+        channel_id = await self.cache.get(owner_key)
+        if channel_id is None:
+            channel_data = await self.fetch_data(
+                client, user_id, "channels", headers, params
+            )
+            items = channel_data.get("items", [])
+            if items:
+                await self.cache.set(
+                    owner_key, items[0]["id"], ttl=settings.METADATA_TTL_SECONDS
+                )
+            return channel_data
+
+        return await self.metadata.list(
+            client,
+            user_id,
+            "channels",
+            [channel_id],
+            CHANNEL_PARTS,
+            lambda _: self.fetch_data(client, user_id, "channels", headers, params),
+            self.priority,
+        )
+
+    async def fetch_videos(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        headers: Dict,
+        video_ids: List[str],
+    ) -> Dict:
+        """videos.list for up to 50 IDs, through the shared metadata cache when enabled
+
+        Videos the API key cannot see (private, unlisted drafts) fall back to
+        the user's own token.
+        """
+
+        def fetch(ids: List[str]):
+            return self.fetch_data(
+                client,
+                user_id,
+                "videos",
+                headers,
+                {"part": ",".join(VIDEO_PARTS), "id": ",".join(ids)},
+            )
+
+        if not self.metadata.enabled:
+            return await fetch(video_ids)
+        return await self.metadata.list(
+            client, user_id, "videos", video_ids, VIDEO_PARTS, fetch, self.priority
+        )
+
+    async def iter_playlist_items(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        headers: Dict,
+        playlist_id: str,
+        first_page: Optional[Dict] = None,
+    ) -> AsyncIterator[Dict]:
+        """Yield every page of a playlist, following nextPageToken
+
+        The request for page N+1 is already in flight while page N is
+        consumed. Pass an already fetched first page to continue from it.
+        """
+        params = {
+            "part": "snippet,contentDetails",
+            "playlistId": playlist_id,
+            "maxResults": 50,
+        }
+
+        def fetch(page_token: Optional[str]):
+            page_params = {**params, "pageToken": page_token} if page_token else params
+            return asyncio.ensure_future(
+                self.fetch_data(client, user_id, "playlistItems", headers, page_params)
+            )
+
+        next_page = fetch(None) if first_page is None else None
+        page = first_page
+        try:
+            while True:
+                if page is None:
+                    page = await next_page
+                page_token = page.get("nextPageToken")
+                next_page = fetch(page_token) if page_token else None
+                yield page
+                if next_page is None:
+                    return
+                page = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+                if next_page.done() and not next_page.cancelled():
+                    next_page.exception()
+
+    async def iter_uploads(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        headers: Dict,
+        playlist_id: str,
+        failed_reports: List[str],
+        first_page: Optional[Dict] = None,
+        limit: int = 0,
+    ) -> AsyncIterator[List[Dict]]:
+        """Yield videos.list items for a channel's uploads, one page of up to 50 at a time
+
+        A failed page is recorded in failed_reports: "videoStats" for a
+        videos.list batch (the listing continues), "videos" for a
+        playlistItems page (the listing stops there). limit=0 means all uploads.
+        """
+        seen = 0
+        try:
+            async for page in self.iter_playlist_items(
+                client, user_id, headers, playlist_id, first_page
+            ):
+                video_ids = [
+                    item["contentDetails"]["videoId"] for item in page.get("items", [])
+                ]
+                if limit:
+                    video_ids = video_ids[: limit - seen]
+                seen += len(video_ids)
+                if video_ids:
+                    try:
+                        stats = await self.fetch_videos(
+                            client, user_id, headers, video_ids
+                        )
+                    except (httpx.HTTPError, HTTPException):
+                        failed_reports.append("videoStats")
+                    else:
+                        yield stats.get("items", [])
+                if limit and seen >= limit:
+                    return
+        except (httpx.HTTPError, HTTPException):
+            failed_reports.append("videos")
+
+    def dashboard_key(self, user_id: str, fields: Optional[FieldTree] = None) -> str:
+        """Cache key of a user's precomputed dashboard (or of a sparse fieldset of it)"""
+        params = {} if fields is None else {"fields": format_fields(fields)}
+        return self.cache.build_key(user_id, "dashboard", params)
+
+    @staticmethod
+    def version_key(key: str) -> str:
+        """Cache key of the version stored next to a cached dashboard"""
+        return f"{key}:version"
+
+    async def get_cached_dashboard(
+        self,
+        client: httpx.AsyncClient,
+        current_user: Dict,
+        access_token: str,
+        fields: Optional[FieldTree] = None,
+    ) -> Dict:
+        """Serve the dashboard precomputed by the worker, building it inline on a miss
+
+        A sparse fieldset is cut from the precomputed dashboard when there is
+        one; otherwise only the reports behind the requested fields are fetched.
+        """
+        key = self.dashboard_key(current_user["id"])
+        if fields is None:
+            return await self.cache.get_or_fetch(
+                key,
+                lambda: self._build_versioned(
+                    key, self.get_dashboard(client, current_user, access_token)
+                ),
+                ttl=settings.DASHBOARD_TTL_SECONDS,
+            )
+
+        dashboard = await self.cache.get(key)
+        if dashboard is not None:
+            return prune(dashboard, fields)
+        fields_key = self.dashboard_key(current_user["id"], fields)
+        return await self.cache.get_or_fetch(
+            fields_key,
+            lambda: self._build_versioned(
+                fields_key,
+                self.get_dashboard(client, current_user, access_token, fields),
+            ),
+            ttl=settings.DASHBOARD_TTL_SECONDS,
+        )
+
+    async def get_dashboard_version(
+        self, user_id: str, fields: Optional[FieldTree] = None
+    ) -> Optional[Version]:
+        """Version of the dashboard get_cached_dashboard would serve, if one is
+        stored and fresh; checking it costs one cache lookup, no build"""
+        version = await self.cache.get(self.version_key(self.dashboard_key(user_id)))
+        if fields is None:
+            return version
+        if version is not None:
+            # The fieldset is cut from this dashboard, so derive its version
+            return {**version, "etag": etag([version["etag"], format_fields(fields)])}
+        return await self.cache.get(
+            self.version_key(self.dashboard_key(user_id, fields))
+        )
+
+    async def _build_versioned(self, key: str, build) -> Dict:
+        dashboard = await build
+        await self.store_version(key, dashboard)
+        return dashboard
+
+    async def store_version(self, key: str, dashboard: Dict):
+        """Store a cached dashboard's ETag and the time its data last changed"""
+        version_key = self.version_key(key)
+        tag = dashboard_etag(dashboard)
+        previous = await self.cache.get(version_key, stale=True)
+        # A rebuild with identical data keeps its Last-Modified
+        if previous is not None and previous["etag"] == tag:
+            last_modified = previous["lastModified"]
+        else:
+            last_modified = time.time()
+        await self.cache.set(
+            version_key,
+            {"etag": tag, "lastModified": last_modified},
+            ttl=settings.DASHBOARD_TTL_SECONDS,
+        )
+
+    async def refresh_dashboard(
+        self, client: httpx.AsyncClient, current_user: Dict, access_token: str
+    ) -> Dict:
+        """Rebuild a user's dashboard and store it for get_cached_dashboard"""
+        key = self.dashboard_key(current_user["id"])
+        dashboard = await self.get_dashboard(client, current_user, access_token)
+        await self.cache.set(key, dashboard, ttl=settings.DASHBOARD_TTL_SECONDS)
+        await self.store_version(key, dashboard)
+        return dashboard
+
+    async def get_dashboard(
+        self,
+        client: httpx.AsyncClient,
+        current_user: Dict,
+        access_token: str,
+        fields: Optional[FieldTree] = None,
+    ) -> Dict:
+        """Build the whole dashboard (or the requested fields of it) as one dict"""
+        dashboard: Dict = {}
+        detailed_videos = []
+        async for event, data in self.stream_dashboard(
+            client, current_user, access_token, fields
+        ):
+            if event == "summary":
+                dashboard = data
+            elif event == "video":
+                detailed_videos.append(data)
+            else:
+                dashboard["detailed_videos"] = detailed_videos
+                dashboard.update(data)
+        return prune(dashboard, fields)
+
+    async def stream_dashboard(
+        self,
+        client: httpx.AsyncClient,
+        current_user: Dict,
+        access_token: str,
+        fields: Optional[FieldTree] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Dashboard events, syncing daily series incrementally when possible
+
+        Yields ("summary", ...) once the channel-level reports are in, then
+        ("video", detailed_video) as each video's reports complete, then
+        ("done", {"failedReports": ...}).
+        """
+        events = None
+        if self.use_warehouse:
+            events = self.dashboard_events(
+                client, current_user, access_token, synced=True, fields=fields
+            )
+            try:
+                summary = await anext(events)
+            except (SQLAlchemyError, OSError):
+                logger.exception("Warehouse unavailable, serving upstream reports")
+                events = None
+        if events is None:
+            events = self.dashboard_events(
+                client, current_user, access_token, synced=False, fields=fields
+            )
+            summary = await anext(events)
+
+        yield summary
+        async for event in events:
+            yield event
+
+    async def dashboard_events(
+        self,
+        client: httpx.AsyncClient,
+        current_user: Dict,
+        access_token: str,
+        synced: bool,
+        fields: Optional[FieldTree] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Fetch every dashboard report, fanning requests out concurrently
+
+        With synced=True the channel and per-video daily series only cover the
+        days past each high-water mark (plus the restatement window); period
+        summaries, trends and top videos are then read back from the warehouse.
+        Reports that only feed keys outside fields are not fetched at all.
+        """
+        user_id = current_user["id"]
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        # Get Channel Info
+        try:
+            channel_data = await self.fetch_channel(client, user_id, headers)
+        except httpx.HTTPStatusError:
+            raise HTTPException(status_code=500, detail="Failed to fetch channel info")
+
+        channel = channel_data["items"][0]
+        channel_id = channel["id"]
+        uploads_playlist_id = channel["contentDetails"]["relatedPlaylists"]["uploads"]
+
+        # Get date ranges
+        today = datetime.utcnow().date()
+        last_30 = today - timedelta(days=30)
+        last_60 = today - timedelta(days=60)
+        last_90 = today - timedelta(days=90)
+
+        def report(params: Dict):
+            return lambda: self.fetch_report(client, user_id, headers, params)
+
+        def data(resource: str, params: Dict):
+            return lambda: self.fetch_data(client, user_id, resource, headers, params)
+
+        # Top-level channel reports and listings all run in one fan-out
+        channel_calls = {
+            "playlists": data(
+                "playlists",
+                {
+                    "part": "snippet,contentDetails",
+                    "channelId": channel_id,
+                    "maxResults": 50,
+                },
+            ),
+            "videos": data(
+                "playlistItems",
+                {
+                    "part": "snippet,contentDetails",
+                    "playlistId": uploads_playlist_id,
+                    "maxResults": 50,
+                },
+            ),
+        }
+
+        # Only the calls behind the requested fields; the daily series stands
+        # in for the period summaries and trend when syncing
+        needed = {
+            source
+            for key, sources in DASHBOARD_SOURCES.items()
+            if selects(fields, key)
+            for source in sources
+        }
+        if synced and needed & {"current", "previous", "trend"}:
+            needed.add("daily")
+        video_reports = [
+            name
+            for name, outputs in VIDEO_REPORT_OUTPUTS.items()
+            if selects(fields, "detailed_videos")
+            and any(selects(child(fields, "detailed_videos"), key) for key in outputs)
+        ]
+
+        # video_id ("" for the channel) -> days requested from upstream
+        sync_windows = {}
+        if synced:
+            async with self.session_factory() as db:
+                sync_states = await sync_service.load_states(db, channel_id)
+            start, end = sync_windows[""] = sync_service.channel_window(
+                sync_states, today
+            )
+            channel_calls["daily"] = report(
+                {
+                    "ids": "channel==MINE",
+                    "startDate": str(start),
+                    "endDate": str(end),
+                    "metrics": CHANNEL_DAILY_METRICS,
+                    "dimensions": "day",
+                }
+            )
+        else:
+            channel_calls.update(
+                {
+                    "current": report(
+                        {
+                            "ids": "channel==MINE",
+                            "startDate": str(last_30),
+                            "endDate": str(today),
+                            "metrics": CHANNEL_METRICS,
+                        }
+                    ),
+                    "previous": report(
+                        {
+                            "ids": "channel==MINE",
+                            "startDate": str(last_60),
+                            "endDate": str(last_30),
+                            "metrics": CHANNEL_METRICS,
+                        }
+                    ),
+                    "trend": report(
+                        {
+                            "ids": "channel==MINE",
+                            "startDate": str(last_90),
+                            "endDate": str(today),
+                            "metrics": "views,estimatedMinutesWatched,estimatedRevenue,subscribersGained",
+                            "dimensions": "day",
+                        }
+                    ),
+                    "topVideos": report(
+                        {
+                            "ids": "channel==MINE",
+                            "startDate": str(last_30),
+                            "endDate": str(today),
+                            "metrics": "views,estimatedMinutesWatched,estimatedRevenue,likes,comments",
+                            "dimensions": "video",
+                            "sort": "-views",
+                            "maxResults": 10,
+                        }
+                    ),
+                }
+            )
+        results, errors = await gather_dict(
+            {name: call for name, call in channel_calls.items() if name in needed}
+        )
+        failed_reports = sorted(errors)
+
+        # The first uploads page came with the channel fan-out; the rest are
+        # paged in after the summary is out
+        video_items = results.get("videos", {}).get("items", [])
+
+        if synced:
+            # Merge the fetched days into stored history; a failed report keeps
+            # its old high-water mark and is retried from it next time
+            daily_reports = {"": results["daily"]} if "daily" in results else {}
+            async with self.session_factory() as db:
+                await self.store_reports(db, user_id, channel, [], daily_reports)
+                await sync_service.mark_synced(
+                    db,
+                    channel_id,
+                    {key: sync_windows[key] for key in daily_reports},
+                    sync_states,
+                )
+                await db.commit()
+
+                # One load; each window is then two prefix-sum lookups
+                series = await warehouse_service.daily_series(
+                    db, channel_id, last_60, today
+                )
+                current_data = warehouse_service.period_summary(
+                    series, (last_30, today)
+                )
+                previous_data = warehouse_service.period_summary(
+                    series, (last_60, last_30)
+                )
+                trend_data = await warehouse_service.channel_trend(
+                    db, channel_id, last_90, today
+                )
+                top_performing_videos = await warehouse_service.top_videos(
+                    db, channel_id, last_30, today
+                )
+        else:
+            current_data = parse_period_summary(results.get("current", EMPTY_REPORT))
+            previous_data = parse_period_summary(results.get("previous", EMPTY_REPORT))
+            trend_data = parse_channel_trend(results.get("trend", EMPTY_REPORT))
+            top_performing_videos = parse_top_videos(
+                results.get("topVideos", EMPTY_REPORT)
+            )
+
+        yield "summary", self.build_summary(
+            current_user,
+            channel,
+            current_data=current_data,
+            previous_data=previous_data,
+            trend_data=trend_data,
+            top_performing_videos=top_performing_videos,
+            playlists=results.get("playlists", {}).get("items", []),
+            videos=video_items,
+        )
+
+        # Per-video reports, merged into batch reports where the API can break
+        # rows down by video, for a window of videos at a time; each video is
+        # emitted as soon as all of its reports are in. Uploads are paged in
+        # one page ahead of the window being processed, so memory stays flat
+        # however many videos the channel has.
+        uploads = self.iter_uploads(
+            client,
+            user_id,
+            headers,
+            uploads_playlist_id,
+            failed_reports,
+            first_page=results.get("videos", {"items": []}),
+            limit=settings.DASHBOARD_MAX_VIDEOS,
+        )
+        async for video_stats in rebatch(
+            prefetch(uploads), settings.DASHBOARD_VIDEO_WINDOW
+        ):
+            stats_by_id = {video_stat["id"]: video_stat for video_stat in video_stats}
+            if synced:
+                try:
+                    async with self.session_factory() as db:
+                        await warehouse_service.upsert_videos(
+                            db, channel_id, video_stats
+                        )
+                        await db.commit()
+                except (SQLAlchemyError, OSError):
+                    logger.exception("Warehouse unavailable for %s videos", channel_id)
+
+            if not video_reports:
+                # Only videos.list metadata was asked for
+                # No reports, so nothing to price: every estimate is zero
+                revenue = estimate_video_revenue(parse_video_reports({}))
+                for video_stat in video_stats:
+                    yield "video", build_detailed_video(
+                        video_stat, parse_video_reports({}), dict(revenue)
+                    )
+                continue
+
+            video_requests = {}
+            for video_id in stats_by_id:
+                params = video_report_params(video_id, last_30, today)
+                if synced and "trend" in video_reports:
+                    start, end = sync_windows[video_id] = sync_service.video_window(
+                        sync_states, video_id, today
+                    )
+                    params["trend"].update(startDate=str(start), endDate=str(end))
+                for name in video_reports:
+                    video_requests[(video_id, name)] = params[name]
+
+            # Each video is parsed once all of its reports are in; the window's
+            # revenue is then estimated in one pass. The merged summary report
+            # covers the whole window, so no video completes much before it.
+            pending = {video_id: {} for video_id in stats_by_id}
+            completed: Dict[str, Tuple[Dict, Dict]] = {}
+            async for (video_id, name), video_report, error in (
+                youtube_service.stream_reports(
+                    lambda params: self.fetch_report(client, user_id, headers, params),
+                    video_requests,
+                )
+            ):
+                if error is not None:
+                    failed_reports.append(f"{video_id}:{name}")
+                    video_report = EMPTY_REPORT
+                reports = pending[video_id]
+                reports[name] = video_report
+                if len(reports) == len(video_reports):
+                    completed[video_id] = (reports, parse_video_reports(reports))
+                    del pending[video_id]
+
+            revenues = estimate_videos_revenue(
+                [parsed for _, parsed in completed.values()],
+                [
+                    stats_by_id[video_id].get("snippet", {}).get("categoryId", "")
+                    for video_id in completed
+                ],
+            )
+            for (video_id, (reports, parsed)), revenue in zip(
+                completed.items(), revenues
+            ):
+                detailed_video = build_detailed_video(
+                    stats_by_id[video_id], parsed, revenue
+                )
+                if synced and reports.get("trend", EMPTY_REPORT).get("columnHeaders"):
+                    try:
+                        detailed_video.trendData = await self.sync_video_trend(
+                            channel_id,
+                            video_id,
+                            reports["trend"],
+                            sync_windows.pop(video_id),
+                            sync_states,
+                            last_30,
+                            today,
+                        )
+                    except (SQLAlchemyError, OSError):
+                        logger.exception("Warehouse unavailable for video %s", video_id)
+                        failed_reports.append(f"{video_id}:trend")
+                yield "video", detailed_video
+
+        done = {"failedReports": failed_reports}
+        if synced and selects(fields, "topVideos"):
+            # Top videos again, now that this load's per-video days are stored
+            try:
+                async with self.session_factory() as db:
+                    done["topVideos"] = await warehouse_service.top_videos(
+                        db, channel_id, last_30, today
+                    )
+            except (SQLAlchemyError, OSError):
+                logger.exception("Warehouse unavailable, keeping earlier top videos")
+        yield "done", done
+
+    async def sync_video_trend(
+        self,
+        channel_id: str,
+        video_id: str,
+        report: Dict,
+        window: Tuple[date, date],
+        sync_states: Dict,
+        start: date,
+        end: date,
+    ) -> Series:
+        """Store one video's fetched days and read back its full trend"""
+        async with self.session_factory() as db:
+            await warehouse_service.upsert_daily_rows(
+                db, warehouse_service.report_rows(channel_id, report, video_id)
+            )
+            await sync_service.mark_synced(
+                db, channel_id, {video_id: window}, sync_states
+            )
+            await db.commit()
+            trends = await warehouse_service.video_trends(
+                db, channel_id, [video_id], start, end
+            )
+        return Series.from_records(
+            trends[video_id], tuple(VIDEO_REPORT_FIELDS["trendData"][1])
+        )
+
+    async def store_reports(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        channel: Dict,
+        video_stats: List[Dict],
+        reports: Dict[str, Dict],
+    ):
+        """Upsert the channel, its videos and daily reports into the warehouse
+
+        reports maps "" to the channel's daily report and each video ID to
+        that video's daily report.
+        """
+        channel_id = channel["id"]
+        await warehouse_service.upsert_channel(db, user_id, channel)
+        await warehouse_service.upsert_videos(db, channel_id, video_stats)
+
+        # Reports sharing the same metric columns go out as one bulk upsert
+        batches: Dict[tuple, List[Dict]] = {}
+        for video_id, report in reports.items():
+            if not report.get("columnHeaders"):
+                continue
+            rows = warehouse_service.report_rows(channel_id, report, video_id)
+            if rows:
+                batches.setdefault(tuple(rows[0]), []).extend(rows)
+        for rows in batches.values():
+            await warehouse_service.upsert_daily_rows(db, rows)
+
+    def build_summary(
+        self,
+        current_user: Dict,
+        channel: Dict,
+        current_data: Dict,
+        previous_data: Dict,
+        trend_data: List[Dict],
+        top_performing_videos: List[Dict],
+        playlists: List[Dict],
+        videos: List[Dict],
+    ) -> Dict:
+        """Everything on the dashboard except the per-video details"""
+        current_data = dict(current_data)
+
+        # Calculate growth metrics
+        growth_metrics = calculate_growth_metrics(current_data, previous_data)
+
+        # Calculate estimated revenue if YouTube Analytics doesn't provide it
+        if current_data.get("estimatedRevenue", 0) == 0:
+            estimated_revenue = calculate_estimated_revenue(
+                current_data.get("views", 0),
+                current_data.get("estimatedMinutesWatched", 0),
+            )
+            current_data["estimatedRevenue"] = estimated_revenue["ad_revenue"][
+                "estimated"
+            ]
+            current_data["cpm"] = estimated_revenue["cpm"]
+
+        # Calculate additional metrics
+        watch_time_hours = current_data.get("estimatedMinutesWatched", 0) / 60
+        rpm = (
+            (
+                current_data.get("estimatedRevenue", 0)
+                / (current_data.get("views", 1) / 1000)
+            )
+            if current_data.get("views", 0) > 0
+            else 0
+        )
+
+        # Calculate projected monthly revenue
+        daily_revenue = current_data.get("estimatedRevenue", 0) / 30
+        projected_monthly = daily_revenue * 30
+        projected_yearly = projected_monthly * 12
+
+        return {
+            "message": "Complete Revenue & Analytics Dashboard",
+            "user": current_user["name"],
+            "channelData": {
+                "id": channel["id"],
+                "title": channel["snippet"]["title"],
+                "description": channel["snippet"]["description"],
+                "thumbnails": channel["snippet"]["thumbnails"],
+                "totalViews": int(channel["statistics"]["viewCount"]),
+                "subscribers": int(channel["statistics"]["subscriberCount"]),
+                "totalVideos": int(channel["statistics"]["videoCount"]),
+                "watchTime": int(watch_time_hours),
+                "customUrl": channel["snippet"].get("customUrl", ""),
+                "publishedAt": channel["snippet"]["publishedAt"],
+            },
+            "analyticsData": {
+                "views": current_data.get("views", 0),
+                "estimatedMinutesWatched": current_data.get(
+                    "estimatedMinutesWatched", 0
+                ),
+                "averageViewDuration": current_data.get("averageViewDuration", 0),
+                "likes": current_data.get("likes", 0),
+                "subscribersGained": current_data.get("subscribersGained", 0),
+                "subscribersLost": current_data.get("subscribersLost", 0),
+                "netSubscribers": current_data.get("subscribersGained", 0)
+                - current_data.get("subscribersLost", 0),
+            },
+            "revenueData": {
+                "currentPeriod": {
+                    "estimatedRevenue": current_data.get("estimatedRevenue", 0),
+                    "estimatedAdRevenue": current_data.get("estimatedAdRevenue", 0),
+                    "cpm": current_data.get("cpm", 0),
+                    "playbackBasedCpm": current_data.get("playbackBasedCpm", 0),
+                    "rpm": rpm,
+                },
+                "projections": {
+                    "daily": daily_revenue,
+                    "monthly": projected_monthly,
+                    "yearly": projected_yearly,
+                },
+                "growth": {
+                    "revenueGrowth": growth_metrics.get("estimatedRevenue", 0),
+                    "viewsGrowth": growth_metrics.get("views", 0),
+                    "watchTimeGrowth": growth_metrics.get("estimatedMinutesWatched", 0),
+                    "subscribersGrowth": growth_metrics.get("subscribersGained", 0),
+                },
+            },
+            "trendData": trend_data,
+            "topVideos": top_performing_videos,
+            "playlists": playlists,
+            "videos": videos,
+            "lastUpdated": datetime.utcnow().isoformat(),
+        }
+
+
+# Create singleton instance
+analytics_service = AnalyticsService()
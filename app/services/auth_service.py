@@ -1,20 +1,28 @@
-import httpx
+import hashlib
+import time
+from collections import OrderedDict
 from urllib.parse import urlencode
 from authlib.integrations.httpx_client import AsyncOAuth2Client
 from fastapi import HTTPException, status
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import jwt
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.services.http_client import http_client
 
 
 class AuthService:
-    def __init__(self):
+    def __init__(
+        self, verified_cache_size: int = settings.AUTH_TOKEN_CACHE_MAX_ENTRIES
+    ):
+        self.verified_cache_size = verified_cache_size
+        # token digest -> (exp, payload) of tokens whose signature checked out
+        self._verified: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
         self.google_client_id = settings.GOOGLE_CLIENT_ID
         self.google_client_secret = settings.GOOGLE_CLIENT_SECRET
         self.redirect_uri = settings.GOOGLE_REDIRECT_URI
-        self.google_token_url = "https://oauth2.googleapis.com/token"
-        self.google_userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
+        self.google_token_url = settings.GOOGLE_TOKEN_URL
+        self.google_userinfo_url = settings.GOOGLE_USERINFO_URL
 
     def get_google_oauth_url(self) -> str:
         """Generate Google OAuth authorization URL"""
@@ -42,58 +50,57 @@ class AuthService:
 
     async def exchange_code_for_tokens(self, code: str) -> Dict:
         """Exchange authorization code for access and refresh tokens"""
-        async with httpx.AsyncClient() as client:
-            data = {
-                "client_id": self.google_client_id,
-                "client_secret": self.google_client_secret,
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": self.redirect_uri,
-            }
+        data = {
+            "client_id": self.google_client_id,
+            "client_secret": self.google_client_secret,
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": self.redirect_uri,
+        }
 
-            response = await client.post(self.google_token_url, data=data)
+        response = await http_client.client.post(self.google_token_url, data=data)
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Failed to exchange code for tokens",
-                )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Failed to exchange code for tokens",
+            )
 
-            return response.json()
+        return response.json()
 
     async def get_user_info(self, access_token: str) -> Dict:
         """Get user information from Google"""
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {access_token}"}
-            response = await client.get(self.google_userinfo_url, headers=headers)
+        headers = {"Authorization": f"Bearer {access_token}"}
+        response = await http_client.client.get(
+            self.google_userinfo_url, headers=headers
+        )
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Failed to get user information",
-                )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Failed to get user information",
+            )
 
-            return response.json()
+        return response.json()
 
     async def refresh_access_token(self, refresh_token: str) -> Dict:
         """Refresh access token using refresh token"""
-        async with httpx.AsyncClient() as client:
-            data = {
-                "client_id": self.google_client_id,
-                "client_secret": self.google_client_secret,
-                "refresh_token": refresh_token,
-                "grant_type": "refresh_token",
-            }
+        data = {
+            "client_id": self.google_client_id,
+            "client_secret": self.google_client_secret,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+        }
 
-            response = await client.post(self.google_token_url, data=data)
+        response = await http_client.client.post(self.google_token_url, data=data)
 
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Failed to refresh access token",
-                )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Failed to refresh access token",
+            )
 
-            return response.json()
+        return response.json()
 
     def create_access_token(
         self, data: Dict, expires_delta: Optional[timedelta] = None
@@ -114,21 +121,39 @@ class AuthService:
         return encoded_jwt
 
     def verify_token(self, token: str) -> Dict:
-        """Verify JWT token"""
+        """Verify JWT token
+
+        Verified payloads are remembered (by token digest) until their exp,
+        so repeat requests with the same token skip the signature check.
+        """
+        key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        entry = self._verified.get(key)
+        if entry is not None:
+            if time.time() < entry[0]:
+                self._verified.move_to_end(key)
+                return entry[1]
+            del self._verified[key]
+
         try:
             payload = jwt.decode(
                 token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
             )
-            return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
 
+        # Tokens without exp never expire, but are not worth pinning in memory
+        if self.verified_cache_size and "exp" in payload:
+            self._verified[key] = (float(payload["exp"]), payload)
+            while len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+        return payload
+
 
 # Create singleton instance
 auth_service = AuthService()
@@ -0,0 +1,306 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.schemas.video import decode_state, encode_state
+
+# (packed value, fresh_until, stale_until) as absolute time.time() timestamps.
+# The value is kept as its JSON encoding (dashboard models packed) in both
+# tiers, so every hit decodes a copy of its own that callers may mutate
+CacheEntry = Tuple[str, float, float]
+
+
+class CacheService:
+    """Two-tier response cache: in-process LRU in front of Redis"""
+
+    KEY_PREFIX = "spytube:cache:v2:"
+    # Request fields that identify an Analytics report, in key order
+    KEY_FIELDS = ("startDate", "endDate", "metrics", "dimensions", "filters")
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        ttl: int,
+        stale_ttl: int,
+        max_local_entries: int,
+        redis_retry_seconds: float = 30.0,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_local_entries = max_local_entries
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self._local: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._redis: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        self.stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "redis_errors": 0,
+        }
+
+    @classmethod
+    def build_key(cls, user_id: str, endpoint: str, params: Dict) -> str:
+        """Build a cache key from (user, endpoint, date range, metrics, dimensions, filters)"""
+        parts = [str(user_id), endpoint]
+        parts.extend(str(params.get(field, "")) for field in cls.KEY_FIELDS)
+        # Anything else that shapes the response (sort, maxResults, part, ...)
+        parts.extend(
+            f"{name}={params[name]}"
+            for name in sorted(params)
+            if name not in cls.KEY_FIELDS
+        )
+        digest = hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+        return f"{cls.KEY_PREFIX}{digest}"
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """Return a cached value, fetching it at most once per key on a miss"""
+        if not self.enabled:
+            return await fetch()
+
+        now = time.time()
+
+        entry = self._get_local(key)
+        if entry is not None and entry[1] > now:
+            self.stats["local_hits"] += 1
+            return self._unpack(entry[0])
+        entry = await self._get_fresher(key, entry)
+        if entry is not None and entry[1] > now:
+            self.stats["redis_hits"] += 1
+            return self._unpack(entry[0])
+
+        if entry is not None and entry[2] > now:
+            # Stale-while-revalidate: serve the old value, refresh once behind it
+            self.stats["stale_hits"] += 1
+            self._fetch_task(key, fetch, ttl)
+            return self._unpack(entry[0])
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+        # Shielded: a cancelled caller stops waiting, the shared fetch goes on
+        return await asyncio.shield(self._fetch_task(key, fetch, ttl))
+
+    async def get(self, key: str, stale: bool = False) -> Optional[Any]:
+        """Return a fresh (or, with stale=True, stale) cached value without fetching"""
+        if not self.enabled:
+            return None
+        entry = self._get_local(key)
+        if entry is None or entry[1] <= time.time():
+            entry = await self._get_fresher(key, entry)
+        if entry is None or (not stale and entry[1] <= time.time()):
+            return None
+        return self._unpack(entry[0])
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Fresh cached values of several keys, in one Redis round trip for local misses"""
+        if not self.enabled:
+            return {}
+        now = time.time()
+        entries = {}
+        remote = []
+        for key in keys:
+            entry = self._get_local(key)
+            if entry is not None and entry[1] > now:
+                entries[key] = entry
+            else:
+                remote.append(key)
+        if remote:
+            for key, entry in zip(remote, await self._get_redis_many(remote)):
+                if entry is not None:
+                    self._set_local(key, entry)
+                    entries[key] = entry
+        return {
+            key: self._unpack(entry[0])
+            for key, entry in entries.items()
+            if entry[1] > now
+        }
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store a value computed elsewhere (e.g. by the background worker)"""
+        await self.set_many({key: value}, ttl)
+
+    async def set_many(self, values: Dict[str, Any], ttl: Optional[int] = None):
+        """Store several values with the same TTL, pipelined to Redis"""
+        if not self.enabled or not values:
+            return
+        now = time.time()
+        fresh_for = self.ttl if ttl is None else ttl
+        entries = {
+            key: (self._pack(value), now + fresh_for, now + fresh_for + self.stale_ttl)
+            for key, value in values.items()
+        }
+        for key, entry in entries.items():
+            self._set_local(key, entry)
+        await self._set_redis(entries)
+
+    async def invalidate(self, key: str):
+        """Drop a key from both tiers"""
+        self._local.pop(key, None)
+        client = self._get_redis_client()
+        if client is None:
+            return
+        try:
+            await client.delete(key)
+        except (RedisError, OSError):
+            self._mark_redis_down()
+
+    def hit_ratio(self) -> float:
+        """Fraction of lookups served without an upstream fetch"""
+        hits = (
+            self.stats["local_hits"]
+            + self.stats["redis_hits"]
+            + self.stats["stale_hits"]
+            + self.stats["coalesced"]
+        )
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def _fetch_task(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[int]
+    ) -> asyncio.Task:
+        """Single-flight: the fetch of key in progress, started if there is none
+
+        The fetch runs in a task of its own rather than in the first caller,
+        so a caller being cancelled (client disconnect, a cancelled report
+        stream) doesn't cancel it for everyone else waiting on the key.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch, ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._fetch_done(key, done))
+        return task
+
+    async def _fetch_and_store(
+        self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[int]
+    ) -> Any:
+        value = await fetch()
+        await self.set(key, value, ttl)
+        return value
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieved even when nobody waits (a background refresh, whose
+            # failure keeps the stale value in service)
+            task.exception()
+
+    @staticmethod
+    def _pack(value: Any) -> str:
+        return json.dumps(value, default=encode_state)
+
+    @staticmethod
+    def _unpack(packed: str) -> Any:
+        return json.loads(packed, object_hook=decode_state)
+
+    async def _get_fresher(
+        self, key: str, local: Optional[CacheEntry]
+    ) -> Optional[CacheEntry]:
+        """The Redis entry of key if it is fresher than the local one, else local
+
+        Another instance (or the worker) may have refreshed a key whose local
+        copy went stale; that value is served instead of fetching it again.
+        """
+        remote = await self._get_redis(key)
+        if remote is None or (local is not None and remote[1] <= local[1]):
+            return local
+        self._set_local(key, remote)
+        return remote
+
+    def _get_local(self, key: str) -> Optional[CacheEntry]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.time():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _set_local(self, key: str, entry: CacheEntry):
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    def _get_redis_client(self) -> Optional[redis.Redis]:
+        if not self.redis_url or time.time() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            # redis-py picks the hiredis parser automatically when installed
+            self._redis = redis.from_url(
+                self.redis_url, socket_connect_timeout=1, socket_timeout=1
+            )
+        return self._redis
+
+    def _mark_redis_down(self):
+        # Degrade to the local tier instead of paying a timeout on every lookup
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.time() + self.redis_retry_seconds
+
+    async def _get_redis(self, key: str) -> Optional[CacheEntry]:
+        return (await self._get_redis_many([key]))[0]
+
+    async def _get_redis_many(self, keys: List[str]) -> List[Optional[CacheEntry]]:
+        client = self._get_redis_client()
+        if client is None:
+            return [None] * len(keys)
+        try:
+            raws = await client.mget(keys)
+        except (RedisError, OSError):
+            self._mark_redis_down()
+            return [None] * len(keys)
+        return [None if raw is None else tuple(json.loads(raw)) for raw in raws]
+
+    async def _set_redis(self, entries: Dict[str, CacheEntry]):
+        client = self._get_redis_client()
+        if client is None:
+            return
+        now = time.time()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, entry in entries.items():
+                    expire = max(1, int(entry[2] - now))
+                    pipe.set(key, json.dumps(entry), ex=expire)
+                await pipe.execute()
+        except (RedisError, OSError):
+            self._mark_redis_down()
+
+
+# Create singleton instance
+cache_service = CacheService(
+    redis_url=settings.REDIS_URL,
+    ttl=settings.CACHE_TTL_SECONDS,
+    stale_ttl=settings.CACHE_STALE_TTL_SECONDS,
+    max_local_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+    enabled=settings.CACHE_ENABLED,
+)
@@ -0,0 +1,190 @@
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.database import AsyncSessionLocal
+from app.services.warehouse_service import warehouse_service
+from app.utils.series import Period, growth, previous_period, year_ago
+
+# Comparison name -> baseline period for a given period
+COMPARISONS = {"previous": previous_period, "year": year_ago}
+REVENUE_METRICS = (
+    "estimatedRevenue",
+    "estimatedAdRevenue",
+    "views",
+    "estimatedMinutesWatched",
+)
+CHANNEL_METRICS = (
+    "views",
+    "estimatedMinutesWatched",
+    "estimatedRevenue",
+    "likes",
+    "comments",
+    "subscribersGained",
+    "subscribersLost",
+)
+
+
+class GrowthService:
+    """Period-over-period comparisons over the warehouse's daily series
+
+    Every window is answered from prefix sums over stored days, so a new
+    comparison never needs a new upstream report.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        self.session_factory = session_factory or AsyncSessionLocal
+
+    @asynccontextmanager
+    async def _warehouse(self):
+        """A session whose database errors surface as 503s"""
+        try:
+            async with self.session_factory() as db:
+                yield db
+        except (SQLAlchemyError, OSError):
+            raise HTTPException(status_code=503, detail="Warehouse unavailable")
+
+    async def query(
+        self,
+        user_id: str,
+        metrics: Sequence[str],
+        period: Period,
+        compare: str = "previous",
+        videos: bool = False,
+        grain: str = "day",
+    ) -> Dict:
+        """Totals, change and growth of metrics over period against a baseline
+
+        compare is "previous" (the same number of days right before) or
+        "year" (the same dates a year earlier). With videos, every stored
+        video is compared as well, sorted by the first metric. The trend is
+        per day, or per week/month/year from the rollups.
+        """
+        try:
+            baseline = COMPARISONS[compare](period)
+        except (OverflowError, ValueError):
+            # Before date.min, e.g. the year before 0001-01-01
+            raise HTTPException(
+                status_code=422, detail="Comparison period is out of range"
+            )
+        async with self._warehouse() as db:
+            channel_id = await warehouse_service.user_channel_id(db, user_id)
+            if channel_id is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail="No synced channel data yet; load the dashboard first",
+                )
+            series = await warehouse_service.daily_series(
+                db,
+                channel_id,
+                min(period[0], baseline[0]),
+                max(period[1], baseline[1]),
+            )
+            if videos:
+                video_ids, totals = await warehouse_service.video_totals(
+                    db, channel_id, metrics, [period, baseline]
+                )
+            if grain != "day":
+                trend = await warehouse_service.trend(
+                    db, channel_id, grain, *period, list(metrics)
+                )
+
+        if grain == "day":
+            # The loaded span covers the whole period, so no days are clipped
+            daily = [series.daily(metric, period).tolist() for metric in metrics]
+            trend = [
+                {
+                    "date": str(period[0] + timedelta(days=offset)),
+                    **dict(zip(metrics, values)),
+                }
+                for offset, values in enumerate(zip(*daily))
+            ]
+
+        result = {
+            "channelId": channel_id,
+            "period": {"start": str(period[0]), "end": str(period[1])},
+            "comparison": {
+                "type": compare,
+                "start": str(baseline[0]),
+                "end": str(baseline[1]),
+            },
+            "metrics": series.compare(metrics, period, baseline),
+            "granularity": grain,
+            "trend": trend,
+        }
+        if videos:
+            result["videos"] = self._videos(video_ids, totals, metrics)
+        return result
+
+    async def channel_trend(
+        self,
+        user_id: str,
+        channel_id: str,
+        metrics: Sequence[str],
+        period: Period,
+        grain: str,
+    ) -> Dict:
+        """A stored channel's statistics and its metrics per day/week/month/year"""
+        async with self._warehouse() as db:
+            channel = await warehouse_service.get_channel(db, user_id, channel_id)
+            if channel is None:
+                raise HTTPException(
+                    status_code=404, detail="Channel not found or not synced yet"
+                )
+            trend = await warehouse_service.trend(
+                db, channel_id, grain, *period, list(metrics)
+            )
+
+        return {
+            "channel": {
+                "id": channel.id,
+                "title": channel.title,
+                "customUrl": channel.custom_url,
+                "publishedAt": channel.published_at,
+                "totalViews": channel.view_count,
+                "subscribers": channel.subscriber_count,
+                "totalVideos": channel.video_count,
+                "updatedAt": channel.updated_at.isoformat(),
+            },
+            "period": {"start": str(period[0]), "end": str(period[1])},
+            "granularity": grain,
+            "trend": trend,
+        }
+
+    @staticmethod
+    def _videos(
+        video_ids: List[str], totals: Dict[str, np.ndarray], metrics: Sequence[str]
+    ) -> List[Dict]:
+        """Per-video comparison of every metric, one column operation each
+
+        totals holds each metric's (videos x [period, baseline]) sums.
+        """
+        columns = {}
+        for metric in metrics:
+            current, previous = totals[metric].T
+            columns[metric] = (current, previous, growth(current, previous))
+
+        order = columns[metrics[0]][0].argsort()[::-1].tolist()
+        return [
+            {
+                "videoId": video_ids[i],
+                **{
+                    metric: {
+                        "current": current[i].item(),
+                        "previous": previous[i].item(),
+                        "growth": rate[i].item(),
+                    }
+                    for metric, (current, previous, rate) in columns.items()
+                },
+            }
+            for i in order
+        ]
+
+
+# Create singleton instance
+growth_service = GrowthService()
@@ -0,0 +1,132 @@
+import asyncio
+import random
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.quota_service import quota_limiter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retries 429/5xx responses and connection failures with exponential backoff"""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_retries: int,
+        backoff_factor: float,
+        max_backoff: float = 10.0,
+        on_retry: Optional[Callable[[httpx.Request], Awaitable[None]]] = None,
+    ):
+        self._transport = transport
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        # Awaited before resending a request Google already answered
+        self.on_retry = on_retry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # The request never reached Google, so any method is safe to resend
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if (
+                response.status_code not in RETRY_STATUSES
+                or request.method not in RETRY_METHODS
+                or attempt >= self.max_retries
+            ):
+                return response
+
+            delay = self._retry_after(response) or self._backoff(attempt)
+            await response.aclose()
+            await asyncio.sleep(delay)
+            if self.on_retry is not None:
+                await self.on_retry(request)
+            attempt += 1
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps many workers from retrying in lockstep
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff_factor * (2**attempt))
+        )
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (
+                    parsedate_to_datetime(value) - datetime.now(timezone.utc)
+                ).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(self.max_backoff, max(0.0, delay))
+
+
+class HttpClientManager:
+    """Owns the process-wide httpx.AsyncClient used for all Google traffic"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def create_client(self) -> httpx.AsyncClient:
+        """Build a pooled, HTTP/2-capable client with retrying transport"""
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        transport = RetryTransport(
+            httpx.AsyncHTTPTransport(http2=settings.HTTP_HTTP2, limits=limits),
+            max_retries=settings.HTTP_MAX_RETRIES,
+            backoff_factor=settings.HTTP_RETRY_BACKOFF,
+            on_retry=quota_limiter.charge_retry,
+        )
+        timeout = httpx.Timeout(
+            settings.HTTP_READ_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        )
+        return httpx.AsyncClient(transport=transport, timeout=timeout)
+
+    async def start(self):
+        """Create the shared client (called from the FastAPI lifespan)"""
+        if self._client is None:
+            self._client = self.create_client()
+
+    async def close(self):
+        """Close the shared client and its connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use outside the app lifespan"""
+        if self._client is None:
+            self._client = self.create_client()
+        return self._client
+
+
+# Create singleton instance
+http_client = HttpClientManager()
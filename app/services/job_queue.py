@@ -0,0 +1,162 @@
+import json
+import time
+from typing import Dict, Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# Queue a job unless the same job is already pending (the lease key)
+ENQUEUE_SCRIPT = """
+if not redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[3]) then
+    return 0
+end
+if redis.call('RPUSH', KEYS[2], ARGV[1]) == 1 then
+    redis.call('RPUSH', KEYS[3], ARGV[2])
+end
+return 1
+"""
+
+# Take one job from the user at the head of the ring, then rotate that user
+# to the back if they still have work queued
+DEQUEUE_SCRIPT = """
+local user_id = redis.call('LPOP', KEYS[1])
+if not user_id then
+    return false
+end
+local user_queue = ARGV[1] .. user_id
+local job = redis.call('LPOP', user_queue)
+if redis.call('LLEN', user_queue) > 0 then
+    redis.call('RPUSH', KEYS[1], user_id)
+end
+return job
+"""
+
+# Move delayed jobs whose run-at time has passed onto their users' queues
+PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    local user_id = cjson.decode(job)['user_id']
+    if redis.call('RPUSH', ARGV[2] .. user_id, job) == 1 then
+        redis.call('RPUSH', KEYS[2], user_id)
+    end
+end
+return #due
+"""
+
+
+class JobQueue:
+    """Redis job queue that serves users round-robin
+
+    Each user has their own list of jobs and a ring of users with pending
+    work hands out one job per user per turn, so a user with many queued
+    jobs can't starve everyone else. A job ID ("type:user_id") is only
+    queued once until it completes or its lease expires.
+    """
+
+    KEY_PREFIX = "spytube:jobs:v1:"
+
+    def __init__(self, redis_url: str, lease_seconds: int):
+        self.redis_url = redis_url
+        self.lease_seconds = lease_seconds
+        self._redis: Optional[redis.Redis] = None
+
+        self.ready_key = f"{self.KEY_PREFIX}ready"
+        self.delayed_key = f"{self.KEY_PREFIX}delayed"
+        self.user_prefix = f"{self.KEY_PREFIX}user:"
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.from_url(self.redis_url)
+            self._enqueue = self._redis.register_script(ENQUEUE_SCRIPT)
+            self._dequeue = self._redis.register_script(DEQUEUE_SCRIPT)
+            self._promote = self._redis.register_script(PROMOTE_SCRIPT)
+        return self._redis
+
+    def _lease_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}lease:{job_id}"
+
+    async def enqueue(self, job_type: str, user_id: str) -> bool:
+        """Queue a job for a user; False if that job is already pending"""
+        job = {
+            "id": f"{job_type}:{user_id}",
+            "type": job_type,
+            "user_id": user_id,
+            "attempt": 0,
+            "enqueued_at": time.time(),
+        }
+        client = self.client
+        added = await self._enqueue(
+            keys=[
+                self._lease_key(job["id"]),
+                f"{self.user_prefix}{user_id}",
+                self.ready_key,
+            ],
+            args=[json.dumps(job), user_id, self.lease_seconds],
+            client=client,
+        )
+        return bool(added)
+
+    async def dequeue(self) -> Optional[Dict]:
+        """Claim the next job in round-robin user order, or None if idle"""
+        client = self.client
+        raw = await self._dequeue(
+            keys=[self.ready_key], args=[self.user_prefix], client=client
+        )
+        if raw is None:
+            return None
+        # Claiming renews the lease for the time the job may take to run
+        job = json.loads(raw)
+        await client.expire(self._lease_key(job["id"]), self.lease_seconds)
+        return job
+
+    async def retry(self, job: Dict, delay: float):
+        """Re-queue a failed job to run again after delay seconds"""
+        job = {**job, "attempt": job["attempt"] + 1}
+        client = self.client
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.expire(self._lease_key(job["id"]), self.lease_seconds + int(delay))
+            pipe.zadd(self.delayed_key, {json.dumps(job): time.time() + delay})
+            await pipe.execute()
+
+    async def complete(self, job: Dict):
+        """Release a finished (or abandoned) job so it can be queued again"""
+        await self.client.delete(self._lease_key(job["id"]))
+
+    async def promote_due(self, limit: int = 100) -> int:
+        """Move due retries back onto the queue; returns how many moved"""
+        client = self.client
+        return await self._promote(
+            keys=[self.delayed_key, self.ready_key],
+            args=[time.time(), self.user_prefix, limit],
+            client=client,
+        )
+
+    async def acquire_lock(self, name: str, ttl: int) -> bool:
+        """Take a named lock for ttl seconds if no one else holds it"""
+        return bool(
+            await self.client.set(f"{self.KEY_PREFIX}lock:{name}", "1", nx=True, ex=ttl)
+        )
+
+    async def size(self) -> Dict[str, int]:
+        """Users with ready jobs and delayed retries waiting"""
+        client = self.client
+        return {
+            "ready_users": await client.llen(self.ready_key),
+            "delayed": await client.zcard(self.delayed_key),
+        }
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Create singleton instance
+job_queue = JobQueue(
+    redis_url=settings.REDIS_URL,
+    lease_seconds=settings.WORKER_JOB_LEASE_SECONDS,
+)
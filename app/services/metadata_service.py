@@ -0,0 +1,218 @@
+"""
+Cross-user cache of public video and channel metadata, keyed by ID.
+
+videos.list and channels.list return the same public data whoever asks, so
+with YOUTUBE_API_KEY set it is fetched once with the key (50 IDs per call)
+and shared by every user whose dashboard lists the same videos or channel.
+Each part is kept for its own TTL: statistics go stale in minutes,
+contentDetails (duration, definition, uploads playlist) practically never,
+the rest (snippet, status, ...) in between.
+
+IDs the key cannot see (private videos) are fetched with the user's own
+token by the caller's fallback and never enter the shared cache. So is
+everything without a usable cached copy when a keyed call fails.
+"""
+
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import METADATA_LOOKUPS, observe_upstream
+from app.services.cache_service import CacheService, cache_service
+from app.services.quota_service import (
+    INTERACTIVE,
+    YOUTUBE_DATA_API,
+    QuotaLimiter,
+    quota_limiter,
+)
+from app.services.request_scheduler import (
+    RequestScheduler,
+    gather_dict,
+    request_scheduler,
+)
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_DATA_URL = settings.YOUTUBE_DATA_URL or "https://www.googleapis.com/youtube/v3"
+
+VIDEO_PARTS = (
+    "snippet",
+    "statistics",
+    "contentDetails",
+    "status",
+    "topicDetails",
+    "localizations",
+)
+CHANNEL_PARTS = ("snippet", "statistics", "brandingSettings", "contentDetails")
+# IDs per videos.list / channels.list call
+BATCH_SIZE = 50
+
+# {"item": {"id": ..., part: value, ...}, "fetchedAt": {part: timestamp}}
+MetadataEntry = Dict[str, Dict]
+
+
+class MetadataService:
+    """Shared, per-part TTL cache of videos.list / channels.list items"""
+
+    KEY_PREFIX = "spytube:meta:v1:"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[CacheService] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        quota: Optional[QuotaLimiter] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.api_key = settings.YOUTUBE_API_KEY if api_key is None else api_key
+        self.cache = cache or cache_service
+        self.scheduler = scheduler or request_scheduler
+        self.quota = quota or quota_limiter
+        self.enabled = bool(
+            self.api_key
+            and (settings.METADATA_CACHE_ENABLED if enabled is None else enabled)
+        )
+        self.part_ttls = {
+            "statistics": settings.METADATA_STATISTICS_TTL_SECONDS,
+            "contentDetails": settings.METADATA_IMMUTABLE_TTL_SECONDS,
+        }
+
+    def part_ttl(self, part: str) -> int:
+        return self.part_ttls.get(part, settings.METADATA_TTL_SECONDS)
+
+    def key(self, resource: str, item_id: str) -> str:
+        return f"{self.KEY_PREFIX}{resource}:{item_id}"
+
+    async def list(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        resource: str,
+        ids: Sequence[str],
+        parts: Sequence[str],
+        fallback: Callable[[List[str]], Awaitable[Dict]],
+        priority: str = INTERACTIVE,
+    ) -> Dict:
+        """A videos.list / channels.list response for ids, in ids order
+
+        Cached parts still within their TTL are reused; the stale or missing
+        ones are fetched with the API key in batches of BATCH_SIZE IDs. IDs
+        the key does not return go to fallback (the user's own listing) and
+        are left out of the shared cache. If a keyed call fails, its IDs keep
+        their stale parts, or go to fallback when they have none.
+        """
+        keys = {item_id: self.key(resource, item_id) for item_id in ids}
+        cached = await self.cache.get_many(list(keys.values()))
+        now = time.time()
+
+        entries: Dict[str, MetadataEntry] = {}
+        # stale parts -> IDs needing exactly those parts
+        stale: Dict[Tuple[str, ...], List[str]] = {}
+        for item_id, key in keys.items():
+            entry = cached.get(key) or {"item": {"id": item_id}, "fetchedAt": {}}
+            entries[item_id] = entry
+            missing = tuple(
+                part
+                for part in parts
+                if now - entry["fetchedAt"].get(part, 0) >= self.part_ttl(part)
+            )
+            if missing:
+                stale.setdefault(missing, []).append(item_id)
+        METADATA_LOOKUPS.labels(resource, "hit").inc(
+            len(keys) - sum(map(len, stale.values()))
+        )
+        METADATA_LOOKUPS.labels(resource, "miss").inc(sum(map(len, stale.values())))
+
+        calls = {}
+        for missing, stale_ids in stale.items():
+            for start in range(0, len(stale_ids), BATCH_SIZE):
+                calls[missing, start] = self._fetch(
+                    client,
+                    user_id,
+                    resource,
+                    stale_ids[start : start + BATCH_SIZE],
+                    missing,
+                    priority,
+                )
+        results, errors = await gather_dict(calls)
+        for (missing, _), error in errors.items():
+            logger.warning(
+                "Keyed %s lookup of %s failed: %r", resource, ",".join(missing), error
+            )
+
+        fresh: Dict[str, MetadataEntry] = {}
+        for (missing, _), response in results.items():
+            for item in response.get("items", []):
+                entry = entries.get(item["id"])
+                if entry is None:
+                    continue
+                for part in missing:
+                    # A part absent from the item (no localizations) is cached too
+                    if part in item:
+                        entry["item"][part] = item[part]
+                    else:
+                        entry["item"].pop(part, None)
+                    entry["fetchedAt"][part] = now
+                fresh[keys[item["id"]]] = entry
+        await self.cache.set_many(fresh, ttl=max(self.part_ttl(part) for part in parts))
+
+        items = {}
+        unseen = []
+        for item_id, entry in entries.items():
+            if all(part in entry["fetchedAt"] for part in parts):
+                items[item_id] = {
+                    "id": item_id,
+                    **{
+                        part: entry["item"][part]
+                        for part in parts
+                        if part in entry["item"]
+                    },
+                }
+            else:
+                unseen.append(item_id)
+        if unseen:
+            for item in (await fallback(unseen)).get("items", []):
+                items[item["id"]] = item
+
+        return {"items": [items[item_id] for item_id in ids if item_id in items]}
+
+    def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        user_id: str,
+        resource: str,
+        ids: List[str],
+        parts: Sequence[str],
+        priority: str,
+    ) -> Callable[[], Awaitable[Dict]]:
+        """One keyed list call for up to BATCH_SIZE IDs, under quota and scheduler"""
+        params = {"part": ",".join(parts), "id": ",".join(ids), "key": self.api_key}
+
+        async def call() -> Dict:
+            await self.quota.acquire(YOUTUBE_DATA_API, resource, priority)
+            response = await self.scheduler.run(
+                user_id,
+                lambda: observe_upstream(
+                    YOUTUBE_DATA_API,
+                    resource,
+                    "",
+                    client.get(
+                        f"{YOUTUBE_DATA_URL}/{resource}",
+                        params=params,
+                        extensions=self.quota.extensions(
+                            YOUTUBE_DATA_API, resource, priority
+                        ),
+                    ),
+                ),
+            )
+            response.raise_for_status()
+            return response.json()
+
+        return call
+
+
+# Create singleton instance
+metadata_service = MetadataService()
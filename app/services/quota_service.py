@@ -0,0 +1,291 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import httpx
+import redis.asyncio as redis
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+YOUTUBE_DATA_API = "youtube"
+YOUTUBE_ANALYTICS_API = "youtubeAnalytics"
+
+# Quota units per call; youtube/v3 list calls cost 1 and search costs 100
+QUOTA_COSTS: Dict[Tuple[str, str], int] = {
+    (YOUTUBE_DATA_API, "channels"): 1,
+    (YOUTUBE_DATA_API, "playlists"): 1,
+    (YOUTUBE_DATA_API, "playlistItems"): 1,
+    (YOUTUBE_DATA_API, "videos"): 1,
+    (YOUTUBE_DATA_API, "search"): 100,
+    (YOUTUBE_ANALYTICS_API, "reports"): 1,
+}
+DEFAULT_COST = 1
+
+# httpx request extension carrying the (api, resource, priority) a call is
+# charged to, so RetryTransport can charge each resent attempt as well
+QUOTA_EXTENSION = "spytube.quota"
+
+# Take cost units from an API's token bucket and daily counter, atomically.
+# Returns {1, used_today, tokens_left} when granted, {0, seconds_to_wait,
+# tokens_left} when the bucket is too low for this priority and {-1, used_today}
+# when the daily budget is gone.
+ACQUIRE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+local daily_limit = tonumber(ARGV[5])
+
+local used = tonumber(redis.call('GET', KEYS[2]) or '0')
+if used + cost > daily_limit then
+    return {-1, tostring(used)}
+end
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+if tokens - cost < floor then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    return {0, tostring((cost + floor - tokens) / rate), tostring(tokens)}
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - cost), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+used = redis.call('INCRBY', KEYS[2], cost)
+redis.call('EXPIRE', KEYS[2], ARGV[6])
+return {1, tostring(used), tostring(tokens - cost)}
+"""
+
+# Bucket level and units used today, without taking anything
+PEEK_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+return {tostring(tokens), redis.call('GET', KEYS[2]) or '0'}
+"""
+
+
+class QuotaLimiter:
+    """Token-bucket limiter and daily budget for YouTube API quota units
+
+    State lives in Redis so every API process and worker draws from the same
+    buckets. Background callers stop short of a reserved share of both the
+    bucket and the daily budget, which keeps headroom for interactive requests.
+    """
+
+    KEY_PREFIX = "spytube:quota:v1:"
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        daily_limits: Dict[str, int],
+        burst: int,
+        refill_per_second: float,
+        background_reserve: float,
+        max_wait: Dict[str, float],
+        reset_utc_offset_hours: int = -8,
+        redis_retry_seconds: float = 30.0,
+        enabled: bool = True,
+    ):
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self.daily_limits = daily_limits
+        self.burst = burst
+        self.refill_per_second = refill_per_second
+        self.background_reserve = background_reserve
+        self.max_wait = max_wait
+        self.reset_utc_offset_hours = reset_utc_offset_hours
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self._redis: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+
+        # Last bucket level and daily units used seen per API, for metrics
+        self.levels: Dict[str, Dict[str, float]] = {}
+
+        self.stats = {
+            "granted": 0,
+            "units": 0,
+            "waits": 0,
+            "rejected": 0,
+            "redis_errors": 0,
+        }
+
+    @staticmethod
+    def cost_for(api: str, resource: str) -> int:
+        """Quota units charged for one call to an API resource"""
+        return QUOTA_COSTS.get((api, resource), DEFAULT_COST)
+
+    def _quota_day(self) -> str:
+        # Date in the timezone the daily budget rolls over in
+        now = datetime.utcnow() + timedelta(hours=self.reset_utc_offset_hours)
+        return now.date().isoformat()
+
+    def _keys(self, api: str):
+        return [
+            f"{self.KEY_PREFIX}bucket:{api}",
+            f"{self.KEY_PREFIX}daily:{api}:{self._quota_day()}",
+        ]
+
+    def _get_redis_client(self) -> Optional[redis.Redis]:
+        if not self.redis_url or time.time() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = redis.from_url(
+                self.redis_url, socket_connect_timeout=1, socket_timeout=1
+            )
+            self._acquire = self._redis.register_script(ACQUIRE_SCRIPT)
+            self._peek = self._redis.register_script(PEEK_SCRIPT)
+        return self._redis
+
+    @staticmethod
+    def extensions(api: str, resource: str, priority: str) -> Dict:
+        """Request extensions that charge retried attempts to the same quota"""
+        return {QUOTA_EXTENSION: (api, resource, priority)}
+
+    def _record(self, api: str, **levels: float):
+        self.levels.setdefault(api, {}).update(levels)
+
+    def _mark_redis_down(self):
+        # Fail open: a Redis outage shouldn't take the dashboard down with it
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.time() + self.redis_retry_seconds
+
+    async def acquire(self, api: str, resource: str, priority: str = INTERACTIVE):
+        """Wait until the call's quota cost can be spent at this priority
+
+        Raises a 429 HTTPException when the daily budget is exhausted or the
+        bucket doesn't refill within the priority's maximum wait.
+        """
+        if not self.enabled:
+            return
+
+        cost = self.cost_for(api, resource)
+        daily_limit = self.daily_limits[api]
+        floor = 0.0
+        if priority == BACKGROUND:
+            floor = self.burst * self.background_reserve
+            daily_limit = int(daily_limit * (1 - self.background_reserve))
+
+        deadline = time.monotonic() + self.max_wait[priority]
+        while True:
+            client = self._get_redis_client()
+            if client is None:
+                return
+            try:
+                granted, value, *tokens = await self._acquire(
+                    keys=self._keys(api),
+                    args=[
+                        self.burst,
+                        self.refill_per_second,
+                        cost,
+                        floor,
+                        daily_limit,
+                        2 * 24 * 3600,
+                    ],
+                    client=client,
+                )
+            except (RedisError, OSError):
+                self._mark_redis_down()
+                return
+
+            if int(granted) == 1:
+                self.stats["granted"] += 1
+                self.stats["units"] += cost
+                self._record(api, used=int(value), tokens=float(tokens[0]))
+                return
+            if int(granted) == -1:
+                self.stats["rejected"] += 1
+                self._record(api, used=int(value))
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"Daily {api} API quota exhausted",
+                )
+
+            wait = float(value)
+            self._record(api, tokens=float(tokens[0]))
+            if time.monotonic() + wait > deadline:
+                self.stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=f"{api} API rate limit reached, retry shortly",
+                    headers={"Retry-After": str(max(1, int(wait + 0.5)))},
+                )
+            self.stats["waits"] += 1
+            await asyncio.sleep(wait)
+
+    async def charge_retry(self, request: httpx.Request):
+        """RetryTransport hook: charge a resent attempt like the first one
+
+        Google bills every call that reaches it, failed or not. Requests sent
+        without quota extensions (token refreshes, user info) are free.
+        """
+        charge = request.extensions.get(QUOTA_EXTENSION)
+        if charge is not None:
+            await self.acquire(*charge)
+
+    async def snapshot(self) -> Dict[str, Dict]:
+        """Remaining bucket tokens and daily units per API, plus local counters"""
+        apis = {}
+        client = self._get_redis_client() if self.enabled else None
+        for api, daily_limit in self.daily_limits.items():
+            tokens, used = float(self.burst), 0
+            if client is not None:
+                try:
+                    raw_tokens, raw_used = await self._peek(
+                        keys=self._keys(api),
+                        args=[self.burst, self.refill_per_second],
+                        client=client,
+                    )
+                    tokens, used = float(raw_tokens), int(raw_used)
+                    self._record(api, used=used, tokens=tokens)
+                except (RedisError, OSError):
+                    self._mark_redis_down()
+            apis[api] = {
+                "bucketTokens": round(tokens, 2),
+                "bucketCapacity": self.burst,
+                "dailyUsed": used,
+                "dailyLimit": daily_limit,
+                "dailyRemaining": max(0, daily_limit - used),
+            }
+        return {"apis": apis, "stats": dict(self.stats)}
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+# Create singleton instance
+quota_limiter = QuotaLimiter(
+    redis_url=settings.REDIS_URL,
+    daily_limits={
+        YOUTUBE_DATA_API: settings.QUOTA_YOUTUBE_DAILY_UNITS,
+        YOUTUBE_ANALYTICS_API: settings.QUOTA_ANALYTICS_DAILY_UNITS,
+    },
+    burst=settings.QUOTA_BURST_UNITS,
+    refill_per_second=settings.QUOTA_REFILL_UNITS_PER_SECOND,
+    background_reserve=settings.QUOTA_BACKGROUND_RESERVE,
+    max_wait={
+        INTERACTIVE: settings.QUOTA_INTERACTIVE_MAX_WAIT_SECONDS,
+        BACKGROUND: settings.QUOTA_BACKGROUND_MAX_WAIT_SECONDS,
+    },
+    reset_utc_offset_hours=settings.QUOTA_RESET_UTC_OFFSET_HOURS,
+    enabled=settings.QUOTA_ENABLED,
+)
@@ -0,0 +1,123 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Tuple,
+    TypeVar,
+)
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class RequestScheduler:
+    """Bounded-concurrency scheduler for outbound YouTube API requests"""
+
+    def __init__(self, max_concurrency: int, per_user_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.per_user_concurrency = per_user_concurrency
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._user_slots: Dict[str, asyncio.Semaphore] = {}
+        self._user_refs: Dict[str, int] = {}
+
+    async def run(self, user_id: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a single call once both a per-user and a global slot are free"""
+        slot = self._user_slots.get(user_id)
+        if slot is None:
+            slot = self._user_slots[user_id] = asyncio.Semaphore(
+                self.per_user_concurrency
+            )
+        self._user_refs[user_id] = self._user_refs.get(user_id, 0) + 1
+
+        try:
+            # Take the per-user slot first so a busy user never holds
+            # global slots while waiting on their own limit
+            async with slot:
+                async with self._global:
+                    return await call()
+        finally:
+            self._user_refs[user_id] -= 1
+            if self._user_refs[user_id] == 0:
+                del self._user_refs[user_id]
+                del self._user_slots[user_id]
+
+
+async def gather_dict(
+    calls: Dict[Hashable, Callable[[], Awaitable[Any]]]
+) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Exception]]:
+    """Run calls concurrently, returning (results, errors) keyed like calls"""
+    keys = list(calls)
+    outcomes = await asyncio.gather(
+        *(calls[key]() for key in keys), return_exceptions=True
+    )
+
+    results: Dict[Hashable, Any] = {}
+    errors: Dict[Hashable, Exception] = {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, Exception):
+            errors[key] = outcome
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[key] = outcome
+
+    return results, errors
+
+
+async def prefetch(source: AsyncIterator[T], depth: int = 1) -> AsyncIterator[T]:
+    """Run an async iterator up to depth items ahead of its consumer
+
+    While the caller processes item N, item N+1 is already being produced,
+    so a pipeline of pages overlaps its fetches with downstream work.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put((item, None))
+            await queue.put((_DONE, None))
+        except Exception as e:
+            await queue.put((_DONE, e))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+
+async def rebatch(pages: AsyncIterator[List[T]], size: int) -> AsyncIterator[List[T]]:
+    """Regroup a stream of pages into lists of up to size items"""
+    batch: List[T] = []
+    async for page in pages:
+        batch.extend(page)
+        while len(batch) >= size:
+            yield batch[:size]
+            batch = batch[size:]
+    if batch:
+        yield batch
+
+
+# Create singleton instance
+request_scheduler = RequestScheduler(
+    max_concurrency=settings.YOUTUBE_MAX_CONCURRENCY,
+    per_user_concurrency=settings.YOUTUBE_PER_USER_CONCURRENCY,
+)
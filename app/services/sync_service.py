@@ -0,0 +1,124 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.sync_state import SyncState
+
+DAILY_REPORT = "daily"
+
+# (video_id, report) -> SyncState, with video_id "" for the channel itself
+SyncStates = Dict[Tuple[str, str], SyncState]
+Window = Tuple[date, date]
+
+
+class SyncService:
+    """Tracks which days of each daily report are already in the warehouse"""
+
+    def __init__(
+        self, channel_history_days: int, video_history_days: int, restatement_days: int
+    ):
+        self.channel_history_days = channel_history_days
+        self.video_history_days = video_history_days
+        # Google keeps revising the last few days (late views, revenue
+        # adjustments), so those are re-fetched on every sync
+        self.restatement_days = max(1, restatement_days)
+
+    async def load_states(self, db: AsyncSession, channel_id: str) -> SyncStates:
+        """All high-water marks recorded for a channel and its videos"""
+        result = await db.execute(
+            select(SyncState).where(SyncState.channel_id == channel_id)
+        )
+        return {(state.video_id, state.report): state for state in result.scalars()}
+
+    def window(
+        self, state: Optional[SyncState], today: date, history_days: int
+    ) -> Window:
+        """Days to fetch so that [today - history_days, today] is fully synced"""
+        start = today - timedelta(days=history_days)
+        if (
+            state is not None
+            and state.synced_from <= start
+            and state.synced_through >= start
+        ):
+            # History is complete up to the mark; fetch only the new days plus
+            # the trailing days that may still be restated
+            start = max(
+                start,
+                state.synced_through - timedelta(days=self.restatement_days - 1),
+            )
+        return start, today
+
+    def channel_window(
+        self, states: SyncStates, today: date, report: str = DAILY_REPORT
+    ) -> Window:
+        return self.window(states.get(("", report)), today, self.channel_history_days)
+
+    def video_window(
+        self,
+        states: SyncStates,
+        video_id: str,
+        today: date,
+        report: str = DAILY_REPORT,
+    ) -> Window:
+        return self.window(
+            states.get((video_id, report)), today, self.video_history_days
+        )
+
+    async def mark_synced(
+        self,
+        db: AsyncSession,
+        channel_id: str,
+        windows: Dict[str, Window],
+        states: SyncStates,
+        report: str = DAILY_REPORT,
+    ):
+        """Advance the high-water marks for windows that were fetched and stored"""
+        if not windows:
+            return
+
+        now = datetime.utcnow()
+        rows = []
+        for video_id, (start, end) in windows.items():
+            state = states.get((video_id, report))
+            synced_from = start
+            if state is not None and state.synced_through >= start - timedelta(days=1):
+                # Contiguous with what was stored before, so the history extends
+                synced_from = min(state.synced_from, start)
+            rows.append(
+                {
+                    "channel_id": channel_id,
+                    "video_id": video_id,
+                    "report": report,
+                    "synced_from": synced_from,
+                    "synced_through": end,
+                    "updated_at": now,
+                }
+            )
+
+        statement = insert(SyncState).values(rows)
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[
+                    SyncState.channel_id,
+                    SyncState.video_id,
+                    SyncState.report,
+                ],
+                set_={
+                    "synced_from": statement.excluded.synced_from,
+                    "synced_through": statement.excluded.synced_through,
+                    "updated_at": statement.excluded.updated_at,
+                },
+            )
+        )
+
+
+# Create singleton instance
+sync_service = SyncService(
+    channel_history_days=settings.SYNC_CHANNEL_HISTORY_DAYS,
+    video_history_days=settings.SYNC_VIDEO_HISTORY_DAYS,
+    restatement_days=settings.SYNC_RESTATEMENT_DAYS,
+)
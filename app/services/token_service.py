@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import TOKEN_REFRESHES
+from app.services.auth_service import auth_service
+from app.utils.user_storage import user_storage
+
+logger = logging.getLogger(__name__)
+
+
+class TokenManager:
+    """Keeps users' Google access tokens fresh without refreshing on every call"""
+
+    def __init__(self, refresh_margin: int, proactive_window: int):
+        # Request paths refresh only inside refresh_margin seconds of expiry;
+        # the worker refreshes anything inside proactive_window first
+        self.refresh_margin = refresh_margin
+        self.proactive_window = proactive_window
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.refresh_count = 0
+
+    @staticmethod
+    def expires_within(tokens: Dict, seconds: float) -> bool:
+        """Whether the access token expires within the given number of seconds"""
+        expires_at = tokens.get("expires_at")
+        if expires_at is None or not tokens.get("access_token"):
+            # Tokens stored without an expiry are treated as expired
+            return True
+        return expires_at - time.time() <= seconds
+
+    async def get_access_token(self, user_id: str) -> str:
+        """Get a usable access token, refreshing only when it is about to expire"""
+        tokens = await user_storage.get_user_tokens(user_id)
+        return (await self.valid_tokens(user_id, tokens))["access_token"]
+
+    async def valid_tokens(self, user_id: str, tokens: Optional[Dict]) -> Dict:
+        """Already loaded tokens, or refreshed ones if they are about to expire"""
+        if not tokens:
+            raise HTTPException(status_code=401, detail="No token found")
+
+        if not self.expires_within(tokens, self.refresh_margin):
+            return tokens
+        return await self.refresh(user_id)
+
+    async def refresh(self, user_id: str) -> Dict:
+        """Refresh a user's tokens, coalescing concurrent refreshes into one call"""
+        future = self._inflight.get(user_id)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            tokens = await user_storage.get_user_tokens(user_id)
+            if not tokens or not tokens.get("refresh_token"):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="No refresh token available. Please re-authenticate.",
+                )
+
+            try:
+                refreshed = await auth_service.refresh_access_token(
+                    tokens["refresh_token"]
+                )
+            except Exception:
+                TOKEN_REFRESHES.labels("failed").inc()
+                raise
+            await user_storage.update_user_tokens(user_id, refreshed)
+            self.refresh_count += 1
+            TOKEN_REFRESHES.labels("refreshed").inc()
+
+            stored = await user_storage.get_user_tokens(user_id)
+            future.set_result(stored)
+            return stored
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._inflight[user_id]
+
+    async def refresh_expiring(self) -> int:
+        """Refresh every stored token that expires inside the proactive window
+
+        Run from the worker only, under its scheduling lock, so API processes
+        and other workers don't each walk every user.
+        """
+        expiring = await user_storage.list_expiring_tokens(
+            time.time() + self.proactive_window
+        )
+        refreshed = 0
+        for user_id in expiring:
+            try:
+                await self.refresh(user_id)
+                refreshed += 1
+            except Exception:
+                logger.warning("Proactive token refresh failed for user %s", user_id)
+        return refreshed
+
+
+# Create singleton instance
+token_manager = TokenManager(
+    refresh_margin=settings.TOKEN_REFRESH_MARGIN_SECONDS,
+    proactive_window=settings.TOKEN_PROACTIVE_REFRESH_SECONDS,
+)
@@ -0,0 +1,583 @@
+from datetime import date, datetime
+from itertools import repeat
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sqlalchemy import Date, and_, case, cast, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.channel import Channel, ChannelManager
+from app.models.video import DailyMetric, MetricRollup, Video
+from app.utils.helpers import parse_duration
+from app.utils.reports import ReportTable, row_decoder
+from app.utils.series import ROWS, DailySeries, Period, bucket_end, bucket_start
+
+# Analytics API metric name -> DailyMetric column
+METRIC_COLUMNS = {
+    "views": "views",
+    "estimatedMinutesWatched": "estimated_minutes_watched",
+    "estimatedRevenue": "estimated_revenue",
+    "estimatedAdRevenue": "estimated_ad_revenue",
+    "likes": "likes",
+    "comments": "comments",
+    "shares": "shares",
+    "subscribersGained": "subscribers_gained",
+    "subscribersLost": "subscribers_lost",
+    "cpm": "cpm",
+    "playbackBasedCpm": "playback_based_cpm",
+}
+FLOAT_COLUMNS = {
+    "estimated_revenue",
+    "estimated_ad_revenue",
+    "cpm",
+    "playback_based_cpm",
+}
+KEY_COLUMNS = ["channel_id", "video_id", "dimension", "dimension_value", "day"]
+# DailySeries metric (Analytics API name) -> stored expression
+SERIES_METRICS = {
+    "views": DailyMetric.views,
+    "estimatedMinutesWatched": DailyMetric.estimated_minutes_watched,
+    "estimatedRevenue": DailyMetric.estimated_revenue,
+    "estimatedAdRevenue": DailyMetric.estimated_ad_revenue,
+    "likes": DailyMetric.likes,
+    "comments": DailyMetric.comments,
+    "shares": DailyMetric.shares,
+    "subscribersGained": DailyMetric.subscribers_gained,
+    "subscribersLost": DailyMetric.subscribers_lost,
+    # View-weighted, so a window's CPM is the views-weighted daily average
+    "cpmViews": DailyMetric.cpm * DailyMetric.views,
+    "playbackBasedCpmViews": DailyMetric.playback_based_cpm * DailyMetric.views,
+}
+# ... and the MetricRollup column holding its per-bucket sum
+ROLLUP_COLUMNS = {
+    "views": MetricRollup.views,
+    "estimatedMinutesWatched": MetricRollup.estimated_minutes_watched,
+    "estimatedRevenue": MetricRollup.estimated_revenue,
+    "estimatedAdRevenue": MetricRollup.estimated_ad_revenue,
+    "likes": MetricRollup.likes,
+    "comments": MetricRollup.comments,
+    "shares": MetricRollup.shares,
+    "subscribersGained": MetricRollup.subscribers_gained,
+    "subscribersLost": MetricRollup.subscribers_lost,
+    "cpmViews": MetricRollup.cpm_views,
+    "playbackBasedCpmViews": MetricRollup.playback_based_cpm_views,
+}
+ROLLUP_KEY = ["channel_id", "video_id", "grain", "period_start"]
+ROLLUP_INSERT_COLUMNS = [
+    *ROLLUP_KEY,
+    "days",
+    *(ROLLUP_COLUMNS[name].key for name in SERIES_METRICS),
+]
+
+# Keeps each INSERT well under Postgres' 32767 bind parameter limit
+UPSERT_CHUNK_ROWS = 1000
+
+
+class WarehouseService:
+    """Persists Analytics API rows locally and serves dashboard series from SQL"""
+
+    async def upsert_channel(self, db: AsyncSession, user_id: str, channel: Dict):
+        """Insert or refresh a channel from a channels.list item
+
+        The syncing user is linked to the channel as one of its managers;
+        other users managing the same channel keep their access.
+        """
+        snippet = channel.get("snippet", {})
+        statistics = channel.get("statistics", {})
+        now = datetime.utcnow()
+        values = {
+            "id": channel["id"],
+            "title": snippet.get("title", ""),
+            "custom_url": snippet.get("customUrl"),
+            "uploads_playlist_id": channel.get("contentDetails", {})
+            .get("relatedPlaylists", {})
+            .get("uploads"),
+            "published_at": snippet.get("publishedAt"),
+            "view_count": int(statistics.get("viewCount", 0)),
+            "subscriber_count": int(statistics.get("subscriberCount", 0)),
+            "video_count": int(statistics.get("videoCount", 0)),
+            "updated_at": now,
+        }
+        statement = insert(Channel).values(**values)
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[Channel.id],
+                set_={key: statement.excluded[key] for key in values if key != "id"},
+            )
+        )
+        link = insert(ChannelManager).values(
+            user_id=user_id, channel_id=channel["id"], synced_at=now
+        )
+        await db.execute(
+            link.on_conflict_do_update(
+                index_elements=[ChannelManager.user_id, ChannelManager.channel_id],
+                set_={"synced_at": link.excluded.synced_at},
+            )
+        )
+
+    async def upsert_videos(
+        self, db: AsyncSession, channel_id: str, video_stats: List[Dict]
+    ):
+        """Bulk insert or refresh videos from videos.list items"""
+        now = datetime.utcnow()
+        rows = []
+        for video in video_stats:
+            snippet = video.get("snippet", {})
+            statistics = video.get("statistics", {})
+            rows.append(
+                {
+                    "id": video["id"],
+                    "channel_id": channel_id,
+                    "title": snippet.get("title", ""),
+                    "published_at": snippet.get("publishedAt"),
+                    "duration_seconds": parse_duration(
+                        video.get("contentDetails", {}).get("duration", "PT0S")
+                    ),
+                    "category_id": snippet.get("categoryId"),
+                    "view_count": int(statistics.get("viewCount", 0)),
+                    "like_count": int(statistics.get("likeCount", 0)),
+                    "comment_count": int(statistics.get("commentCount", 0)),
+                    "updated_at": now,
+                }
+            )
+
+        for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            statement = insert(Video).values(rows[start : start + UPSERT_CHUNK_ROWS])
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[Video.id],
+                    set_={
+                        key: statement.excluded[key] for key in rows[0] if key != "id"
+                    },
+                )
+            )
+
+    async def ingest_report(
+        self, db: AsyncSession, channel_id: str, report: Dict, video_id: str = ""
+    ) -> int:
+        """Bulk-upsert a report with a day dimension into daily_metrics"""
+        rows = self.report_rows(channel_id, report, video_id)
+        await self.upsert_daily_rows(db, rows)
+        return len(rows)
+
+    def report_rows(
+        self, channel_id: str, report: Dict, video_id: str = ""
+    ) -> List[Dict]:
+        """Convert a report with a day dimension into daily_metrics rows"""
+        table = ReportTable.from_report(report)
+        if "day" not in table:
+            raise ValueError("Only reports with a 'day' dimension can be ingested")
+
+        breakdown = [
+            header["name"]
+            for header in table.headers
+            if header.get("columnType") == "DIMENSION"
+            and header["name"] not in ("day", "video")
+        ]
+        if len(breakdown) > 1:
+            raise ValueError("At most one breakdown dimension besides day/video")
+        metrics = [
+            header["name"]
+            for header in table.headers
+            if header["name"] in METRIC_COLUMNS
+        ]
+        if not metrics:
+            return []
+
+        # Convert whole columns at once, then assemble the rows
+        columns = {
+            "channel_id": repeat(channel_id),
+            "video_id": (
+                table["video"].tolist() if "video" in table else repeat(video_id)
+            ),
+            "dimension": repeat(breakdown[0] if breakdown else ""),
+            "dimension_value": (
+                table[breakdown[0]].astype(str).tolist() if breakdown else repeat("")
+            ),
+            "day": map(date.fromisoformat, table["day"].tolist()),
+        }
+        for name in metrics:
+            column = METRIC_COLUMNS[name]
+            dtype = np.float64 if column in FLOAT_COLUMNS else np.int64
+            columns[column] = table[name].astype(dtype).tolist()
+
+        decode = row_decoder(tuple((key, index) for index, key in enumerate(columns)))
+        return list(map(decode, zip(*columns.values())))
+
+    async def upsert_daily_rows(self, db: AsyncSession, rows: List[Dict]):
+        """Bulk upsert daily_metrics rows, overwriting only the metrics supplied"""
+        if not rows:
+            return
+        metric_columns = [column for column in rows[0] if column not in KEY_COLUMNS]
+        for start in range(0, len(rows), UPSERT_CHUNK_ROWS):
+            statement = insert(DailyMetric).values(
+                rows[start : start + UPSERT_CHUNK_ROWS]
+            )
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=KEY_COLUMNS,
+                    set_={
+                        column: statement.excluded[column] for column in metric_columns
+                    },
+                )
+            )
+        await self.refresh_rollups(db, rows)
+
+    async def refresh_rollups(self, db: AsyncSession, rows: List[Dict]):
+        """Re-aggregate the week/month/year buckets that upserted daily rows fall in
+
+        Weeks and months are summed from daily_metrics and years from the
+        months, so a restated day only costs its own buckets.
+        """
+        spans: Dict[str, list] = {}
+        for row in rows:
+            if row["dimension"]:
+                continue
+            day = row["day"]
+            span = spans.setdefault(row["channel_id"], [set(), day, day])
+            span[0].add(row["video_id"])
+            span[1] = min(span[1], day)
+            span[2] = max(span[2], day)
+
+        for channel_id, (video_ids, first, last) in spans.items():
+            for grain in ("week", "month"):
+                await db.execute(
+                    self._rollup_days(channel_id, list(video_ids), grain, first, last)
+                )
+            await db.execute(
+                self._rollup_years(channel_id, list(video_ids), first, last)
+            )
+
+    def _rollup_days(
+        self, channel_id: str, video_ids: List[str], grain: str, first: date, last: date
+    ):
+        # Inline the grain: a bind parameter would make the GROUP BY
+        # expression differ from the selected one
+        bucket = cast(
+            func.date_trunc(literal_column(f"'{grain}'"), DailyMetric.day), Date
+        )
+        return self._upsert_rollups(
+            select(
+                DailyMetric.channel_id,
+                DailyMetric.video_id,
+                literal(grain),
+                bucket,
+                func.count(),
+                *(func.sum(expression) for expression in SERIES_METRICS.values()),
+            )
+            .where(
+                DailyMetric.channel_id == channel_id,
+                DailyMetric.dimension == "",
+                DailyMetric.video_id.in_(video_ids),
+                DailyMetric.day.between(
+                    bucket_start(first, grain), bucket_end(last, grain)
+                ),
+            )
+            .group_by(DailyMetric.channel_id, DailyMetric.video_id, bucket)
+        )
+
+    def _rollup_years(
+        self, channel_id: str, video_ids: List[str], first: date, last: date
+    ):
+        bucket = cast(
+            func.date_trunc(literal_column("'year'"), MetricRollup.period_start), Date
+        )
+        return self._upsert_rollups(
+            select(
+                MetricRollup.channel_id,
+                MetricRollup.video_id,
+                literal("year"),
+                bucket,
+                func.sum(MetricRollup.days),
+                *(func.sum(ROLLUP_COLUMNS[name]) for name in SERIES_METRICS),
+            )
+            .where(
+                MetricRollup.channel_id == channel_id,
+                MetricRollup.video_id.in_(video_ids),
+                MetricRollup.grain == "month",
+                MetricRollup.period_start.between(
+                    bucket_start(first, "year"), bucket_end(last, "year")
+                ),
+            )
+            .group_by(MetricRollup.channel_id, MetricRollup.video_id, bucket)
+        )
+
+    def _upsert_rollups(self, query):
+        statement = insert(MetricRollup).from_select(ROLLUP_INSERT_COLUMNS, query)
+        return statement.on_conflict_do_update(
+            index_elements=ROLLUP_KEY,
+            set_={
+                column: statement.excluded[column]
+                for column in ROLLUP_INSERT_COLUMNS
+                if column not in ROLLUP_KEY
+            },
+        )
+
+    def _totals(self, channel_id: str, video_ids: Optional[Iterable[str]] = None):
+        """Filter for un-broken-down rows of a channel or a set of its videos"""
+        conditions = [
+            DailyMetric.channel_id == channel_id,
+            DailyMetric.dimension == "",
+        ]
+        if video_ids is None:
+            conditions.append(DailyMetric.video_id == "")
+        else:
+            conditions.append(DailyMetric.video_id.in_(list(video_ids)))
+        return and_(*conditions)
+
+    async def channel_trend(
+        self, db: AsyncSession, channel_id: str, start: date, end: date
+    ) -> List[Dict]:
+        """Daily channel trend in the dashboard's trendData shape"""
+        result = await db.execute(
+            select(
+                DailyMetric.day,
+                DailyMetric.views,
+                DailyMetric.estimated_minutes_watched,
+                DailyMetric.estimated_revenue,
+                DailyMetric.subscribers_gained,
+            )
+            .where(self._totals(channel_id), DailyMetric.day.between(start, end))
+            .order_by(DailyMetric.day)
+        )
+        return [
+            {
+                "date": str(day),
+                "views": views,
+                "watchTime": minutes,
+                "revenue": revenue,
+                "subscribers": subscribers,
+            }
+            for day, views, minutes, revenue, subscribers in result
+        ]
+
+    async def daily_series(
+        self,
+        db: AsyncSession,
+        channel_id: str,
+        first: date,
+        last: date,
+    ) -> DailySeries:
+        """Stored daily channel totals as prefix sums, under the key """ ""
+        result = await db.execute(
+            select(
+                DailyMetric.video_id, DailyMetric.day, *SERIES_METRICS.values()
+            ).where(self._totals(channel_id), DailyMetric.day.between(first, last))
+        )
+        return DailySeries.from_rows(result.all(), list(SERIES_METRICS), first, last)
+
+    async def video_totals(
+        self,
+        db: AsyncSession,
+        channel_id: str,
+        metrics: Sequence[str],
+        periods: Sequence[Period],
+    ) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Every stored video's sum of each metric over each period
+
+        Summed in SQL, one row per video, rather than loaded day by day.
+        Returns the video IDs and, per metric, a (videos x periods) array.
+        """
+        sums = [
+            cast(
+                func.sum(
+                    case(
+                        (DailyMetric.day.between(first, last), SERIES_METRICS[metric]),
+                        else_=0,
+                    )
+                ),
+                SERIES_METRICS[metric].type,
+            )
+            for metric in metrics
+            for first, last in periods
+        ]
+        result = await db.execute(
+            select(DailyMetric.video_id, *sums)
+            .where(
+                DailyMetric.channel_id == channel_id,
+                DailyMetric.video_id != "",
+                DailyMetric.dimension == "",
+                DailyMetric.day.between(
+                    min(first for first, _ in periods), max(last for _, last in periods)
+                ),
+            )
+            .group_by(DailyMetric.video_id)
+        )
+        rows = result.all()
+        video_ids = [row[0] for row in rows]
+        totals = {}
+        for position, metric in enumerate(metrics):
+            start = 1 + position * len(periods)
+            column = np.array(
+                [row[start : start + len(periods)] for row in rows]
+            ).reshape(len(rows), len(periods))
+            if column.dtype.kind not in "if":
+                column = column.astype(np.float64)
+            totals[metric] = column
+        return video_ids, totals
+
+    def period_summary(
+        self, series: DailySeries, period: Period, key: str = ""
+    ) -> Dict:
+        """Summary over a period, in the Analytics API's CHANNEL_METRICS names
+
+        averageViewDuration is derived from watch time and CPMs are
+        view-weighted averages of the daily values.
+        """
+        if not series.total(ROWS, period, key):
+            # No stored days, same as an empty Analytics response
+            return {}
+
+        def total(metric: str):
+            return series.total(metric, period, key)
+
+        total_views = int(total("views"))
+        total_minutes = int(total("estimatedMinutesWatched"))
+        return {
+            "views": total_views,
+            "estimatedMinutesWatched": total_minutes,
+            "averageViewDuration": (
+                int(total_minutes * 60 / total_views) if total_views else 0
+            ),
+            "likes": int(total("likes")),
+            "subscribersGained": int(total("subscribersGained")),
+            "subscribersLost": int(total("subscribersLost")),
+            "estimatedRevenue": float(total("estimatedRevenue")),
+            "estimatedAdRevenue": float(total("estimatedAdRevenue")),
+            "cpm": total("cpmViews") / total_views if total_views else 0,
+            "playbackBasedCpm": (
+                total("playbackBasedCpmViews") / total_views if total_views else 0
+            ),
+        }
+
+    async def trend(
+        self,
+        db: AsyncSession,
+        channel_id: str,
+        grain: str,
+        first: date,
+        last: date,
+        metrics: List[str],
+        video_id: str = "",
+    ) -> List[Dict]:
+        """A channel's (or video's) metrics per day, week, month or year
+
+        Coarser grains read the rollup buckets overlapping [first, last]; they
+        are whole buckets, so the first and last may reach past the range.
+        """
+        if grain == "day":
+            key = DailyMetric.day
+            query = select(key, *(SERIES_METRICS[name] for name in metrics)).where(
+                self._totals(channel_id, [video_id] if video_id else None),
+                key.between(first, last),
+            )
+        else:
+            key = MetricRollup.period_start
+            query = select(key, *(ROLLUP_COLUMNS[name] for name in metrics)).where(
+                MetricRollup.channel_id == channel_id,
+                MetricRollup.video_id == video_id,
+                MetricRollup.grain == grain,
+                key.between(bucket_start(first, grain), last),
+            )
+        result = await db.execute(query.order_by(key))
+        return [{"date": str(row[0]), **dict(zip(metrics, row[1:]))} for row in result]
+
+    async def get_channel(
+        self, db: AsyncSession, user_id: str, channel_id: str
+    ) -> Optional[Channel]:
+        """A stored channel, if the user is one of its managers"""
+        result = await db.execute(
+            select(Channel)
+            .join(ChannelManager, ChannelManager.channel_id == Channel.id)
+            .where(Channel.id == channel_id, ChannelManager.user_id == user_id)
+        )
+        return result.scalar()
+
+    async def user_channel_id(self, db: AsyncSession, user_id: str) -> Optional[str]:
+        """The user's most recently synced channel"""
+        result = await db.execute(
+            select(ChannelManager.channel_id)
+            .where(ChannelManager.user_id == user_id)
+            .order_by(ChannelManager.synced_at.desc())
+            .limit(1)
+        )
+        return result.scalar()
+
+    async def video_trends(
+        self,
+        db: AsyncSession,
+        channel_id: str,
+        video_ids: List[str],
+        start: date,
+        end: date,
+    ) -> Dict[str, List[Dict]]:
+        """Daily per-video trends in the detailed_video trendData shape"""
+        trends: Dict[str, List[Dict]] = {video_id: [] for video_id in video_ids}
+        if not video_ids:
+            return trends
+
+        result = await db.execute(
+            select(
+                DailyMetric.video_id,
+                DailyMetric.day,
+                DailyMetric.views,
+                DailyMetric.estimated_minutes_watched,
+                DailyMetric.estimated_revenue,
+            )
+            .where(
+                self._totals(channel_id, video_ids), DailyMetric.day.between(start, end)
+            )
+            .order_by(DailyMetric.video_id, DailyMetric.day)
+        )
+        for video_id, day, views, minutes, revenue in result:
+            trends[video_id].append(
+                {
+                    "date": str(day),
+                    "views": views,
+                    "watchTime": minutes,
+                    "revenue": revenue,
+                }
+            )
+        return trends
+
+    async def top_videos(
+        self, db: AsyncSession, channel_id: str, start: date, end: date, limit: int = 10
+    ) -> List[Dict]:
+        """Top videos by views over a window, in the dashboard's topVideos shape"""
+        views = func.sum(DailyMetric.views).label("views")
+        result = await db.execute(
+            select(
+                DailyMetric.video_id,
+                views,
+                func.sum(DailyMetric.estimated_minutes_watched),
+                func.sum(DailyMetric.estimated_revenue),
+                func.sum(DailyMetric.likes),
+                func.sum(DailyMetric.comments),
+            )
+            .where(
+                DailyMetric.channel_id == channel_id,
+                DailyMetric.video_id != "",
+                DailyMetric.dimension == "",
+                DailyMetric.day.between(start, end),
+            )
+            .group_by(DailyMetric.video_id)
+            .order_by(views.desc())
+            .limit(limit)
+        )
+        return [
+            {
+                "videoId": video_id,
+                "views": int(total_views),
+                "watchTime": int(minutes),
+                "revenue": float(revenue),
+                "likes": int(likes),
+                "comments": int(comments),
+            }
+            for video_id, total_views, minutes, revenue, likes, comments in result
+        ]
+
+
+# Create singleton instance
+warehouse_service = WarehouseService()
@@ -0,0 +1,201 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+)
+
+# Video-dimension ("top videos") reports return at most 200 rows
+MAX_VIDEOS_PER_REPORT = 200
+
+# Breakdown dimensions that the Analytics API accepts alongside the video
+# dimension. Day, country, traffic source, demographic and retention reports
+# only aggregate across a multi-video filter, so those stay one report per video.
+VIDEO_BATCHABLE_DIMENSIONS = {()}
+
+VIDEO_FILTER = "video=="
+
+
+def _split_filters(filters: str) -> Tuple[str, str]:
+    """Split "video==<id>;other" into the single video ID and the other filters"""
+    video_id, others = "", []
+    for part in filters.split(";") if filters else []:
+        if part.startswith(VIDEO_FILTER):
+            video_id = part[len(VIDEO_FILTER) :]
+        else:
+            others.append(part)
+    return video_id, ";".join(others)
+
+
+class YouTubeService:
+    """Query planner that merges per-video Analytics reports into batch reports
+
+    Callers describe the reports they want per video (filters=video==<id>).
+    plan_reports() rewrites requests of the same shape into one physical
+    report with dimensions=video,... and filters=video==a,b,c, and
+    demultiplex() splits the rows back into per-video reports shaped
+    exactly like the single-video response.
+    """
+
+    def __init__(self, max_videos_per_report: int = MAX_VIDEOS_PER_REPORT):
+        self.max_videos_per_report = max_videos_per_report
+
+    def _batch_shape(self, params: Dict):
+        """Grouping key for a batchable request, or None if it must run alone"""
+        video_id, other_filters = _split_filters(params.get("filters", ""))
+        if not video_id or "," in video_id:
+            return None
+        dimensions = tuple(d for d in params.get("dimensions", "").split(",") if d)
+        if dimensions not in VIDEO_BATCHABLE_DIMENSIONS:
+            return None
+        if "sort" in params or "maxResults" in params:
+            # Those limit rows per video, which a merged report can't honour
+            return None
+        rest = tuple(
+            sorted(
+                (name, str(value))
+                for name, value in params.items()
+                if name != "filters"
+            )
+        )
+        return rest, other_filters
+
+    def plan_reports(self, requests: Dict[Hashable, Dict]) -> List[Dict]:
+        """Rewrite logical per-video requests into as few physical reports as possible
+
+        Each plan is {"params": ..., "targets": {video_id: [keys]}} for a
+        merged report, or {"params": ..., "key": key} for a pass-through.
+        """
+        plans: List[Dict] = []
+        batches: Dict[Tuple, Dict[str, List[Hashable]]] = {}
+        batch_params: Dict[Tuple, Dict] = {}
+
+        for key, params in requests.items():
+            shape = self._batch_shape(params)
+            if shape is None:
+                plans.append({"params": params, "key": key})
+                continue
+            video_id, _ = _split_filters(params["filters"])
+            batches.setdefault(shape, {}).setdefault(video_id, []).append(key)
+            batch_params.setdefault(shape, params)
+
+        for shape, targets in batches.items():
+            params = batch_params[shape]
+            _, other_filters = _split_filters(params["filters"])
+            dimensions = ",".join(
+                ["video"] + [d for d in params.get("dimensions", "").split(",") if d]
+            )
+            metrics = params["metrics"].split(",")
+            video_ids = list(targets)
+            for start in range(0, len(video_ids), self.max_videos_per_report):
+                chunk = video_ids[start : start + self.max_videos_per_report]
+                filters = VIDEO_FILTER + ",".join(chunk)
+                if other_filters:
+                    filters = f"{filters};{other_filters}"
+                plans.append(
+                    {
+                        "params": {
+                            **params,
+                            "dimensions": dimensions,
+                            "filters": filters,
+                            # Video-dimension reports require a sort order
+                            "sort": "-views"
+                            if "views" in metrics
+                            else f"-{metrics[0]}",
+                            "maxResults": len(chunk),
+                        },
+                        "targets": {video_id: targets[video_id] for video_id in chunk},
+                    }
+                )
+
+        return plans
+
+    def demultiplex(self, plan: Dict, report: Dict) -> Dict[Hashable, Dict]:
+        """Split a merged report's rows back into one report per logical key"""
+        if "targets" not in plan:
+            return {plan["key"]: report}
+
+        headers = report.get("columnHeaders", [])
+        names = [header["name"] for header in headers]
+        video_index = names.index("video")
+        single_headers = headers[:video_index] + headers[video_index + 1 :]
+
+        rows_by_video: Dict[str, List] = {video_id: [] for video_id in plan["targets"]}
+        for row in report.get("rows") or []:
+            rows = rows_by_video.get(row[video_index])
+            if rows is not None:
+                rows.append(row[:video_index] + row[video_index + 1 :])
+
+        results = {}
+        for video_id, keys in plan["targets"].items():
+            single = {
+                **report,
+                "columnHeaders": single_headers,
+                "rows": rows_by_video[video_id],
+            }
+            for key in keys:
+                results[key] = single
+        return results
+
+    def _plan_keys(self, plan: Dict) -> List[Hashable]:
+        if "targets" in plan:
+            return [key for keys in plan["targets"].values() for key in keys]
+        return [plan["key"]]
+
+    async def stream_reports(
+        self,
+        fetch: Callable[[Dict], Awaitable[Any]],
+        requests: Dict[Hashable, Dict],
+    ) -> AsyncIterator[Tuple[Hashable, Any, Optional[Exception]]]:
+        """Yield (key, report, error) for each logical request as soon as its
+        physical report completes"""
+        plans = self.plan_reports(requests)
+        tasks = {asyncio.ensure_future(fetch(plan["params"])): plan for plan in plans}
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    plan = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        for key, report in self.demultiplex(
+                            plan, task.result()
+                        ).items():
+                            yield key, report, None
+                    elif isinstance(error, Exception):
+                        for key in self._plan_keys(plan):
+                            yield key, None, error
+                    else:
+                        raise error
+        finally:
+            # The consumer stopped early (e.g. the client went away)
+            for task in tasks:
+                task.cancel()
+
+    async def fetch_reports(
+        self,
+        fetch: Callable[[Dict], Awaitable[Any]],
+        requests: Dict[Hashable, Dict],
+    ) -> Tuple[Dict[Hashable, Any], Dict[Hashable, Exception]]:
+        """Plan, fetch and demultiplex per-video requests, returning (results, errors)"""
+        results: Dict[Hashable, Any] = {}
+        errors: Dict[Hashable, Exception] = {}
+        async for key, report, error in self.stream_reports(fetch, requests):
+            if error is None:
+                results[key] = report
+            else:
+                errors[key] = error
+        return results, errors
+
+
+# Create singleton instance
+youtube_service = YouTubeService()
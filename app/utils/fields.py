@@ -0,0 +1,90 @@
+"""
+Sparse fieldsets: ?fields=channelData,detailed_videos.id,detailed_videos.trendData
+
+A spec is parsed into a tree of the requested keys, where None stands for
+"this key and everything under it". A tree of None selects the whole payload.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from app.schemas.video import Series
+
+FieldTree = Dict[str, Optional["FieldTree"]]
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FieldTree]:
+    """Parse a comma-separated list of dotted paths; None/"" selects everything"""
+    if not spec:
+        return None
+    tree: FieldTree = {}
+    for path in spec.split(","):
+        parts = [part for part in path.strip().split(".") if part]
+        node = tree
+        for depth, part in enumerate(parts):
+            if depth == len(parts) - 1:
+                # A shorter path selects the whole subtree and wins
+                node[part] = None
+                break
+            child = node.get(part, {})
+            if child is None:
+                break
+            node = node.setdefault(part, child)
+    return tree or None
+
+
+def parse_names(spec: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """Parse a comma-separated list of names, rejecting unknown ones with ValueError"""
+    if not spec:
+        return None
+    names = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown value(s): {', '.join(sorted(unknown))}")
+    return names
+
+
+def selects(tree: Optional[FieldTree], name: str) -> bool:
+    """Whether a key (or anything under it) is requested"""
+    return tree is None or name in tree
+
+
+def child(tree: Optional[FieldTree], name: str) -> Optional[FieldTree]:
+    """The requested subtree of a selected key (None: all of it)"""
+    return None if tree is None else tree[name]
+
+
+def prune(data: Any, tree: Optional[FieldTree]) -> Any:
+    """Keep only the requested keys of data, applying the tree to each list item"""
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [prune(item, tree) for item in data]
+    if isinstance(data, Series):
+        # Each row of a packed series is one list item
+        return data.select(tree)
+    if not isinstance(data, Mapping):
+        return data
+    return {
+        name: prune(data[name], subtree)
+        for name, subtree in tree.items()
+        if name in data
+    }
+
+
+def format_fields(tree: Optional[FieldTree]) -> str:
+    """Canonical spec of a tree (sorted paths), e.g. for cache keys"""
+    if tree is None:
+        return ""
+
+    def paths(node: FieldTree, prefix: str) -> List[str]:
+        result = []
+        for name, subtree in node.items():
+            path = f"{prefix}{name}"
+            if subtree is None:
+                result.append(path)
+            else:
+                result.extend(paths(subtree, f"{path}."))
+        return result
+
+    return ",".join(sorted(paths(tree, "")))
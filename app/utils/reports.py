@@ -0,0 +1,164 @@
+"""
+Header-driven, columnar decoding of YouTube Analytics API reports.
+
+A report arrives as columnHeaders plus a list of positional rows. ReportTable
+resolves every column by header name, so callers never index rows by
+position. Output dicts are built straight from the rows; a column is packed
+into a NumPy array (int64/float64 for metrics) only when it is first used
+in a whole-column operation such as a derived metric or a slice, and slices
+of packed columns are views rather than copies.
+"""
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Analytics API dataType -> array dtype (STRING columns become object arrays)
+DTYPES = {"INTEGER": np.int64, "FLOAT": np.float64, "CURRENCY": np.float64}
+
+
+def pack_column(values: Sequence, data_type: Optional[str]) -> np.ndarray:
+    """Pack one column's values into a typed array, reading nulls as 0"""
+    dtype = DTYPES.get(data_type or "")
+    if dtype is None:
+        if data_type is None:
+            # Header without a dataType: numeric if every value is a number
+            column = np.asarray(values)
+            if column.dtype.kind in "if":
+                return column
+        return np.fromiter(values, dtype=object, count=len(values))
+    try:
+        column = np.fromiter(values, dtype=dtype, count=len(values))
+    except TypeError:
+        # Nulls in an INTEGER column
+        return np.fromiter((value or 0 for value in values), dtype, len(values))
+    if dtype is np.float64:
+        # ... which a float column decodes as NaN
+        np.nan_to_num(column, copy=False)
+    return column
+
+
+@lru_cache(maxsize=256)
+def row_decoder(layout: Tuple[Tuple[str, Optional[int]], ...]) -> Callable:
+    """Build a row -> dict function for one (output key, column index) layout
+
+    One itemgetter pulls every column of a row at once; a None index
+    produces a constant 0. Keys keep the layout's order.
+    """
+    present = [(key, index) for key, index in layout if index is not None]
+    keys = tuple(key for key, _ in present)
+    if len(present) > 1:
+        values = itemgetter(*(index for _, index in present))
+    else:
+        # itemgetter of a single index returns the bare value, not a tuple
+        indices = [index for _, index in present]
+
+        def values(row: Sequence) -> Tuple:
+            return tuple(row[index] for index in indices)
+
+    if len(present) == len(layout):
+        return lambda row: dict(zip(keys, values(row)))
+
+    defaults = dict.fromkeys((key for key, _ in layout), 0)
+    return lambda row: {**defaults, **dict(zip(keys, values(row)))}
+
+
+def ratio(
+    numerator: np.ndarray, denominator: np.ndarray, scale: float = 1.0
+) -> np.ndarray:
+    """Element-wise numerator / denominator * scale, 0 where the denominator is 0"""
+    return np.divide(
+        numerator * scale,
+        denominator,
+        out=np.zeros(len(numerator), dtype=np.float64),
+        where=denominator != 0,
+    )
+
+
+class ReportTable:
+    """One Analytics API report, addressed by column name instead of position
+
+    Columns the report lacks read as zeros, so parsers don't depend on the
+    order (or presence) of the metrics they asked for.
+    """
+
+    __slots__ = ("headers", "rows", "_index", "_columns")
+
+    def __init__(self, headers: List[Dict], rows: List[List]):
+        self.headers = headers
+        self.rows = rows
+        self._index = {header["name"]: i for i, header in enumerate(headers)}
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_report(cls, report: Dict) -> "ReportTable":
+        return cls(report.get("columnHeaders") or [], report.get("rows") or [])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """A column as an array, packed on first access"""
+        column = self._columns.get(name)
+        if column is None:
+            index = self._index[name]
+            column = self._columns[name] = pack_column(
+                list(map(itemgetter(index), self.rows)),
+                self.headers[index].get("dataType"),
+            )
+        return column
+
+    def get(self, name: str, default=0) -> np.ndarray:
+        """A column by name, or a column of default values if the report lacks it"""
+        if name not in self._index:
+            return np.full(len(self.rows), default)
+        return self[name]
+
+    def slice(self, start: int, stop: Optional[int] = None) -> "ReportTable":
+        """Rows [start:stop]; columns packed so far carry over as views"""
+        table = ReportTable(self.headers, self.rows[start:stop])
+        table._columns = {
+            name: column[start:stop] for name, column in self._columns.items()
+        }
+        return table
+
+    def total(self, name: str):
+        """Sum of a metric column (0 if the report lacks it)"""
+        if name not in self._index:
+            return 0
+        return self[name].sum().item()
+
+    def _decoder(self, fields: Dict[str, str]) -> Callable[[Sequence], Dict]:
+        return row_decoder(
+            tuple((key, self._index.get(name)) for key, name in fields.items())
+        )
+
+    def records(self, fields: Dict[str, str]) -> List[Dict]:
+        """One dict per row, mapping each output key to the named column"""
+        return list(map(self._decoder(fields), self.rows))
+
+    def first(self, fields: Dict[str, str]) -> Dict:
+        """The first row as a dict like records(), or {} for an empty report"""
+        if not self.rows:
+            return {}
+        return self._decoder(fields)(self.rows[0])
+
+    # Derived metrics, computed a whole column at a time
+
+    def rpm(self) -> np.ndarray:
+        """Revenue per thousand views"""
+        return ratio(self.get("estimatedRevenue"), self.get("views"), 1000)
+
+    def engagement_rate(self) -> np.ndarray:
+        """(likes + comments + shares) per 100 views"""
+        interactions = self.get("likes") + self.get("comments") + self.get("shares")
+        return ratio(interactions, self.get("views"), 100)
+
+    def net_subscribers(self) -> np.ndarray:
+        """Subscribers gained minus subscribers lost"""
+        return self.get("subscribersGained") - self.get("subscribersLost")
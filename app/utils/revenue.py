@@ -0,0 +1,179 @@
+"""
+Vectorized revenue estimates from a loadable RPM table.
+
+RPM (revenue per 1000 views) ranges are looked up per (country, video
+category); the most specific entry wins: country and category, then country,
+then category, then the default. The table is resolved into a dense
+country x category array when it is built, so estimating any number of
+(video, country) rows is a handful of array operations.
+"""
+
+import json
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.reports import ratio
+
+WILDCARD = "*"
+BANDS = ("min", "avg", "max")
+# Analytics reports ISO 3166 country codes; the original table used "UK"
+COUNTRY_ALIASES = {"UK": "GB"}
+# Share of views assumed to be monetized
+MONETIZATION_RATE = 0.6
+
+# Industry-average ranges; entries without a country/category apply to any
+DEFAULT_RPM_RATES = [
+    {"country": "US", "min": 1.0, "avg": 2.5, "max": 5.0},
+    {"country": "GB", "min": 0.8, "avg": 2.0, "max": 4.0},
+    {"country": "CA", "min": 0.7, "avg": 1.8, "max": 3.5},
+    {"min": 0.3, "avg": 1.0, "max": 2.0},
+]
+
+
+def _country(name: str) -> str:
+    name = str(name).upper()
+    return COUNTRY_ALIASES.get(name, name)
+
+
+class RpmTable:
+    """RPM min/avg/max per (country, category), resolved into one array
+
+    Entries are dicts with "min", "avg" and "max" plus an optional "country"
+    (ISO code) and "category" (YouTube categoryId). One entry must have
+    neither: it is the fallback for everything else.
+    """
+
+    __slots__ = ("entries", "countries", "categories", "rates")
+
+    def __init__(self, entries: Iterable[Dict]):
+        self.entries = list(entries)
+        specific = {}
+        for entry in self.entries:
+            key = (
+                _country(entry.get("country", WILDCARD)),
+                str(entry.get("category", WILDCARD)),
+            )
+            specific[key] = [float(entry[band]) for band in BANDS]
+        if (WILDCARD, WILDCARD) not in specific:
+            raise ValueError("RPM table needs a default entry (no country or category)")
+
+        # Index 0 on either axis stands for "any other"
+        countries = sorted({country for country, _ in specific} - {WILDCARD})
+        categories = sorted({category for _, category in specific} - {WILDCARD})
+        self.countries = {name: i for i, name in enumerate(countries, 1)}
+        self.categories = {name: i for i, name in enumerate(categories, 1)}
+
+        self.rates = np.empty((len(countries) + 1, len(categories) + 1, len(BANDS)))
+        for country, i in [(WILDCARD, 0), *self.countries.items()]:
+            for category, j in [(WILDCARD, 0), *self.categories.items()]:
+                self.rates[i, j] = (
+                    specific.get((country, category))
+                    or specific.get((country, WILDCARD))
+                    or specific.get((WILDCARD, category))
+                    or specific[(WILDCARD, WILDCARD)]
+                )
+
+    @classmethod
+    def load(cls, path: str) -> "RpmTable":
+        """Read a JSON list of entries"""
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def extend(self, entries: Iterable[Dict]) -> "RpmTable":
+        """A new table with more entries; later ones replace earlier ones"""
+        return RpmTable([*self.entries, *entries])
+
+    def lookup(self, country: str, category: str = WILDCARD) -> Dict[str, float]:
+        """RPM range for one country/category"""
+        rates = self.rates[
+            self.countries.get(_country(country), 0),
+            self.categories.get(str(category), 0),
+        ]
+        return dict(zip(BANDS, rates.tolist()))
+
+    def rates_for(
+        self,
+        countries: Sequence[str],
+        categories: Union[None, str, Sequence[str]] = None,
+    ) -> np.ndarray:
+        """(rows, 3) array of min/avg/max RPM, one row per country/category pair"""
+        country_index = self._index(countries, self.countries, _country)
+        if categories is None or isinstance(categories, str):
+            category_index = self.categories.get(categories or WILDCARD, 0)
+        else:
+            category_index = self._index(categories, self.categories, str)
+        return self.rates[country_index, category_index]
+
+    @staticmethod
+    def _index(names: Sequence[str], index: Dict[str, int], normalize) -> np.ndarray:
+        # Resolve each distinct name once, then broadcast back to the rows
+        unique, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        codes = np.fromiter(
+            (index.get(normalize(name), 0) for name in unique.tolist()),
+            dtype=np.intp,
+            count=len(unique),
+        )
+        return codes[inverse]
+
+
+@lru_cache(maxsize=1)
+def rpm_table() -> RpmTable:
+    """The configured table: RPM_TABLE_PATH if set, else the defaults"""
+    if settings.RPM_TABLE_PATH:
+        return RpmTable.load(settings.RPM_TABLE_PATH)
+    return RpmTable(DEFAULT_RPM_RATES)
+
+
+def estimate_revenue(
+    views: Sequence[float],
+    watch_time_minutes: Sequence[float],
+    countries: Sequence[str],
+    categories: Union[None, str, Sequence[str]] = None,
+    groups: Optional[Sequence[int]] = None,
+    table: Optional[RpmTable] = None,
+) -> Dict[str, np.ndarray]:
+    """Estimate revenue for many (views, watch time, country[, category]) rows at once
+
+    Returns arrays of min/avg/max revenue and views/watch time per row, or
+    summed per group when groups (e.g. a video index per row) is given, plus
+    the engagement multiplier of calculate_estimated_revenue.
+    """
+    table = table or rpm_table()
+    views = np.asarray(views, dtype=np.float64)
+    watch_time = np.asarray(watch_time_minutes, dtype=np.float64)
+    revenue = table.rates_for(countries, categories) * (views / 1000)[:, None]
+
+    columns = {
+        "min": revenue[:, 0],
+        "avg": revenue[:, 1],
+        "max": revenue[:, 2],
+        "views": views,
+        "watchTime": watch_time,
+    }
+    if groups is not None:
+        groups = np.asarray(groups, dtype=np.intp)
+        size = int(groups.max()) + 1 if len(groups) else 0
+        columns = {
+            name: np.bincount(groups, weights=column, minlength=size)
+            for name, column in columns.items()
+        }
+
+    views = columns["views"]
+    columns["monetizableViews"] = (views * MONETIZATION_RATE).astype(np.int64)
+    columns["engagementMultiplier"] = np.where(
+        views > 0, np.minimum(2.0, ratio(columns["watchTime"], views, 1 / 3)), 1.0
+    )
+    return columns
+
+
+def revenue_range(estimate: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """min/avg/max dicts, one per row (or group) of an estimate"""
+    return [
+        {"min": round(low, 2), "avg": round(mid, 2), "max": round(high, 2)}
+        for low, mid, high in zip(
+            estimate["min"].tolist(), estimate["avg"].tolist(), estimate["max"].tolist()
+        )
+    ]
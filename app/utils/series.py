@@ -0,0 +1,212 @@
+"""
+Prefix-sum daily series: the total over any window in O(1).
+
+DailySeries keeps, per metric, a (keys x days + 1) array of running totals
+starting at 0, so the sum over [first, last] for a key is
+prefix[key, last + 1] - prefix[key, first] whatever the window's length.
+7/28/90/365-day, custom and year-over-year comparisons all cost two lookups
+per metric, for one key or (as a column difference) for every key at once.
+Days outside the loaded span count as 0.
+"""
+
+from datetime import date, timedelta
+from operator import itemgetter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Inclusive (first day, last day)
+Period = Tuple[date, date]
+
+# Longest period the range endpoints accept, however it is given
+MAX_PERIOD_DAYS = 3650
+
+# Number of stored rows, kept alongside the metrics to tell "no data" from 0
+ROWS = "rows"
+
+
+def last_days(days: int, end: date) -> Period:
+    """The `days` days ending with (and including) end"""
+    return end - timedelta(days=days - 1), end
+
+
+def previous_period(period: Period) -> Period:
+    """The period of the same length right before"""
+    first, last = period
+    length = last - first + timedelta(days=1)
+    return first - length, first - timedelta(days=1)
+
+
+def year_ago(period: Period) -> Period:
+    """The same dates one year earlier"""
+
+    def shift(day: date) -> date:
+        try:
+            return day.replace(year=day.year - 1)
+        except ValueError:
+            # Feb 29
+            return day.replace(year=day.year - 1, day=28)
+
+    return shift(period[0]), shift(period[1])
+
+
+def bucket_start(day: date, grain: str) -> date:
+    """First day of the week (Monday), month or year containing day"""
+    if grain == "week":
+        return day - timedelta(days=day.weekday())
+    if grain == "month":
+        return day.replace(day=1)
+    if grain == "year":
+        return day.replace(month=1, day=1)
+    return day
+
+
+def bucket_end(day: date, grain: str) -> date:
+    """Last day of the week, month or year containing day"""
+    if grain == "week":
+        return bucket_start(day, grain) + timedelta(days=6)
+    if grain == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(
+            days=1
+        )
+    if grain == "year":
+        return day.replace(month=12, day=31)
+    return day
+
+
+def grain_for(period: Period) -> str:
+    """Coarsest-enough grain to chart a period in at most ~100 points"""
+    days = (period[1] - period[0]).days + 1
+    if days <= 92:
+        return "day"
+    if days <= 731:
+        return "week"
+    if days <= 3660:
+        return "month"
+    return "year"
+
+
+def growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """Percentage change, 0 where there is no previous value"""
+    current = np.asarray(current, dtype=np.float64)
+    previous = np.asarray(previous, dtype=np.float64)
+    return np.divide(
+        (current - previous) * 100,
+        previous,
+        out=np.zeros(np.broadcast(current, previous).shape),
+        where=previous > 0,
+    )
+
+
+class DailySeries:
+    """Running totals of daily metrics for a set of keys
+
+    Keys are whatever the rows were grouped by, e.g. "" for channel totals
+    and video IDs for per-video series.
+    """
+
+    __slots__ = ("first", "days", "keys", "_index", "_prefix")
+
+    def __init__(
+        self, first: date, days: int, keys: List[str], values: Dict[str, np.ndarray]
+    ):
+        """values maps each metric to a (len(keys) x days) array of daily values"""
+        self.first = first
+        self.days = days
+        self.keys = keys
+        self._index = {key: i for i, key in enumerate(keys)}
+        self._prefix: Dict[str, np.ndarray] = {}
+        for metric, daily in values.items():
+            prefix = np.zeros((len(keys), days + 1), dtype=daily.dtype)
+            np.cumsum(daily, axis=1, out=prefix[:, 1:])
+            self._prefix[metric] = prefix
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Sequence],
+        metrics: Sequence[str],
+        first: date,
+        last: date,
+    ) -> "DailySeries":
+        """Build from (key, day, *metric values) rows; days without a row are 0"""
+        days = (last - first).days + 1
+        if not rows:
+            empty = np.zeros((0, days), dtype=np.int64)
+            return cls(first, days, [], {name: empty for name in (*metrics, ROWS)})
+
+        # Column by column: cheaper than transposing the rows with zip(*rows)
+        keys: Dict[str, int] = {}
+        key_index = np.fromiter(
+            (keys.setdefault(key, len(keys)) for key in map(itemgetter(0), rows)),
+            dtype=np.intp,
+            count=len(rows),
+        )
+        day_index = (
+            np.fromiter(
+                map(date.toordinal, map(itemgetter(1), rows)),
+                dtype=np.int64,
+                count=len(rows),
+            )
+            - first.toordinal()
+        )
+
+        values = {}
+        for position, metric in enumerate(metrics, 2):
+            column = np.asarray(list(map(itemgetter(position), rows)))
+            if column.dtype.kind not in "if":
+                column = column.astype(np.float64)
+            daily = np.zeros((len(keys), days), dtype=column.dtype)
+            daily[key_index, day_index] = column
+            values[metric] = daily
+        values[ROWS] = np.zeros((len(keys), days), dtype=np.int64)
+        values[ROWS][key_index, day_index] = 1
+        return cls(first, days, list(keys), values)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def _span(self, period: Period) -> Tuple[int, int]:
+        """Prefix columns bounding a period, clipped to the loaded days"""
+        start = min(max((period[0] - self.first).days, 0), self.days)
+        stop = min(max((period[1] - self.first).days + 1, start), self.days)
+        return start, stop
+
+    def total(self, metric: str, period: Period, key: str = ""):
+        """Sum of a metric over a period for one key (0 for an unknown key)"""
+        index = self._index.get(key)
+        if index is None:
+            return 0
+        start, stop = self._span(period)
+        prefix = self._prefix[metric][index]
+        return (prefix[stop] - prefix[start]).item()
+
+    def totals(self, metric: str, period: Period) -> np.ndarray:
+        """Sum of a metric over a period for every key, in keys order"""
+        start, stop = self._span(period)
+        prefix = self._prefix[metric]
+        return prefix[:, stop] - prefix[:, start]
+
+    def daily(self, metric: str, period: Period, key: str = "") -> np.ndarray:
+        """Daily values of a metric over the loaded part of a period"""
+        index = self._index.get(key)
+        start, stop = self._span(period)
+        if index is None:
+            return np.zeros(stop - start)
+        return np.diff(self._prefix[metric][index, start : stop + 1])
+
+    def compare(
+        self, metrics: Sequence[str], current: Period, previous: Period, key: str = ""
+    ) -> Dict[str, Dict]:
+        """current/previous totals, change and growth % per metric"""
+        comparison = {}
+        for metric in metrics:
+            now = self.total(metric, current, key)
+            before = self.total(metric, previous, key)
+            comparison[metric] = {
+                "current": now,
+                "previous": before,
+                "change": now - before,
+                "growth": growth(now, before).item(),
+            }
+        return comparison
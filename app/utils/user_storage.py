@@ -1,16 +1,34 @@
-from typing import Dict, Optional
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from sqlalchemy import or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
 from app.schemas.auth import GoogleUserInfo
 
 
+def with_expiry(tokens: Dict) -> Dict:
+    """Add an absolute expires_at timestamp derived from Google's expires_in"""
+    expires_in = tokens.get("expires_in")
+    if expires_in is None:
+        return tokens
+    return {**tokens, "expires_at": time.time() + int(expires_in)}
+
+
 class InMemoryUserStorage:
-    """Temporary in-memory storage for users (replace with database later)"""
+    """Per-process user storage for development and tests (same async interface)"""
 
     def __init__(self):
         self.users: Dict[str, Dict] = {}
         self.user_tokens: Dict[str, Dict] = {}
 
-    def create_or_update_user(self, google_user: GoogleUserInfo, tokens: Dict) -> Dict:
+    async def create_or_update_user(
+        self, google_user: GoogleUserInfo, tokens: Dict
+    ) -> Dict:
         """Create or update user with Google info and tokens"""
         user_data = {
             "id": google_user.id,
@@ -28,37 +46,226 @@ class InMemoryUserStorage:
             user_data["updated_at"] = datetime.utcnow()
 
         self.users[google_user.id] = user_data
-        self.user_tokens[google_user.id] = {
-            "access_token": tokens.get("access_token"),
-            "refresh_token": tokens.get("refresh_token"),
-            "expires_in": tokens.get("expires_in"),
-            "token_type": tokens.get("token_type", "Bearer"),
-        }
+        self.user_tokens[google_user.id] = with_expiry(
+            {
+                "access_token": tokens.get("access_token"),
+                "refresh_token": tokens.get("refresh_token"),
+                "expires_in": tokens.get("expires_in"),
+                "token_type": tokens.get("token_type", "Bearer"),
+            }
+        )
 
         return user_data
 
-    def get_user(self, user_id: str) -> Optional[Dict]:
+    async def get_user(self, user_id: str) -> Optional[Dict]:
         """Get user by ID"""
         return self.users.get(user_id)
 
-    def get_user_by_email(self, email: str) -> Optional[Dict]:
+    async def get_user_by_email(self, email: str) -> Optional[Dict]:
         """Get user by email"""
         for user in self.users.values():
             if user["email"] == email:
                 return user
         return None
 
-    def get_user_tokens(self, user_id: str) -> Optional[Dict]:
+    async def get_user_tokens(self, user_id: str) -> Optional[Dict]:
         """Get user's Google tokens"""
         return self.user_tokens.get(user_id)
 
-    def update_user_tokens(self, user_id: str, tokens: Dict):
+    async def update_user_tokens(self, user_id: str, tokens: Dict):
         """Update user's tokens"""
+        tokens = with_expiry(tokens)
         if user_id in self.user_tokens:
             self.user_tokens[user_id].update(tokens)
         else:
             self.user_tokens[user_id] = tokens
 
+    async def list_user_ids(self) -> List[str]:
+        """Get the IDs of all users with stored tokens"""
+        return list(self.user_tokens)
+
+    async def list_expiring_tokens(self, before: float) -> Dict[str, Dict]:
+        """Refreshable tokens expiring before the given timestamp, by user ID"""
+        return {
+            user_id: tokens
+            for user_id, tokens in self.user_tokens.items()
+            if tokens.get("refresh_token") and (tokens.get("expires_at") or 0) <= before
+        }
+
+
+class DatabaseUserStorage:
+    """Postgres-backed user storage with a read-through in-process cache
+
+    Runs on the async engine: a cache miss or token write awaits the
+    database instead of blocking the event loop.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker, cache_ttl: int, max_entries: int
+    ):
+        self._session_factory = session_factory
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries
+        # user_id -> (cached_until, user, tokens)
+        self._cache: "OrderedDict[str, Tuple[float, Dict, Optional[Dict]]]" = (
+            OrderedDict()
+        )
+        self._ids_by_email: Dict[str, str] = {}
+
+    @staticmethod
+    def _to_dict(user: User) -> Dict:
+        return {
+            "id": user.id,
+            "email": user.email,
+            "name": user.name,
+            "picture": user.picture,
+            "google_id": user.google_id,
+            "created_at": user.created_at,
+            "updated_at": user.updated_at,
+        }
+
+    def _remember(self, user: Dict, tokens: Optional[Dict]):
+        self._cache[user["id"]] = (time.time() + self.cache_ttl, user, tokens)
+        self._cache.move_to_end(user["id"])
+        self._ids_by_email[user["email"]] = user["id"]
+        while len(self._cache) > self.max_entries:
+            _, (_, evicted, _) = self._cache.popitem(last=False)
+            self._ids_by_email.pop(evicted["email"], None)
+
+    def invalidate(self, user_id: str):
+        """Drop a user from the local cache so the next read hits the database"""
+        entry = self._cache.pop(user_id, None)
+        if entry is not None:
+            self._ids_by_email.pop(entry[1]["email"], None)
+
+    async def _load(self, user_id: str) -> Optional[Tuple[float, Dict, Optional[Dict]]]:
+        entry = self._cache.get(user_id)
+        if entry is not None and entry[0] > time.time():
+            self._cache.move_to_end(user_id)
+            return entry
+
+        async with self._session_factory() as db:
+            user = await db.get(User, user_id)
+            if user is None:
+                self.invalidate(user_id)
+                return None
+            self._remember(self._to_dict(user), user.tokens)
+        return self._cache[user_id]
+
+    async def create_or_update_user(
+        self, google_user: GoogleUserInfo, tokens: Dict
+    ) -> Dict:
+        """Create or update user with Google info and tokens"""
+        now = datetime.utcnow()
+        values = {
+            "id": google_user.id,
+            "email": google_user.email,
+            "name": google_user.name,
+            "picture": google_user.picture,
+            "google_id": google_user.id,
+            "tokens": with_expiry(
+                {
+                    "access_token": tokens.get("access_token"),
+                    "refresh_token": tokens.get("refresh_token"),
+                    "expires_in": tokens.get("expires_in"),
+                    "token_type": tokens.get("token_type", "Bearer"),
+                }
+            ),
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        # Upsert keeps created_at from the first login
+        statement = insert(User).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.id],
+            set_={
+                key: statement.excluded[key]
+                for key in ("email", "name", "picture", "google_id", "tokens")
+            }
+            | {"updated_at": now},
+        ).returning(User)
+
+        self.invalidate(google_user.id)
+        async with self._session_factory() as db, db.begin():
+            user = (await db.execute(statement)).scalar_one()
+            stored = self._to_dict(user), user.tokens
+        # Only cached once committed, so a failed commit leaves nothing behind
+        self._remember(*stored)
+
+        return stored[0]
+
+    async def get_user(self, user_id: str) -> Optional[Dict]:
+        """Get user by ID"""
+        entry = await self._load(user_id)
+        return entry[1] if entry else None
+
+    async def get_user_by_email(self, email: str) -> Optional[Dict]:
+        """Get user by email"""
+        user_id = self._ids_by_email.get(email)
+        if user_id is not None:
+            entry = await self._load(user_id)
+            if entry is not None and entry[1]["email"] == email:
+                return entry[1]
+
+        # Served by the unique index on users.email
+        async with self._session_factory() as db:
+            user = (
+                await db.execute(select(User).where(User.email == email))
+            ).scalar_one_or_none()
+            if user is None:
+                return None
+            self._remember(self._to_dict(user), user.tokens)
+            return self._cache[user.id][1]
+
+    async def get_user_tokens(self, user_id: str) -> Optional[Dict]:
+        """Get user's Google tokens"""
+        entry = await self._load(user_id)
+        return entry[2] if entry else None
+
+    async def update_user_tokens(self, user_id: str, tokens: Dict):
+        """Update user's tokens"""
+        tokens = with_expiry(tokens)
+        self.invalidate(user_id)
+        async with self._session_factory() as db, db.begin():
+            # Row lock so concurrent refreshes from other workers merge cleanly
+            user = (
+                await db.execute(
+                    select(User).where(User.id == user_id).with_for_update()
+                )
+            ).scalar_one_or_none()
+            if user is None:
+                return
+            user.tokens = {**(user.tokens or {}), **tokens}
+            user.updated_at = datetime.utcnow()
+            stored = self._to_dict(user), user.tokens
+        # Only cached once committed, so a failed commit leaves nothing behind
+        self._remember(*stored)
+
+    async def list_user_ids(self) -> List[str]:
+        """Get the IDs of all users with stored tokens"""
+        async with self._session_factory() as db:
+            result = await db.execute(select(User.id).where(User.tokens.is_not(None)))
+            return list(result.scalars())
+
+    async def list_expiring_tokens(self, before: float) -> Dict[str, Dict]:
+        """Refreshable tokens expiring before the given timestamp, by user ID"""
+        expires_at = User.tokens["expires_at"].as_float()
+        statement = select(User.id, User.tokens).where(
+            User.tokens["refresh_token"].as_string().is_not(None),
+            # Tokens stored without an expiry are treated as expired
+            or_(expires_at.is_(None), expires_at <= before),
+        )
+        async with self._session_factory() as db:
+            return dict((await db.execute(statement)).all())
+
 
 # Create singleton instance
-user_storage = InMemoryUserStorage()
+if settings.USER_STORAGE_BACKEND == "memory":
+    user_storage = InMemoryUserStorage()
+else:
+    user_storage = DatabaseUserStorage(
+        AsyncSessionLocal,
+        cache_ttl=settings.USER_CACHE_TTL_SECONDS,
+        max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    )
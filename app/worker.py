@@ -0,0 +1,202 @@
+"""
+Background worker: precomputes every user's dashboard on a fixed cadence and
+refreshes Google tokens before they expire.
+
+Run alongside the API (any number of processes; they share the Redis queue):
+    python -m app.worker
+"""
+
+import asyncio
+import logging
+import signal
+from typing import Awaitable, Callable, Dict
+
+from fastapi import HTTPException
+from prometheus_client import REGISTRY, start_http_server
+
+from app.core.config import settings
+from app.core.metrics import CacheStatsCollector, QuotaStatsCollector
+from app.database import async_engine
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import cache_service
+from app.services.http_client import http_client
+from app.services.job_queue import JobQueue, job_queue
+from app.services.quota_service import BACKGROUND, quota_limiter
+from app.services.token_service import token_manager
+from app.utils.user_storage import user_storage
+
+logger = logging.getLogger(__name__)
+
+# Prefetches yield quota to interactive dashboard requests
+background_analytics = AnalyticsService(priority=BACKGROUND)
+
+
+async def refresh_dashboard(user_id: str):
+    """Job handler: rebuild and store one user's dashboard"""
+    user = await user_storage.get_user(user_id)
+    if user is None:
+        return
+    access_token = await token_manager.get_access_token(user_id)
+    await background_analytics.refresh_dashboard(http_client.client, user, access_token)
+
+
+class Worker:
+    """Schedules periodic refresh jobs and runs them from the shared queue"""
+
+    handlers: Dict[str, Callable[[str], Awaitable[None]]] = {
+        "dashboard": refresh_dashboard,
+    }
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int,
+        refresh_interval: int,
+        poll_interval: float,
+        max_retries: int,
+        retry_backoff: float,
+        token_check_interval: int,
+    ):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.refresh_interval = refresh_interval
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.token_check_interval = token_check_interval
+        self._stopping = asyncio.Event()
+
+        self.stats = {"completed": 0, "retried": 0, "failed": 0}
+
+    async def schedule_refreshes(self) -> int:
+        """Queue a dashboard refresh for every stored user, once per interval
+
+        The lock makes only one worker process enqueue per interval; users
+        whose previous refresh is still pending are skipped by the queue.
+        """
+        if not await self.queue.acquire_lock("schedule", self.refresh_interval):
+            return 0
+        queued = 0
+        for user_id in await user_storage.list_user_ids():
+            if await self.queue.enqueue("dashboard", user_id):
+                queued += 1
+        logger.info("Queued %d dashboard refreshes", queued)
+        return queued
+
+    async def refresh_tokens(self) -> int:
+        """Refresh Google tokens about to expire, once per check interval
+
+        Only the worker holding the lock walks the stored tokens, so the
+        refreshes don't race across processes.
+        """
+        if not await self.queue.acquire_lock("tokens", self.token_check_interval):
+            return 0
+        return await token_manager.refresh_expiring()
+
+    async def run_job(self, job: Dict):
+        """Run one job, re-queueing it with backoff on transient failures"""
+        try:
+            await self.handlers[job["type"]](job["user_id"])
+        except HTTPException as e:
+            if e.status_code < 500 and e.status_code != 429:
+                # Missing or revoked tokens won't fix themselves on retry
+                logger.warning("Dropping %s: %s", job["id"], e.detail)
+                self.stats["failed"] += 1
+                await self.queue.complete(job)
+                return
+            await self._retry_or_drop(job)
+        except Exception:
+            await self._retry_or_drop(job)
+        else:
+            self.stats["completed"] += 1
+            await self.queue.complete(job)
+
+    async def _retry_or_drop(self, job: Dict):
+        if job["attempt"] >= self.max_retries:
+            logger.exception("Giving up on %s", job["id"])
+            self.stats["failed"] += 1
+            await self.queue.complete(job)
+            return
+        delay = self.retry_backoff * (2 ** job["attempt"])
+        logger.warning("Retrying %s in %.0fs", job["id"], delay, exc_info=True)
+        self.stats["retried"] += 1
+        await self.queue.retry(job, delay)
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _schedule_loop(self):
+        while not self._stopping.is_set():
+            try:
+                await self.queue.promote_due()
+                await self.schedule_refreshes()
+                await self.refresh_tokens()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+            await self._sleep(self.poll_interval)
+
+    async def _consume_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.dequeue()
+            except Exception:
+                logger.exception("Failed to read from the job queue")
+                await self._sleep(self.poll_interval)
+                continue
+            if job is None:
+                await self._sleep(self.poll_interval)
+                continue
+            await self.run_job(job)
+
+    def stop(self):
+        """Finish in-flight jobs, then exit run()"""
+        self._stopping.set()
+
+    async def run(self):
+        """Run the scheduler and consumers until stop() is called"""
+        await http_client.start()
+        try:
+            await asyncio.gather(
+                self._schedule_loop(),
+                *(self._consume_loop() for _ in range(self.concurrency)),
+            )
+        finally:
+            await http_client.close()
+            await cache_service.close()
+            await quota_limiter.close()
+            await self.queue.close()
+            await async_engine.dispose()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    worker = Worker(
+        job_queue,
+        concurrency=settings.WORKER_CONCURRENCY,
+        refresh_interval=settings.WORKER_REFRESH_INTERVAL_SECONDS,
+        poll_interval=settings.WORKER_POLL_SECONDS,
+        max_retries=settings.WORKER_MAX_RETRIES,
+        retry_backoff=settings.WORKER_RETRY_BACKOFF_SECONDS,
+        token_check_interval=settings.TOKEN_REFRESH_CHECK_SECONDS,
+    )
+    if settings.METRICS_ENABLED and settings.WORKER_METRICS_PORT:
+        REGISTRY.register(CacheStatsCollector(cache_service))
+        REGISTRY.register(QuotaStatsCollector(quota_limiter))
+        start_http_server(settings.WORKER_METRICS_PORT)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
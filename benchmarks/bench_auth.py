@@ -0,0 +1,86 @@
+"""
+Per-request auth overhead: verifying the JWT and merging the user with its
+tokens on every request vs the verified-token cache and a lazy CurrentUser.
+
+    python -m benchmarks.bench_auth
+
+One second of traffic at 5k RPS from a pool of active users, each sending
+the same bearer token on every request, as a dashboard session does.
+"""
+
+import asyncio
+import random
+import time
+
+from benchmarks import _env  # noqa: F401
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.core.config import settings
+from app.dependencies import get_current_user
+from app.schemas.auth import GoogleUserInfo
+from app.services.auth_service import AuthService, auth_service
+from app.utils.user_storage import user_storage
+
+RPS = 5_000
+USERS = 500
+# Verifies every token from scratch, like the service did before the cache
+UNCACHED = AuthService(verified_cache_size=0)
+
+
+async def seed() -> list:
+    """Bearer credentials of USERS stored users"""
+    credentials = []
+    for i in range(USERS):
+        user_id = f"user{i:04d}"
+        await user_storage.create_or_update_user(
+            GoogleUserInfo(id=user_id, email=f"{user_id}@example.com", name=user_id),
+            {"access_token": "google-token", "expires_in": 3600},
+        )
+        token = auth_service.create_access_token({"sub": user_id})
+        credentials.append(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        )
+    return credentials
+
+
+async def uncached(credentials: HTTPAuthorizationCredentials) -> dict:
+    """The previous dependency: full decode, then {**user, **tokens}"""
+    payload = UNCACHED.verify_token(credentials.credentials)
+    user_id = payload["sub"]
+    user = await user_storage.get_user(user_id)
+    tokens = await user_storage.get_user_tokens(user_id) or {}
+    return {**user, **tokens}
+
+
+async def timed(label: str, resolve, requests: list, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for credentials in requests:
+        user = await resolve(credentials)
+        user["id"]
+    elapsed = (time.perf_counter() - started) / len(requests)
+    speedup = f"  ({baseline / elapsed:5.1f}x)" if baseline else ""
+    print(
+        f"  {label:28s} {elapsed * 1e6:7.1f} us/request"
+        f"  {elapsed * RPS * 100:5.1f}% of a core{speedup}"
+    )
+    return elapsed
+
+
+async def run():
+    credentials = await seed()
+    rng = random.Random(RPS)
+    requests = [rng.choice(credentials) for _ in range(RPS)]
+
+    print(f"{RPS} requests from {USERS} users ({settings.ALGORITHM} tokens)")
+    base = await timed("decode + merge", uncached, requests)
+    # The first request of each token pays for the decode
+    await timed("cached payload, CurrentUser", get_current_user, requests, base)
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
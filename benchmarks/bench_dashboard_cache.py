@@ -0,0 +1,59 @@
+"""
+Upstream requests and latency for cold vs repeat dashboard loads.
+
+    python -m benchmarks.bench_dashboard_cache
+
+Uses only the in-process tier unless BENCH_REDIS_URL is set.
+"""
+
+import asyncio
+import os
+import time
+
+from benchmarks._env import STUB_PORT
+from benchmarks.google_stub import StubServer, app as stub_app, reset_counters
+
+import httpx
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler
+
+USER = {"id": "bench-user", "name": "Bench User"}
+
+
+async def run():
+    cache = CacheService(
+        os.getenv("BENCH_REDIS_URL"), ttl=900, stale_ttl=3600, max_local_entries=4096
+    )
+    service = AnalyticsService(RequestScheduler(64, 12), cache)
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        for label in ("cold", "repeat", "repeat"):
+            reset_counters()
+            started = time.perf_counter()
+            await service.get_dashboard(client, USER, "bench-token")
+            elapsed = time.perf_counter() - started
+            print(
+                f"{label:<8} {elapsed * 1000:9.1f} ms  "
+                f"({stub_app.state.requests} upstream requests)"
+            )
+
+        # Concurrent cold loads for a second user share one fetch per report
+        reset_counters()
+        other = {"id": "bench-user-2", "name": "Bench User 2"}
+        await asyncio.gather(
+            *(service.get_dashboard(client, other, "bench-token") for _ in range(5))
+        )
+        print(f"5 concurrent cold loads: {stub_app.state.requests} upstream requests")
+
+    await cache.close()
+    print(f"cache stats: {cache.stats}  hit ratio: {cache.hit_ratio():.2%}")
+
+
+def main():
+    with StubServer(STUB_PORT):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
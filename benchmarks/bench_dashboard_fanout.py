@@ -0,0 +1,51 @@
+"""
+Wall-clock comparison of serial vs fanned-out dashboard loads.
+
+    python -m benchmarks.bench_dashboard_fanout
+"""
+
+import asyncio
+import time
+
+from benchmarks._env import STUB_PORT
+from benchmarks.google_stub import StubServer, app as stub_app, reset_counters
+
+import httpx
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler
+
+USER = {"id": "bench-user", "name": "Bench User"}
+
+
+async def load_dashboard(max_concurrency: int, per_user_concurrency: int) -> float:
+    service = AnalyticsService(
+        RequestScheduler(max_concurrency, per_user_concurrency),
+        CacheService(None, 0, 0, 0, enabled=False),
+    )
+    async with httpx.AsyncClient(timeout=60) as client:
+        started = time.perf_counter()
+        dashboard = await service.get_dashboard(client, USER, "bench-token")
+        elapsed = time.perf_counter() - started
+    assert not dashboard["failedReports"], dashboard["failedReports"]
+    return elapsed
+
+
+def main():
+    with StubServer(STUB_PORT):
+        print(f"stub latency: {stub_app.state.latency_ms:.0f} ms/request")
+        for label, limits in [
+            ("serial (1/1)", (1, 1)),
+            ("fan-out (64/12)", (64, 12)),
+            ("fan-out (64/32)", (64, 32)),
+        ]:
+            reset_counters()
+            elapsed = asyncio.run(load_dashboard(*limits))
+            print(
+                f"{label:<18} {elapsed:8.2f} s  "
+                f"({stub_app.state.requests} upstream requests)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Time to first byte and peak memory: whole-dict dashboard vs streamed events.
+
+    STUB_VIDEO_COUNT=200 python -m benchmarks.bench_dashboard_stream
+"""
+
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks._env import STUB_PORT
+from benchmarks.google_stub import StubServer
+
+import httpx
+from app.core.responses import encode_default
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler
+
+USER = {"id": "bench-user", "name": "Bench User"}
+
+
+async def run():
+    cache = CacheService(None, ttl=0, stale_ttl=0, max_local_entries=0, enabled=False)
+    service = AnalyticsService(RequestScheduler(64, 12), cache)
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        tracemalloc.start()
+        started = time.perf_counter()
+        body = json.dumps(
+            await service.get_dashboard(client, USER, "bench-token"),
+            default=encode_default,
+        )
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"whole dict  first byte {elapsed * 1000:8.1f} ms  "
+            f"total {elapsed * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB  "
+            f"({len(body) / 1024:.0f} KiB)"
+        )
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        first_byte = None
+        size = videos = 0
+        async for event, data in service.stream_dashboard(client, USER, "bench-token"):
+            # Encode and drop each event, as the streaming endpoint does
+            line = json.dumps({"event": event, "data": data}, default=encode_default)
+            size += len(line) + 1
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            videos += event == "video"
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"streamed    first byte {first_byte * 1000:8.1f} ms  "
+            f"total {elapsed * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB  "
+            f"({size / 1024:.0f} KiB, {videos} video events)"
+        )
+
+
+def main():
+    with StubServer(STUB_PORT):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Period-over-period comparisons for every video of a large channel: summing
+the daily rows of each window vs prefix-sum lookups on a DailySeries.
+
+    python -m benchmarks.bench_growth_queries
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.utils.series import DailySeries, last_days, previous_period, year_ago
+
+VIDEOS = 2_000
+DAYS = 730
+METRICS = ("views", "estimatedRevenue")
+TODAY = date(2024, 12, 31)
+REPEAT = 5
+
+
+def daily_rows(videos: int, days: int) -> list:
+    """(video, day, views, revenue) rows, as the warehouse returns them"""
+    rng = random.Random(videos)
+    first = TODAY - timedelta(days=days - 1)
+    return [
+        (f"vid{video:05d}", first + timedelta(days=day), rng.randint(0, 5000), 1.5)
+        for video in range(videos)
+        for day in range(days)
+    ]
+
+
+def windows() -> list:
+    """(current, baseline) pairs: 7/28/90/365 days vs previous, and YoY"""
+    pairs = []
+    for days in (7, 28, 90, 365):
+        period = last_days(days, TODAY)
+        pairs.append((period, previous_period(period)))
+        pairs.append((period, year_ago(period)))
+    return pairs
+
+
+def summed(rows: list, pairs: list) -> dict:
+    """Sum each window's rows per video (what a GROUP BY per window does)"""
+    results = {}
+    for current, baseline in pairs:
+        for period in (current, baseline):
+            for metric_index, metric in enumerate(METRICS, 2):
+                totals = {}
+                for row in rows:
+                    if period[0] <= row[1] <= period[1]:
+                        totals[row[0]] = totals.get(row[0], 0) + row[metric_index]
+                results[period, metric] = totals
+    return results
+
+
+def prefix_sums(series: DailySeries, pairs: list) -> dict:
+    return {
+        (period, metric): series.totals(metric, period)
+        for current, baseline in pairs
+        for period in (current, baseline)
+        for metric in METRICS
+    }
+
+
+def timed(label: str, call, repeat: int, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    elapsed = (time.perf_counter() - started) / repeat
+    speedup = f"  ({baseline / elapsed:6.0f}x)" if baseline else ""
+    print(f"  {label:34s} {elapsed * 1000:10.2f} ms{speedup}")
+    return elapsed
+
+
+def main():
+    rows = daily_rows(VIDEOS, DAYS)
+    first = TODAY - timedelta(days=DAYS * 2)
+    pairs = windows()
+
+    series = DailySeries.from_rows(rows, METRICS, first, TODAY)
+    expected = summed(rows, pairs[:1])
+    period = pairs[0][0]
+    assert np.array_equal(
+        series.totals("views", period),
+        [expected[period, "views"].get(key, 0) for key in series.keys],
+    )
+
+    print(
+        f"{VIDEOS} videos x {DAYS} days, {len(pairs)} comparisons x {len(METRICS)} metrics"
+    )
+    base = timed("sum rows per window", lambda: summed(rows, pairs), 1)
+    timed(
+        "build DailySeries",
+        lambda: DailySeries.from_rows(rows, METRICS, first, TODAY),
+        REPEAT,
+    )
+    timed("prefix-sum lookups", lambda: prefix_sums(series, pairs), REPEAT, base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Connection reuse: a fresh httpx.AsyncClient per call vs the shared client.
+
+    python -m benchmarks.bench_http_client
+
+The stub is plain-text HTTP/1.1 on localhost, so this only shows the TCP
+handshake and pool setup saved per call; against googleapis.com each new
+connection also pays a TLS handshake, and HTTP/2 multiplexes the fan-out
+over a handful of connections.
+"""
+
+import asyncio
+import statistics
+import time
+
+from benchmarks._env import STUB_PORT, STUB_URL
+from benchmarks.google_stub import StubServer, app as stub_app, reset_counters
+
+import httpx
+from app.services.http_client import HttpClientManager
+
+CALLS = 300
+CONCURRENCY = 20
+PARAMS = {
+    "ids": "channel==MINE",
+    "startDate": "2024-01-01",
+    "endDate": "2024-01-30",
+    "metrics": "views,estimatedMinutesWatched",
+}
+
+
+async def fresh_client_call() -> None:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{STUB_URL}/v2/reports", params=PARAMS)
+        response.raise_for_status()
+
+
+async def run(label: str, call) -> None:
+    reset_counters()
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def timed():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(CALLS)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{label:<16} total {elapsed:6.2f} s  "
+        f"mean {statistics.mean(latencies):6.2f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:6.2f} ms  "
+        f"connections {len(stub_app.state.connections)}"
+    )
+
+
+async def main_async():
+    manager = HttpClientManager()
+    await manager.start()
+
+    async def shared_client_call() -> None:
+        response = await manager.client.get(f"{STUB_URL}/v2/reports", params=PARAMS)
+        response.raise_for_status()
+
+    await run("fresh client", fresh_client_call)
+    await run("shared client", shared_client_call)
+    await manager.close()
+
+
+def main():
+    with StubServer(STUB_PORT):
+        stub_app.state.latency_ms = 5
+        print(f"{CALLS} calls, {CONCURRENCY} concurrent, stub latency 5 ms")
+        asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Upstream traffic for the daily series: full re-fetch vs incremental sync.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_incremental_sync
+
+Needs a reachable Postgres with the schema applied (alembic upgrade head).
+The response cache is disabled so every load goes upstream.
+"""
+
+import asyncio
+import time
+from datetime import date
+
+from benchmarks._env import STUB_PORT
+from benchmarks.google_stub import StubServer, app as stub_app, reset_counters
+
+import httpx
+from sqlalchemy import delete, select
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.channel import Channel, ChannelManager
+from app.schemas.auth import GoogleUserInfo
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler
+from app.utils.user_storage import DatabaseUserStorage
+
+USER = {"id": "bench-user", "name": "Bench User"}
+
+
+def daily_traffic():
+    """(requests, days requested, bytes) of reports with a day dimension"""
+    requests = days = size = 0
+    for path, params, response_bytes in stub_app.state.responses:
+        if path != "/v2/reports" or "day" not in params.get("dimensions", ""):
+            continue
+        requests += 1
+        days += (
+            date.fromisoformat(params["endDate"])
+            - date.fromisoformat(params["startDate"])
+        ).days + 1
+        size += response_bytes
+    return requests, days, size
+
+
+async def run():
+    # Channel managers reference users, so the bench user must exist
+    storage = DatabaseUserStorage(AsyncSessionLocal, cache_ttl=0, max_entries=1)
+    await storage.create_or_update_user(
+        GoogleUserInfo(id=USER["id"], email="bench@example.com", name=USER["name"]),
+        {"access_token": "bench-token", "expires_in": 3600},
+    )
+    async with AsyncSessionLocal() as db:
+        # Start from an empty history (sync state and metrics cascade)
+        await db.execute(
+            delete(Channel).where(
+                Channel.id.in_(
+                    select(ChannelManager.channel_id).where(
+                        ChannelManager.user_id == USER["id"]
+                    )
+                )
+            )
+        )
+        await db.commit()
+
+    cache = CacheService(None, ttl=0, stale_ttl=0, max_local_entries=0, enabled=False)
+    scheduler = RequestScheduler(64, 12)
+    runs = [
+        ("full", AnalyticsService(scheduler, cache, use_warehouse=False)),
+        ("sync cold", AnalyticsService(scheduler, cache, use_warehouse=True)),
+        ("sync warm", AnalyticsService(scheduler, cache, use_warehouse=True)),
+    ]
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        for label, service in runs:
+            reset_counters()
+            started = time.perf_counter()
+            await service.get_dashboard(client, USER, "bench-token")
+            elapsed = time.perf_counter() - started
+            requests, days, size = daily_traffic()
+            print(
+                f"{label:<10} {elapsed * 1000:8.1f} ms  daily series: "
+                f"{requests} requests, {days} days, {size / 1024:8.1f} KiB  "
+                f"(all upstream: {stub_app.state.bytes_sent / 1024:8.1f} KiB)"
+            )
+
+    await async_engine.dispose()
+
+
+def main():
+    with StubServer(STUB_PORT):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
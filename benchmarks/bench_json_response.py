@@ -0,0 +1,94 @@
+"""
+Serializing a 500-video dashboard: FastAPI's default path vs orjson.
+
+    python -m benchmarks.bench_json_response
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks._env import STUB_PORT
+from benchmarks import google_stub
+from benchmarks.google_stub import StubServer
+
+import httpx
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler
+
+USER = {"id": "bench-user", "name": "Bench User"}
+VIDEOS = 500
+REPEAT = 10
+
+
+async def build_payload() -> dict:
+    cache = CacheService(None, ttl=0, stale_ttl=0, max_local_entries=0, enabled=False)
+    service = AnalyticsService(RequestScheduler(64, 32), cache)
+    async with httpx.AsyncClient(timeout=60) as client:
+        payload = await service.get_dashboard(client, USER, "bench-token")
+    # Compare the encoders on the plain-dict payload
+    payload["detailed_videos"] = [
+        video.to_dict() for video in payload["detailed_videos"]
+    ]
+    return payload
+
+
+async def default_path(payload: dict) -> bytes:
+    """A route returning the dict: jsonable_encoder, then json.dumps"""
+    content = await serialize_response(response_content=payload)
+    return JSONResponse(content).body
+
+
+async def orjson_class(payload: dict) -> bytes:
+    """response_class=ORJSONResponse: still walked by jsonable_encoder"""
+    content = await serialize_response(response_content=payload)
+    return ORJSONResponse(content).body
+
+
+async def orjson_direct(payload: dict) -> bytes:
+    """The route returns the response itself (app.core.responses.json_response)"""
+    return ORJSONResponse(payload).body
+
+
+async def measure(label: str, encode, payload: dict, baseline: float = None):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        body = await encode(payload)
+    elapsed = (time.perf_counter() - started) / REPEAT
+
+    tracemalloc.start()
+    await encode(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    speedup = f"  ({baseline / elapsed:4.1f}x)" if baseline else ""
+    print(
+        f"{label:34s} {elapsed * 1000:8.1f} ms  peak {peak / 2**20:6.1f} MiB"
+        f"{speedup}"
+    )
+    return elapsed, body
+
+
+async def run():
+    payload = await build_payload()
+    assert len(payload["detailed_videos"]) == VIDEOS
+
+    print(f"{VIDEOS}-video dashboard, mean of {REPEAT} runs")
+    base, body = await measure("jsonable_encoder + json", default_path, payload)
+    print(f"{'':34s} ({len(body) / 2**20:.1f} MiB body)")
+    await measure("jsonable_encoder + orjson", orjson_class, payload, base)
+    await measure("orjson, encoder skipped", orjson_direct, payload, base)
+
+
+def main():
+    google_stub.app.state.video_count = VIDEOS
+    google_stub.app.state.latency_ms = 0
+    with StubServer(STUB_PORT):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
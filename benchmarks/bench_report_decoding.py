@@ -0,0 +1,162 @@
+"""
+Decoding 10k-row Analytics reports: dict per row vs columnar ReportTable.
+
+    python -m benchmarks.bench_report_decoding
+"""
+
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from app.utils.reports import ReportTable
+
+ROWS = 10_000
+REPEAT = 20
+METRICS = [
+    ("views", "INTEGER"),
+    ("estimatedMinutesWatched", "INTEGER"),
+    ("estimatedRevenue", "CURRENCY"),
+    ("likes", "INTEGER"),
+    ("comments", "INTEGER"),
+    ("shares", "INTEGER"),
+    ("subscribersGained", "INTEGER"),
+    ("subscribersLost", "INTEGER"),
+]
+
+
+def daily_report(rows: int) -> dict:
+    """A day x metrics report shaped like the Analytics API response"""
+    rng = random.Random(rows)
+    first = date(2000, 1, 1)
+    return {
+        "columnHeaders": [
+            {"name": "day", "columnType": "DIMENSION", "dataType": "STRING"}
+        ]
+        + [
+            {"name": name, "columnType": "METRIC", "dataType": data_type}
+            for name, data_type in METRICS
+        ],
+        "rows": [
+            [str(first + timedelta(days=i))]
+            + [
+                round(rng.uniform(0, 500), 2)
+                if data_type == "CURRENCY"
+                else rng.randint(0, 100_000)
+                for _, data_type in METRICS
+            ]
+            for i in range(rows)
+        ],
+    }
+
+
+def dict_per_row(report: dict) -> list:
+    """The positional decoding the parsers used before ReportTable"""
+    decoded = []
+    for row in report.get("rows") or []:
+        decoded.append(
+            {
+                "date": row[0],
+                "views": row[1] if len(row) > 1 else 0,
+                "watchTime": row[2] if len(row) > 2 else 0,
+                "revenue": row[3] if len(row) > 3 else 0,
+                "likes": row[4] if len(row) > 4 else 0,
+                "comments": row[5] if len(row) > 5 else 0,
+                "shares": row[6] if len(row) > 6 else 0,
+                "subscribersGained": row[7] if len(row) > 7 else 0,
+                "subscribersLost": row[8] if len(row) > 8 else 0,
+            }
+        )
+    return decoded
+
+
+# dict_per_row's output, built from the columns instead
+FIELDS = {
+    "date": "day",
+    "views": "views",
+    "watchTime": "estimatedMinutesWatched",
+    "revenue": "estimatedRevenue",
+    "likes": "likes",
+    "comments": "comments",
+    "shares": "shares",
+    "subscribersGained": "subscribersGained",
+    "subscribersLost": "subscribersLost",
+}
+
+
+def dict_derived(decoded: list) -> tuple:
+    rpm, engagement, net = [], [], []
+    for row in decoded:
+        views = row["views"]
+        rpm.append(row["revenue"] * 1000 / views if views else 0.0)
+        engagement.append(
+            (row["likes"] + row["comments"] + row["shares"]) * 100 / views
+            if views
+            else 0.0
+        )
+        net.append(row["subscribersGained"] - row["subscribersLost"])
+    return rpm, engagement, net
+
+
+def columnar_derived(table: ReportTable) -> tuple:
+    return table.rpm(), table.engagement_rate(), table.net_subscribers()
+
+
+def timed(label: str, call, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        call()
+    elapsed = (time.perf_counter() - started) / REPEAT
+    speedup = f"  ({baseline / elapsed:4.1f}x)" if baseline else ""
+    print(f"  {label:34s} {elapsed * 1000:8.2f} ms{speedup}")
+    return elapsed
+
+
+def retained(build) -> float:
+    """MiB still allocated by the structure build() returns"""
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size / 2**20
+
+
+def packed(report: dict) -> ReportTable:
+    """A table with every metric column packed into an array"""
+    table = ReportTable.from_report(report)
+    for name, _ in METRICS:
+        table[name]
+    return table
+
+
+def main():
+    report = daily_report(ROWS)
+    decoded = dict_per_row(report)
+    table = packed(report)
+    assert ReportTable.from_report(report).records(FIELDS) == decoded
+    assert list(dict_derived(decoded)[2]) == table.net_subscribers().tolist()
+
+    print(f"{ROWS} rows x {len(METRICS)} metrics, mean of {REPEAT} runs")
+    print("decode to dashboard dicts")
+    base = timed("dict per row (positional)", lambda: dict_per_row(report))
+    timed(
+        "ReportTable.records (by header)",
+        lambda: ReportTable.from_report(report).records(FIELDS),
+        base,
+    )
+    print("derived metrics (RPM, engagement, net subscribers)")
+    base = timed("dicts, row by row", lambda: dict_derived(dict_per_row(report)))
+    timed("pack columns + vectorized", lambda: columnar_derived(packed(report)), base)
+    base = timed("  already decoded dicts", lambda: dict_derived(decoded))
+    timed("  already packed columns", lambda: columnar_derived(table), base)
+    print(f"last {ROWS // 2} rows")
+    base = timed("dict per row (list slice)", lambda: decoded[-ROWS // 2 :])
+    timed("ReportTable.slice (views)", lambda: table.slice(-ROWS // 2), base)
+    print("memory held by the decoded metrics")
+    print(f"  {'dict per row':34s} {retained(lambda: dict_per_row(report)):8.2f} MiB")
+    print(f"  {'packed columns':34s} {retained(lambda: packed(report)):8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
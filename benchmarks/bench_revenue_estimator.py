@@ -0,0 +1,74 @@
+"""
+Estimating revenue for every (video, country) row of a large channel:
+calculate_estimated_revenue per row vs one vectorized estimate_revenue pass.
+
+    python -m benchmarks.bench_revenue_estimator
+"""
+
+import random
+import time
+
+import numpy as np
+
+from benchmarks import _env  # noqa: F401
+from app.services.analytics_service import calculate_estimated_revenue
+from app.utils.revenue import estimate_revenue
+
+VIDEOS = 5_000
+COUNTRIES = ["US", "GB", "CA", "IN", "DE", "FR", "BR", "JP", "MX", "AU"]
+REPEAT = 5
+
+
+def geography_rows(videos: int) -> dict:
+    """Flattened per-video x per-country views and watch time"""
+    rng = random.Random(videos)
+    rows = {"video": [], "country": [], "views": [], "watchTime": []}
+    for video in range(videos):
+        for country in COUNTRIES:
+            views = rng.randint(0, 50_000)
+            rows["video"].append(video)
+            rows["country"].append(country)
+            rows["views"].append(views)
+            rows["watchTime"].append(views * rng.randint(1, 6))
+    return rows
+
+
+def per_row(rows: dict) -> list:
+    totals = [0.0] * VIDEOS
+    for video, country, views, watch_time in zip(
+        rows["video"], rows["country"], rows["views"], rows["watchTime"]
+    ):
+        # The scalar table only knew "UK", not the ISO code
+        region = "UK" if country == "GB" else country
+        estimate = calculate_estimated_revenue(views, watch_time, region)
+        totals[video] += estimate["ad_revenue"]["estimated"]
+    return totals
+
+
+def vectorized(rows: dict) -> np.ndarray:
+    return estimate_revenue(
+        rows["views"], rows["watchTime"], rows["country"], groups=rows["video"]
+    )["avg"]
+
+
+def timed(label: str, call, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        call()
+    elapsed = (time.perf_counter() - started) / REPEAT
+    speedup = f"  ({baseline / elapsed:4.1f}x)" if baseline else ""
+    print(f"  {label:34s} {elapsed * 1000:8.2f} ms{speedup}")
+    return elapsed
+
+
+def main():
+    rows = geography_rows(VIDEOS)
+    assert np.allclose(per_row(rows), vectorized(rows))
+
+    print(f"{VIDEOS} videos x {len(COUNTRIES)} countries, mean of {REPEAT} runs")
+    base = timed("calculate_estimated_revenue loop", lambda: per_row(rows))
+    timed("estimate_revenue (one pass)", lambda: vectorized(rows), base)
+
+
+if __name__ == "__main__":
+    main()
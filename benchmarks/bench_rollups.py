@@ -0,0 +1,146 @@
+"""
+Long-range trends: grouping daily rows per month at query time vs reading
+the metric_rollups buckets, plus what keeping the rollups current costs a sync.
+
+    DATABASE_URL=postgresql://... python -m benchmarks.bench_rollups
+
+Needs a reachable Postgres with the schema applied (alembic upgrade head).
+Seeds (and afterwards deletes) a channel of its own.
+"""
+
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from benchmarks import _env  # noqa: F401
+
+from sqlalchemy import delete, func, select
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models.channel import Channel
+from app.models.video import DailyMetric
+from app.services.warehouse_service import SERIES_METRICS, warehouse_service
+
+CHANNEL_ID = "UCbenchrollups"
+VIDEOS = 20
+YEARS = 10
+TODAY = date(2024, 12, 31)
+METRICS = ["views", "estimatedMinutesWatched", "estimatedRevenue", "likes"]
+REPEAT = 20
+
+
+def daily_rows(first: date, last: date) -> list:
+    """Channel totals and per-video rows for every day of [first, last]"""
+    rng = random.Random(first.toordinal())
+    rows = []
+    for offset in range((last - first).days + 1):
+        day = first + timedelta(days=offset)
+        for video_id in ["", *(f"vid{video:03d}" for video in range(VIDEOS))]:
+            rows.append(
+                {
+                    "channel_id": CHANNEL_ID,
+                    "video_id": video_id,
+                    "dimension": "",
+                    "dimension_value": "",
+                    "day": day,
+                    "views": rng.randint(0, 5000),
+                    "estimated_minutes_watched": rng.randint(0, 9000),
+                    "estimated_revenue": rng.random() * 20,
+                    "likes": rng.randint(0, 300),
+                }
+            )
+    return rows
+
+
+async def seed(first: date):
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Channel).where(Channel.id == CHANNEL_ID))
+        db.add(
+            Channel(
+                id=CHANNEL_ID,
+                title="Rollup bench",
+                updated_at=datetime.utcnow(),
+            )
+        )
+        await db.flush()
+        rows = daily_rows(first, TODAY)
+        started = time.perf_counter()
+        await warehouse_service.upsert_daily_rows(db, rows)
+        await db.commit()
+    print(
+        f"seeded {len(rows)} daily rows (+ rollups) in "
+        f"{time.perf_counter() - started:.1f}s"
+    )
+
+
+async def grouped(db, first: date) -> list:
+    """Monthly trend straight from daily_metrics"""
+    month = func.date_trunc("month", DailyMetric.day)
+    result = await db.execute(
+        select(month, *(func.sum(SERIES_METRICS[name]) for name in METRICS))
+        .where(
+            DailyMetric.channel_id == CHANNEL_ID,
+            DailyMetric.video_id == "",
+            DailyMetric.dimension == "",
+            DailyMetric.day.between(first, TODAY),
+        )
+        .group_by(month)
+        .order_by(month)
+    )
+    return [
+        {"date": str(row[0].date()), **dict(zip(METRICS, row[1:]))} for row in result
+    ]
+
+
+async def timed(label: str, call, baseline: float = None) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        await call()
+    elapsed = (time.perf_counter() - started) / REPEAT
+    speedup = f"  ({baseline / elapsed:5.1f}x)" if baseline else ""
+    print(f"  {label:38s} {elapsed * 1000:8.2f} ms{speedup}")
+    return elapsed
+
+
+async def run():
+    first = TODAY.replace(year=TODAY.year - YEARS + 1, month=1, day=1)
+    await seed(first)
+
+    async with AsyncSessionLocal() as db:
+        expected = await grouped(db, first)
+        rollups = await warehouse_service.trend(
+            db, CHANNEL_ID, "month", first, TODAY, METRICS
+        )
+        assert [row["views"] for row in rollups] == [row["views"] for row in expected]
+
+        print(f"{YEARS} years x {VIDEOS + 1} series, monthly channel trend")
+        base = await timed(
+            "GROUP BY month over daily_metrics", lambda: grouped(db, first)
+        )
+        await timed(
+            "read month rollups",
+            lambda: warehouse_service.trend(
+                db, CHANNEL_ID, "month", first, TODAY, METRICS
+            ),
+            base,
+        )
+
+        async def sync_day():
+            await warehouse_service.upsert_daily_rows(db, daily_rows(TODAY, TODAY))
+
+        print("incremental sync of one day")
+        await timed("upsert day + refresh rollups", sync_day)
+        await db.rollback()
+
+        await db.execute(delete(Channel).where(Channel.id == CHANNEL_ID))
+        await db.commit()
+    await async_engine.dispose()
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
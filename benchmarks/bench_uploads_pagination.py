@@ -0,0 +1,86 @@
+"""
+Paging a channel's uploads: collected up front vs streamed with prefetch.
+
+Each window of videos is followed by one stub round trip of "downstream
+work" (standing in for its per-video reports), which is what prefetching
+the next page overlaps with.
+
+    python -m benchmarks.bench_uploads_pagination
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks._env import STUB_PORT
+from benchmarks import google_stub
+from benchmarks.google_stub import StubServer
+
+import httpx
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.request_scheduler import RequestScheduler, prefetch, rebatch
+
+USER_ID = "bench-user"
+HEADERS = {"Authorization": "Bearer bench-token"}
+PLAYLIST = "UUstubchannel"
+WINDOW = 50
+COUNTS = (500, 2000, 10000)
+
+
+async def downstream(window):
+    await asyncio.sleep(google_stub.app.state.latency_ms / 1000)
+
+
+async def collected(service, client):
+    """Every page first, then the windows (what a non-streaming pager does)"""
+    video_stats = []
+    async for page in service.iter_uploads(client, USER_ID, HEADERS, PLAYLIST, []):
+        video_stats.extend(page)
+    for offset in range(0, len(video_stats), WINDOW):
+        await downstream(video_stats[offset : offset + WINDOW])
+    return len(video_stats)
+
+
+async def streamed(service, client):
+    """Windows processed while the next page is being fetched"""
+    count = 0
+    uploads = service.iter_uploads(client, USER_ID, HEADERS, PLAYLIST, [])
+    async for window in rebatch(prefetch(uploads), WINDOW):
+        await downstream(window)
+        count += len(window)
+    return count
+
+
+async def measure(label, run, service, client, count):
+    tracemalloc.start()
+    started = time.perf_counter()
+    videos = await run(service, client)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert videos == count, (videos, count)
+    print(
+        f"{count:6d} uploads  {label:9s}  {elapsed * 1000:8.1f} ms  "
+        f"peak {peak / 2**20:6.2f} MiB"
+    )
+
+
+async def run():
+    cache = CacheService(None, ttl=0, stale_ttl=0, max_local_entries=0, enabled=False)
+    service = AnalyticsService(RequestScheduler(64, 12), cache)
+
+    async with httpx.AsyncClient(timeout=60) as client:
+        for count in COUNTS:
+            google_stub.app.state.video_count = count
+            await measure("collected", collected, service, client, count)
+            await measure("streamed", streamed, service, client, count)
+
+
+def main():
+    with StubServer(STUB_PORT):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
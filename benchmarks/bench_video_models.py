@@ -0,0 +1,107 @@
+"""
+Memory held by a 1,000-video dashboard: detailed videos as nested dicts (one
+dict per trend day, retention point, country, ...) vs slotted DetailedVideo
+models with packed Series, plus what serializing the packed form costs.
+
+    python -m benchmarks.bench_video_models
+
+Reports come from the Google stub's generator (30 days, 100 retention
+points, top countries, traffic sources, demographics per video) and are
+parsed from JSON inside the measurement and dropped, as a dashboard build
+does, so only what the dashboard keeps is counted.
+"""
+
+import gc
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks import _env  # noqa: F401
+
+import orjson
+
+from app.core.responses import encode_default
+from app.services.analytics_service import (
+    EMPTY_REPORT,
+    VIDEO_REPORT_FIELDS,
+    build_detailed_video,
+    parse_video_reports,
+    video_report_params,
+)
+from app.utils.reports import ReportTable
+from benchmarks import google_stub
+
+VIDEOS = 1_000
+REPEAT = 5
+
+
+def raw_inputs() -> list:
+    """(videos.list item, reports) per video, as the JSON bytes Google sends"""
+    today = date.today()
+    inputs = []
+    for i in range(VIDEOS):
+        video_id = f"vid{i:05d}"
+        params = video_report_params(video_id, today - timedelta(days=29), today)
+        reports = {name: google_stub.report(p) for name, p in params.items()}
+        inputs.append(
+            (orjson.dumps(google_stub._video_item(video_id)), orjson.dumps(reports))
+        )
+    return inputs
+
+
+def as_dicts(item: dict, reports: dict) -> dict:
+    """The detailed_video dict the dashboard kept before the packed models"""
+    video = build_detailed_video(item, parse_video_reports(reports)).to_dict()
+    for key, (name, fields) in VIDEO_REPORT_FIELDS.items():
+        table = ReportTable.from_report(reports.get(name, EMPTY_REPORT))
+        video[key] = table.records(fields)
+    return video
+
+
+def as_models(item: dict, reports: dict):
+    return build_detailed_video(item, parse_video_reports(reports))
+
+
+def retained(label: str, build, inputs: list, baseline: int = None):
+    """Build every video and measure what stays allocated afterwards"""
+    gc.collect()
+    tracemalloc.start()
+    videos = [
+        build(orjson.loads(item), orjson.loads(reports)) for item, reports in inputs
+    ]
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ratio = f"  ({baseline / size:4.1f}x smaller)" if baseline else ""
+    print(
+        f"  {label:28s} {size / 2**20:7.1f} MiB  "
+        f"{size / VIDEOS / 1024:6.1f} KiB/video{ratio}"
+    )
+    return videos, size
+
+
+def serialize(label: str, videos: list, baseline: float = None):
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        body = orjson.dumps({"detailed_videos": videos}, default=encode_default)
+    elapsed = (time.perf_counter() - started) / REPEAT
+    ratio = f"  ({elapsed / baseline:4.2f}x)" if baseline else ""
+    print(f"  {label:28s} {elapsed * 1000:7.1f} ms{ratio}")
+    return body, elapsed
+
+
+def main():
+    inputs = raw_inputs()
+
+    print(f"{VIDEOS}-video dashboard, memory kept by detailed_videos")
+    dicts, size = retained("nested dicts", as_dicts, inputs)
+    models, _ = retained("DetailedVideo + Series", as_models, inputs, size)
+
+    print("serializing them with orjson")
+    expected, base = serialize("nested dicts", dicts)
+    body, _ = serialize("packed, expanded at the edge", models, base)
+    assert body == expected
+
+
+if __name__ == "__main__":
+    main()
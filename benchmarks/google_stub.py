@@ -0,0 +1,332 @@
+"""
+Local stand-in for the Google endpoints used by SpyTube.
+
+Serves just enough of youtube/v3, youtubeanalytics/v2/reports and the OAuth
+token/userinfo endpoints for the dashboard and auth code paths, with an
+artificial latency per request so that benchmarks measure request scheduling
+rather than the network.
+
+The channel's size (videos, days of history, countries), the latency (plus
+uniform jitter) and the share of YouTube API calls failing with a 503 are
+configurable through STUB_* variables or app.state. Run standalone with:
+    STUB_LATENCY_MS=80 STUB_ERROR_RATE=0.01 uvicorn benchmarks.google_stub:app --port 8099
+
+Each authorization code logs in its own user ("code-7" -> user "stub-7").
+"""
+
+import asyncio
+import hashlib
+import itertools
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Form, Header, Request
+from fastapi.responses import JSONResponse
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "50"))
+LATENCY_JITTER_MS = float(os.getenv("STUB_LATENCY_JITTER_MS", "0"))
+ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))
+VIDEO_COUNT = int(os.getenv("STUB_VIDEO_COUNT", "50"))
+# Days of history before today; day rows outside it are empty
+HISTORY_DAYS = int(os.getenv("STUB_DAYS", "3650"))
+COUNTRY_COUNT = int(os.getenv("STUB_COUNTRY_COUNT", "10"))
+
+# Most-viewed first, so a smaller channel keeps the big markets
+COUNTRIES = [
+    "US", "GB", "IN", "CA", "DE", "BR", "FR", "JP", "AU", "MX",
+    "ES", "IT", "KR", "NL", "ID", "PH", "TR", "PL", "SE", "RU",
+    "AR", "CO", "ZA", "NG", "EG", "SA", "AE", "PK", "BD", "VN",
+    "TH", "MY", "SG", "NZ", "IE", "BE", "CH", "AT", "NO", "DK",
+]  # fmt: skip
+TRAFFIC_SOURCES = ["YT_SEARCH", "SUGGESTED", "BROWSE", "EXT_URL", "PLAYLIST"]
+AGE_GROUPS = ["age13-17", "age18-24", "age25-34", "age35-44", "age45-54"]
+GENDERS = ["female", "male"]
+DEVICES = ["MOBILE", "DESKTOP", "TV", "TABLET"]
+
+app = FastAPI(title="Google API stub")
+app.state.latency_ms = LATENCY_MS
+app.state.latency_jitter_ms = LATENCY_JITTER_MS
+app.state.error_rate = ERROR_RATE
+app.state.video_count = VIDEO_COUNT
+app.state.history_days = HISTORY_DAYS
+app.state.country_count = COUNTRY_COUNT
+app.state.errors = 0
+app.state.requests = 0
+app.state.bytes_sent = 0
+# (path, query params, response bytes) of every request
+app.state.responses = []
+# (host, port) of every client socket seen, i.e. TCP connections opened
+app.state.connections = set()
+
+
+_errors = random.Random(0)
+
+
+@app.middleware("http")
+async def track_connections(request: Request, call_next):
+    app.state.requests += 1
+    app.state.connections.add(tuple(request.scope["client"]))
+    failing = (
+        request.url.path.startswith(("/youtube/", "/v2/"))
+        and _errors.random() < app.state.error_rate
+    )
+    if failing:
+        # Transient backend error, in the Google APIs' error shape
+        await _delay()
+        app.state.errors += 1
+        response = JSONResponse(
+            {
+                "error": {
+                    "code": 503,
+                    "message": "The service is currently unavailable.",
+                    "errors": [{"reason": "backendError"}],
+                }
+            },
+            status_code=503,
+        )
+    else:
+        response = await call_next(request)
+    size = int(response.headers.get("content-length", 0))
+    app.state.bytes_sent += size
+    app.state.responses.append((request.url.path, dict(request.query_params), size))
+    return response
+
+
+def reset_counters():
+    app.state.errors = 0
+    app.state.requests = 0
+    app.state.bytes_sent = 0
+    app.state.responses = []
+    app.state.connections = set()
+
+
+def _number(*parts) -> int:
+    """Deterministic pseudo-random metric value"""
+    digest = hashlib.md5(":".join(map(str, parts)).encode()).digest()
+    return int.from_bytes(digest[:3], "big") % 10_000
+
+
+def _video_ids() -> List[str]:
+    return [f"vid{i:05d}" for i in range(app.state.video_count)]
+
+
+def _dimension_values(dimension: str, params: Dict) -> List:
+    if dimension == "day":
+        first = date.today() - timedelta(days=app.state.history_days - 1)
+        start = max(date.fromisoformat(params["startDate"]), first)
+        end = date.fromisoformat(params["endDate"])
+        return [
+            str(start + timedelta(days=offset))
+            for offset in range((end - start).days + 1)
+        ]
+    if dimension == "video":
+        filters = params.get("filters", "")
+        if filters.startswith("video=="):
+            return filters[len("video==") :].split(",")
+        return _video_ids()
+    if dimension == "country":
+        return COUNTRIES[: app.state.country_count]
+    if dimension == "insightTrafficSourceType":
+        return TRAFFIC_SOURCES
+    if dimension == "elapsedVideoTimeRatio":
+        return [round(i / 100, 2) for i in range(1, 101)]
+    if dimension == "ageGroup":
+        return AGE_GROUPS
+    if dimension == "gender":
+        return GENDERS
+    if dimension == "deviceType":
+        return DEVICES
+    return ["unknown"]
+
+
+async def _delay():
+    jitter = app.state.latency_jitter_ms
+    latency = app.state.latency_ms + (random.uniform(-jitter, jitter) if jitter else 0)
+    await asyncio.sleep(max(latency, 0) / 1000)
+
+
+@app.get("/v2/reports")
+async def reports(request: Request):
+    await _delay()
+    return report(dict(request.query_params))
+
+
+def report(params: Dict) -> Dict:
+    """The Analytics report the stub serves for params"""
+    metrics = params["metrics"].split(",")
+    dimensions = [d for d in params.get("dimensions", "").split(",") if d]
+
+    rows = []
+    for key in itertools.product(*(_dimension_values(d, params) for d in dimensions)):
+        rows.append(
+            list(key)
+            + [_number(params.get("filters"), *key, metric) for metric in metrics]
+        )
+
+    max_results = params.get("maxResults")
+    if max_results:
+        rows = rows[: int(max_results)]
+
+    return {
+        "kind": "youtubeAnalytics#resultTable",
+        "columnHeaders": [
+            {"name": d, "columnType": "DIMENSION", "dataType": "STRING"}
+            for d in dimensions
+        ]
+        + [{"name": m, "columnType": "METRIC", "dataType": "INTEGER"} for m in metrics],
+        "rows": rows,
+    }
+
+
+@app.get("/youtube/v3/channels")
+async def channels():
+    await _delay()
+    return {
+        "items": [
+            {
+                "id": "UCstubchannel",
+                "snippet": {
+                    "title": "Stub Channel",
+                    "description": "Local benchmark channel",
+                    "thumbnails": {},
+                    "customUrl": "@stub",
+                    "publishedAt": "2015-01-01T00:00:00Z",
+                },
+                "statistics": {
+                    "viewCount": "1000000",
+                    "subscriberCount": "25000",
+                    "videoCount": str(app.state.video_count),
+                },
+                "contentDetails": {"relatedPlaylists": {"uploads": "UUstubchannel"}},
+            }
+        ]
+    }
+
+
+@app.get("/youtube/v3/playlists")
+async def playlists():
+    await _delay()
+    return {"items": []}
+
+
+@app.get("/youtube/v3/playlistItems")
+async def playlist_items(maxResults: int = 50, pageToken: str = "0"):
+    await _delay()
+    start = int(pageToken or 0)
+    ids = _video_ids()[start : start + maxResults]
+    body = {
+        "items": [
+            {"snippet": {"title": vid}, "contentDetails": {"videoId": vid}}
+            for vid in ids
+        ]
+    }
+    if start + maxResults < app.state.video_count:
+        body["nextPageToken"] = str(start + maxResults)
+    return body
+
+
+def _video_item(vid: str) -> Dict:
+    """A videos.list item about the size of a real one"""
+    thumbnail_sizes = {
+        "default": (120, 90),
+        "medium": (320, 180),
+        "high": (480, 360),
+        "standard": (640, 480),
+        "maxres": (1280, 720),
+    }
+    return {
+        "id": vid,
+        "snippet": {
+            "title": f"Video {vid}",
+            "description": f"Stub video {vid}. " + "Lorem ipsum dolor sit amet. " * 40,
+            "publishedAt": "2020-01-01T00:00:00Z",
+            "channelTitle": "Stub Channel",
+            "categoryId": "28",
+            "defaultLanguage": "en",
+            "tags": [f"tag{i}" for i in range(12)],
+            "thumbnails": {
+                name: {
+                    "url": f"https://i.ytimg.com/vi/{vid}/{name}.jpg",
+                    "width": width,
+                    "height": height,
+                }
+                for name, (width, height) in thumbnail_sizes.items()
+            },
+        },
+        "statistics": {
+            "viewCount": str(_number(vid, "views")),
+            "likeCount": str(_number(vid, "likes")),
+            "commentCount": str(_number(vid, "comments")),
+        },
+        "contentDetails": {"duration": "PT10M30S", "definition": "hd"},
+        "status": {"uploadStatus": "processed", "privacyStatus": "public"},
+        "topicDetails": {
+            "topicCategories": ["https://en.wikipedia.org/wiki/Technology"]
+        },
+        "localizations": {
+            language: {"title": f"Video {vid} ({language})", "description": "..." * 20}
+            for language in ("de", "es", "fr")
+        },
+    }
+
+
+@app.get("/youtube/v3/videos")
+async def videos(id: str = ""):
+    await _delay()
+    return {"items": [_video_item(vid) for vid in id.split(",") if vid]}
+
+
+@app.post("/token")
+async def token(grant_type: str = Form(...), code: str = Form("code-1")):
+    await _delay()
+    # The userinfo endpoint reads the user back out of the access token
+    user = code.rpartition("-")[2] if grant_type == "authorization_code" else "1"
+    body = {
+        "access_token": f"stub-access-{user}-{time.time_ns()}",
+        "expires_in": 3599,
+        "token_type": "Bearer",
+        "scope": "https://www.googleapis.com/auth/youtube.readonly",
+    }
+    if grant_type == "authorization_code":
+        body["refresh_token"] = "stub-refresh"
+    return body
+
+
+@app.get("/oauth2/v2/userinfo")
+async def userinfo(authorization: str = Header("")):
+    await _delay()
+    parts = authorization.split("-")
+    user = parts[2] if len(parts) > 3 else "1"
+    return {
+        "id": f"stub-{user}",
+        "email": f"stub.user{user}@example.com",
+        "name": f"Stub User {user}",
+        "picture": None,
+    }
+
+
+class StubServer:
+    """Run the stub app on a background thread for in-process benchmarks"""
+
+    def __init__(self, port: int = 8099):
+        self.port = port
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
@@ -0,0 +1,299 @@
+"""
+Load test: throughput and latency percentiles of the API against the Google stub.
+
+    python -m benchmarks.load
+    python -m benchmarks.load --scenarios dashboard --concurrency 32 --duration 20
+    python -m benchmarks.load --latency-ms 80 --error-rate 0.02 --videos 200 --days 365
+
+The stub and the API each run in their own uvicorn process, so the load
+generator does not compete with them for the GIL. Users log in through
+POST /auth/google (backed by the stub's token and userinfo endpoints), then
+each scenario is driven by --concurrency closed-loop clients for --duration
+seconds. Results are written to benchmarks/results/ with the commit they
+were measured at and compared with the latest earlier run of the same
+configuration (or --baseline); --fail-on-regression exits 1 when throughput
+drops or p95 latency grows by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks._env import STUB_PORT
+
+import httpx
+import numpy as np
+
+API_PORT = int(os.getenv("LOAD_API_PORT", "8098"))
+API_URL = f"http://127.0.0.1:{API_PORT}"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# name -> (method, path); auth-login posts a fresh authorization code
+SCENARIOS = {
+    "dashboard": ("GET", "/api/v1/analytics/dashboard"),
+    "revenue-breakdown": ("GET", "/api/v1/analytics/revenue-breakdown"),
+    "auth-me": ("GET", "/api/v1/auth/me"),
+    "auth-refresh": ("POST", "/api/v1/auth/refresh"),
+    "auth-login": ("POST", "/api/v1/auth/google"),
+}
+PERCENTILES = (50, 95, 99)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="comma-separated subset of: " + ", ".join(SCENARIOS),
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10, help="seconds each")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=10)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--videos", type=int, default=50)
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--countries", type=int, default=10)
+    parser.add_argument(
+        "--cache", action="store_true", help="keep the response cache on"
+    )
+    parser.add_argument("--baseline", type=Path, help="result file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def configuration(args: argparse.Namespace) -> Dict:
+    """What a run's numbers depend on; runs are only compared when it matches"""
+    return {
+        # The stub, the API and the clients share this machine's CPUs
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "users": args.users,
+        "latencyMs": args.latency_ms,
+        "jitterMs": args.jitter_ms,
+        "errorRate": args.error_rate,
+        "videos": args.videos,
+        "days": args.days,
+        "countries": args.countries,
+        "cache": args.cache,
+    }
+
+
+def serve(app: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    """Start a uvicorn process and wait until it accepts connections"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port)]
+        + ["--log-level", "warning"],
+        env={**os.environ, **env},
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{app} exited with {process.returncode}")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"{app} did not start on port {port}")
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def login(client: httpx.AsyncClient, code: str) -> str:
+    response = await client.post("/api/v1/auth/google", json={"code": code})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    scenario: str,
+    tokens: List[str],
+    concurrency: int,
+    duration: float,
+) -> Tuple[List[float], Dict[str, int], float]:
+    """Closed loop: each client sends its next request when the last one ends"""
+    method, path = SCENARIOS[scenario]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    codes = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def user_loop(index: int):
+        headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+        while time.perf_counter() < deadline:
+            body = {"code": f"code-{next(codes)}"} if scenario == "auth-login" else None
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, path, headers=headers, json=body
+                )
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_loop(index) for index in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def summarize(latencies: List[float], statuses: Dict[str, int], elapsed: float) -> Dict:
+    samples = np.asarray(latencies) * 1000
+    errors = sum(
+        count
+        for status, count in statuses.items()
+        if not status.isdigit() or int(status) >= 400
+    )
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput": len(samples) / elapsed,
+        "meanMs": float(samples.mean()) if len(samples) else 0.0,
+        **{
+            f"p{q}Ms": float(np.percentile(samples, q)) if len(samples) else 0.0
+            for q in PERCENTILES
+        },
+        "statuses": statuses,
+    }
+
+
+def find_baseline(config: Dict) -> Optional[Path]:
+    """Latest stored run with the same configuration"""
+    for path in sorted(RESULTS_DIR.glob("load-*.json"), reverse=True):
+        if json.loads(path.read_text())["config"] == config:
+            return path
+    return None
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Print deltas against a baseline run; return the regressed scenarios"""
+    print(f"\nvs {baseline['commit']} ({baseline['timestamp']})")
+    regressions = []
+    for scenario, current in results.items():
+        before = baseline["results"].get(scenario)
+        if before is None:
+            continue
+        throughput = current["throughput"] / before["throughput"] - 1
+        p95 = current["p95Ms"] / before["p95Ms"] - 1 if before["p95Ms"] else 0.0
+        regressed = throughput < -tolerance or p95 > tolerance
+        if regressed:
+            regressions.append(scenario)
+        print(
+            f"  {scenario:18s} throughput {throughput:+7.1%}  p95 {p95:+7.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> Dict:
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency + args.users)
+    async with httpx.AsyncClient(
+        base_url=API_URL, timeout=120, limits=limits
+    ) as client:
+        tokens = [await login(client, f"code-user{i}") for i in range(args.users)]
+        for scenario in args.scenarios.split(","):
+            latencies, statuses, elapsed = await drive(
+                client, scenario, tokens, args.concurrency, args.duration
+            )
+            results[scenario] = summary = summarize(latencies, statuses, elapsed)
+            print(
+                f"  {scenario:18s} {summary['requests']:6d} req "
+                f"{summary['throughput']:8.1f} req/s  "
+                + "  ".join(f"p{q} {summary[f'p{q}Ms']:8.1f} ms" for q in PERCENTILES)
+                + f"  errors {summary['errors']}"
+            )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = configuration(args)
+    stub = serve(
+        "benchmarks.google_stub:app",
+        STUB_PORT,
+        {
+            "STUB_LATENCY_MS": str(args.latency_ms),
+            "STUB_LATENCY_JITTER_MS": str(args.jitter_ms),
+            "STUB_ERROR_RATE": str(args.error_rate),
+            "STUB_VIDEO_COUNT": str(args.videos),
+            "STUB_DAYS": str(args.days),
+            "STUB_COUNTRY_COUNT": str(args.countries),
+        },
+    )
+    try:
+        api = serve(
+            "app.main:app",
+            API_PORT,
+            {
+                "USER_STORAGE_BACKEND": "memory",
+                "CACHE_ENABLED": str(args.cache).lower(),
+            },
+        )
+        try:
+            print(f"{commit()}: {json.dumps(config)}")
+            results = asyncio.run(run(args))
+        finally:
+            api.terminate()
+            api.wait()
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    baseline_path = args.baseline or find_baseline(config)
+    regressions = []
+    if baseline_path is not None:
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare(results, baseline, args.tolerance)
+
+    if not args.no_save:
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        record = {
+            "commit": commit(),
+            "timestamp": timestamp,
+            "config": config,
+            "results": results,
+        }
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / f"load-{timestamp}-{record['commit']}.json"
+        path.write_text(json.dumps(record, indent=2))
+        print(f"\nsaved {path}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import pytest
+from fastapi import HTTPException
+
+from app.services.analytics_service import (
+    AnalyticsService,
+    estimate_video_revenue,
+    estimate_videos_revenue,
+    parse_video_reports,
+)
+from app.services.cache_service import CacheService
+from app.utils import revenue
+from app.utils.revenue import DEFAULT_RPM_RATES, RpmTable
+
+GEOGRAPHY_HEADERS = [
+    {"name": "country", "dataType": "STRING"},
+    {"name": "views", "dataType": "INTEGER"},
+    {"name": "estimatedMinutesWatched", "dataType": "INTEGER"},
+    {"name": "estimatedRevenue", "dataType": "CURRENCY"},
+]
+ANALYTICS_HEADERS = [
+    {"name": "views", "dataType": "INTEGER"},
+    {"name": "estimatedMinutesWatched", "dataType": "INTEGER"},
+]
+
+
+def parsed_video(countries: dict, views: int, watch_time: int = 0) -> dict:
+    return parse_video_reports(
+        {
+            "geography": {
+                "columnHeaders": GEOGRAPHY_HEADERS,
+                "rows": [[c, v, v * 2, 0.0] for c, v in countries.items()],
+            },
+            "analytics": {
+                "columnHeaders": ANALYTICS_HEADERS,
+                "rows": [[views, watch_time]],
+            },
+        }
+    )
+
+
+def naive_revenue(countries: dict, views: int) -> dict:
+    """Per-row pricing straight from the rate table"""
+    rates = {entry.get("country", "*"): entry for entry in DEFAULT_RPM_RATES}
+    rows = [*countries.items(), ("*", views - sum(countries.values()))]
+    return {
+        band: round(sum(rates.get(c, rates["*"])[band] * v / 1000 for c, v in rows), 2)
+        for band in ("min", "avg", "max")
+    }
+
+
+VIDEOS = [
+    ({"US": 4000, "GB": 1000}, 10000),
+    ({}, 2500),
+    ({"CA": 700, "FR": 300, "US": 1000}, 2000),
+    ({}, 0),
+]
+
+
+def test_window_estimate_matches_per_video_pricing():
+    parsed = [parsed_video(countries, views) for countries, views in VIDEOS]
+
+    estimates = estimate_videos_revenue(parsed, ["22", "", "10", "*"])
+
+    assert estimates == [naive_revenue(c, v) for c, v in VIDEOS]
+    assert estimates == [estimate_video_revenue(p) for p in parsed]
+
+
+def test_categories_are_priced_per_video(monkeypatch):
+    table = RpmTable(
+        [*DEFAULT_RPM_RATES, {"category": "20", "min": 4.0, "avg": 8.0, "max": 12.0}]
+    )
+    monkeypatch.setattr(revenue, "rpm_table", lambda: table)
+    parsed = [parsed_video({}, 1000), parsed_video({}, 1000)]
+
+    gaming, other = estimate_videos_revenue(parsed, ["20", "22"])
+
+    assert gaming == {"min": 4.0, "avg": 8.0, "max": 12.0}
+    assert other == {"min": 0.3, "avg": 1.0, "max": 2.0}
+
+
+def test_empty_window_and_missing_reports():
+    assert estimate_videos_revenue([], []) == []
+    assert estimate_video_revenue(parse_video_reports({})) == {
+        "min": 0.0,
+        "avg": 0.0,
+        "max": 0.0,
+    }
+
+
+def test_country_views_above_the_total_are_not_negative():
+    parsed = parsed_video({"US": 1500}, 1000)
+
+    assert estimate_video_revenue(parsed) == pytest.approx(
+        {"min": 1.5, "avg": 3.75, "max": 7.5}
+    )
+
+
+class PagedUploads(AnalyticsService):
+    """Serves a playlist of numbered videos from memory, counting page requests"""
+
+    def __init__(self, videos: int, failing_pages=()):
+        super().__init__(cache=CacheService(None, 0, 0, 0, enabled=False))
+        self.videos = videos
+        self.failing_pages = set(failing_pages)
+        self.requests = []
+
+    async def fetch_data(self, client, user_id, resource, headers, params):
+        self.requests.append((resource, params.get("pageToken") or params.get("id")))
+        if resource == "videos":
+            return {"items": [{"id": video_id} for video_id in params["id"].split(",")]}
+        page = int(params.get("pageToken") or 0)
+        if page in self.failing_pages:
+            raise HTTPException(status_code=500)
+        ids = range(page * 50, min(self.videos, (page + 1) * 50))
+        result = {"items": [{"contentDetails": {"videoId": f"v{i}"}} for i in ids]}
+        if (page + 1) * 50 < self.videos:
+            result["nextPageToken"] = str(page + 1)
+        return result
+
+
+async def uploads(service, **kwargs):
+    failed = []
+    batches = [
+        batch
+        async for batch in service.iter_uploads(None, "u", {}, "UU", failed, **kwargs)
+    ]
+    return [video["id"] for batch in batches for video in batch], failed
+
+
+@pytest.mark.asyncio
+async def test_iter_uploads_pages_through_every_upload():
+    service = PagedUploads(120)
+
+    ids, failed = await uploads(service)
+
+    assert ids == [f"v{i}" for i in range(120)]
+    assert failed == []
+    assert [
+        token for resource, token in service.requests if resource == "playlistItems"
+    ] == [
+        None,
+        "1",
+        "2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_uploads_stops_at_the_limit():
+    service = PagedUploads(500)
+
+    ids, _ = await uploads(service, limit=60)
+
+    assert ids == [f"v{i}" for i in range(60)]
+    # The page after the limit may be prefetched, but nothing further
+    assert len([r for r in service.requests if r[0] == "playlistItems"]) <= 3
+
+
+@pytest.mark.asyncio
+async def test_iter_uploads_records_a_failed_page_and_stops():
+    service = PagedUploads(200, failing_pages={2})
+
+    ids, failed = await uploads(service)
+
+    assert ids == [f"v{i}" for i in range(100)]
+    assert failed == ["videos"]
@@ -0,0 +1,310 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+import app.worker as worker_module
+from app.dependencies import (
+    CurrentUser,
+    get_current_user,
+    get_user_google_tokens,
+)
+from app.schemas.auth import GoogleUserInfo
+from app.services import auth_service as auth_service_module
+from app.services import token_service
+from app.services.auth_service import AuthService, auth_service
+from app.services.token_service import TokenManager
+from app.utils.user_storage import InMemoryUserStorage, user_storage
+from app.worker import Worker
+
+
+def google_user(user_id: str = "user-1") -> GoogleUserInfo:
+    return GoogleUserInfo(id=user_id, email=f"{user_id}@example.com", name=user_id)
+
+
+def bearer(user_id: str) -> HTTPAuthorizationCredentials:
+    token = auth_service.create_access_token({"sub": user_id})
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_keeps_created_at_and_adds_expiry():
+    storage = InMemoryUserStorage()
+    first = await storage.create_or_update_user(
+        google_user(), {"access_token": "a", "expires_in": 3600}
+    )
+    second = await storage.create_or_update_user(
+        google_user(), {"access_token": "b", "refresh_token": "r"}
+    )
+
+    assert second["created_at"] == first["created_at"]
+    assert await storage.get_user_by_email("user-1@example.com") == second
+    tokens = await storage.get_user_tokens("user-1")
+    assert tokens["access_token"] == "b"
+    assert "expires_at" not in tokens
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_merges_token_updates():
+    storage = InMemoryUserStorage()
+    await storage.create_or_update_user(
+        google_user(), {"access_token": "a", "refresh_token": "r"}
+    )
+    await storage.update_user_tokens("user-1", {"access_token": "b", "expires_in": 60})
+
+    tokens = await storage.get_user_tokens("user-1")
+    assert tokens["access_token"] == "b"
+    assert tokens["refresh_token"] == "r"
+    assert tokens["expires_at"] > 0
+    assert await storage.list_user_ids() == ["user-1"]
+    assert await storage.get_user("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_current_user_reads_like_the_user_dict():
+    user = await user_storage.create_or_update_user(
+        google_user("current"), {"access_token": "google-token"}
+    )
+
+    current = await get_current_user(bearer("current"))
+
+    assert isinstance(current, CurrentUser)
+    assert current["id"] == "current"
+    assert dict(current) == {key: user[key] for key in current}
+    with pytest.raises(KeyError):
+        current["access_token"]
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_looked_up_once_when_awaited(monkeypatch):
+    await user_storage.create_or_update_user(
+        google_user("lazy"), {"access_token": "google-token"}
+    )
+    current = await get_current_user(bearer("lazy"))
+    lookups = []
+    get_user_tokens = user_storage.get_user_tokens
+
+    async def counted(user_id):
+        lookups.append(user_id)
+        return await get_user_tokens(user_id)
+
+    monkeypatch.setattr(user_storage, "get_user_tokens", counted)
+
+    tokens = await get_user_google_tokens(current)
+
+    assert tokens["access_token"] == "google-token"
+    assert (await current.get_tokens()) is tokens
+    assert lookups == ["lazy"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_user_and_bad_token_are_rejected():
+    with pytest.raises(HTTPException) as missing:
+        await get_current_user(bearer("nobody"))
+    assert missing.value.status_code == 401
+
+    with pytest.raises(HTTPException) as invalid:
+        await get_current_user(
+            HTTPAuthorizationCredentials(scheme="Bearer", credentials="not-a-jwt")
+        )
+    assert invalid.value.status_code == 401
+
+
+@pytest.fixture
+def decodes(monkeypatch) -> list:
+    """Tokens whose signature actually got checked"""
+    calls = []
+    decode = auth_service_module.jwt.decode
+
+    def counting(token, *args, **kwargs):
+        calls.append(token)
+        return decode(token, *args, **kwargs)
+
+    monkeypatch.setattr(auth_service_module.jwt, "decode", counting)
+    return calls
+
+
+def test_verified_tokens_skip_the_signature_check(decodes):
+    service = AuthService(verified_cache_size=2)
+    first, second, third = (
+        service.create_access_token({"sub": user}) for user in ("a", "b", "c")
+    )
+
+    assert service.verify_token(first)["sub"] == "a"
+    assert service.verify_token(first)["sub"] == "a"
+    assert decodes == [first]
+
+    # The least recently used token is evicted past the bound
+    service.verify_token(second)
+    service.verify_token(first)
+    service.verify_token(third)
+    service.verify_token(second)
+    assert decodes == [first, second, third, second]
+
+
+def test_cached_tokens_are_verified_again_after_exp(decodes, monkeypatch):
+    service = AuthService(verified_cache_size=10)
+    token = service.create_access_token({"sub": "a"}, timedelta(minutes=5))
+    service.verify_token(token)
+    now = auth_service_module.time.time()
+
+    monkeypatch.setattr(auth_service_module.time, "time", lambda: now + 600)
+    service.verify_token(token)
+
+    assert decodes == [token, token]
+
+
+def test_verified_cache_can_be_disabled(decodes):
+    service = AuthService(verified_cache_size=0)
+    token = service.create_access_token({"sub": "a"})
+    service.verify_token(token)
+    service.verify_token(token)
+
+    assert len(decodes) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_google_tokens_need_reauthentication():
+    current = CurrentUser({"id": "no-tokens"})
+
+    with pytest.raises(HTTPException) as error:
+        await get_user_google_tokens(current)
+    assert error.value.status_code == 401
+
+
+class Refresher:
+    """Stands in for Google's token endpoint, counting refreshes"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, refresh_token: str) -> dict:
+        self.calls.append(refresh_token)
+        await self.release.wait()
+        return {"access_token": f"fresh-{len(self.calls)}", "expires_in": 3600}
+
+
+@pytest.fixture
+def refresher(monkeypatch) -> Refresher:
+    refresher = Refresher()
+    monkeypatch.setattr(auth_service, "refresh_access_token", refresher)
+    return refresher
+
+
+@pytest.fixture
+def storage(monkeypatch) -> InMemoryUserStorage:
+    storage = InMemoryUserStorage()
+    monkeypatch.setattr(token_service, "user_storage", storage)
+    return storage
+
+
+async def store(storage, user_id: str, expires_in: int = None, refresh=True):
+    tokens = {"access_token": "stale", "expires_in": expires_in}
+    if refresh:
+        tokens["refresh_token"] = f"refresh-{user_id}"
+    await storage.create_or_update_user(google_user(user_id), tokens)
+
+
+@pytest.mark.asyncio
+async def test_access_token_is_refreshed_only_near_expiry(refresher, storage):
+    manager = TokenManager(refresh_margin=60, proactive_window=600)
+    await store(storage, "fresh", expires_in=3600)
+    await store(storage, "expiring", expires_in=30)
+
+    assert await manager.get_access_token("fresh") == "stale"
+    assert await manager.get_access_token("expiring") == "fresh-1"
+    assert refresher.calls == ["refresh-expiring"]
+
+
+@pytest.mark.asyncio
+async def test_request_tokens_are_reused_and_refreshed_in_place(
+    refresher, storage, monkeypatch
+):
+    await store(storage, "fresh", expires_in=3600)
+    await store(storage, "expiring", expires_in=30)
+
+    async def no_lookup(user_id):
+        raise AssertionError("tokens were already loaded for the request")
+
+    fresh = CurrentUser({"id": "fresh"}, await storage.get_user_tokens("fresh"))
+    expiring = CurrentUser(
+        {"id": "expiring"}, await storage.get_user_tokens("expiring")
+    )
+    monkeypatch.setattr(user_storage, "get_user_tokens", no_lookup)
+
+    assert await fresh.get_access_token() == "stale"
+    assert await expiring.get_access_token() == "fresh-1"
+    assert await expiring.get_access_token() == "fresh-1"
+    assert (await expiring.get_tokens())["access_token"] == "fresh-1"
+    assert refresher.calls == ["refresh-expiring"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_refreshes_share_one_call(refresher, storage):
+    manager = TokenManager(refresh_margin=60, proactive_window=600)
+    await store(storage, "user-1", expires_in=0)
+    refresher.release.clear()
+
+    pending = [asyncio.ensure_future(manager.refresh("user-1")) for _ in range(5)]
+    await asyncio.sleep(0)
+    refresher.release.set()
+    results = await asyncio.gather(*pending)
+
+    assert refresher.calls == ["refresh-user-1"]
+    assert {result["access_token"] for result in results} == {"fresh-1"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_without_refresh_token_needs_reauthentication(storage):
+    manager = TokenManager(refresh_margin=60, proactive_window=600)
+    await store(storage, "user-1", expires_in=0, refresh=False)
+
+    with pytest.raises(HTTPException) as error:
+        await manager.get_access_token("user-1")
+    assert error.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_expiring_only_touches_the_proactive_window(refresher, storage):
+    manager = TokenManager(refresh_margin=60, proactive_window=600)
+    await store(storage, "soon", expires_in=300)
+    await store(storage, "later", expires_in=3600)
+    await store(storage, "no-expiry")
+    await store(storage, "no-refresh-token", expires_in=0, refresh=False)
+
+    assert await manager.refresh_expiring() == 2
+    assert sorted(refresher.calls) == ["refresh-no-expiry", "refresh-soon"]
+    assert (await storage.get_user_tokens("soon"))["refresh_token"] == "refresh-soon"
+
+
+class LockedQueue:
+    """The job queue's named lock, held by whoever took it first"""
+
+    def __init__(self):
+        self.locks = set()
+
+    async def acquire_lock(self, name: str, ttl: int) -> bool:
+        if name in self.locks:
+            return False
+        self.locks.add(name)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_only_the_worker_holding_the_lock_refreshes_tokens(
+    refresher, storage, monkeypatch
+):
+    manager = TokenManager(refresh_margin=60, proactive_window=600)
+    monkeypatch.setattr(worker_module, "token_manager", manager)
+    await store(storage, "soon", expires_in=300)
+    queue = LockedQueue()
+    workers = [Worker(queue, 1, 60, 1, 3, 1, token_check_interval=60) for _ in range(3)]
+
+    refreshed = [await worker.refresh_tokens() for worker in workers]
+
+    assert refreshed == [1, 0, 0]
+    assert refresher.calls == ["refresh-soon"]
@@ -0,0 +1,200 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.services import cache_service as cache_service_module
+from app.services.cache_service import CacheService
+
+
+def make_cache(**kwargs) -> CacheService:
+    options = {"ttl": 60, "stale_ttl": 60, "max_local_entries": 100}
+    options.update(kwargs)
+    return CacheService(None, **options)
+
+
+class Fetcher:
+    """A fetch that counts its calls and can be held until released"""
+
+    def __init__(self, value="value"):
+        self.value = value
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def test_build_key_ignores_param_order():
+    params = {"metrics": "views", "startDate": "2024-01-01", "sort": "-views"}
+    reordered = dict(reversed(list(params.items())))
+    assert CacheService.build_key("u", "reports", params) == CacheService.build_key(
+        "u", "reports", reordered
+    )
+    assert CacheService.build_key("u", "reports", params) != CacheService.build_key(
+        "other", "reports", params
+    )
+
+
+@pytest.mark.asyncio
+async def test_hit_after_first_fetch():
+    cache = make_cache()
+    fetch = Fetcher()
+    assert await cache.get_or_fetch("k", fetch) == "value"
+    assert await cache.get_or_fetch("k", fetch) == "value"
+    assert fetch.calls == 1
+    assert cache.stats["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    cache = make_cache()
+    fetch = Fetcher()
+    fetch.release.clear()
+    callers = [asyncio.ensure_future(cache.get_or_fetch("k", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    assert await asyncio.gather(*callers) == ["value"] * 5
+    assert fetch.calls == 1
+    assert cache.stats["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_fetch():
+    cache = make_cache()
+    fetch = Fetcher()
+    fetch.release.clear()
+    leader = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.get_or_fetch("k", fetch))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await follower == "value"
+    assert leader.cancelled()
+    assert fetch.calls == 1
+    # ... and the result was still cached
+    assert await cache.get("k") == "value"
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_reaches_every_caller_and_is_not_cached():
+    cache = make_cache()
+    fetch = Fetcher(RuntimeError("upstream down"))
+    fetch.release.clear()
+    callers = [asyncio.ensure_future(cache.get_or_fetch("k", fetch)) for _ in range(3)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert fetch.calls == 1
+    assert await cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_stale_value_served_while_refreshing():
+    cache = make_cache(ttl=0)
+    await cache.set("k", "old")
+    fetch = Fetcher("new")
+
+    assert await cache.get_or_fetch("k", fetch) == "old"
+    assert cache.stats["stale_hits"] == 1
+    await asyncio.sleep(0.01)
+    assert fetch.calls == 1
+    assert await cache.get("k", stale=True) == "new"
+
+
+@pytest.mark.asyncio
+async def test_failed_background_refresh_keeps_stale_value():
+    cache = make_cache(ttl=0)
+    await cache.set("k", "old")
+    fetch = Fetcher(RuntimeError("upstream down"))
+
+    assert await cache.get_or_fetch("k", fetch) == "old"
+    await asyncio.sleep(0.01)
+    assert await cache.get("k", stale=True) == "old"
+
+
+@pytest.mark.asyncio
+async def test_expired_past_stale_window_fetches_again():
+    cache = make_cache(ttl=0, stale_ttl=0)
+    await cache.set("k", "old")
+    fetch = Fetcher("new")
+    assert await cache.get_or_fetch("k", fetch) == "new"
+    assert cache.stats["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_local_tier_evicts_least_recently_used():
+    cache = make_cache(max_local_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert await cache.get("c") == 3
+
+
+@pytest.mark.asyncio
+async def test_get_many_returns_only_fresh_values():
+    cache = make_cache()
+    await cache.set_many({"a": 1, "b": 2})
+    await cache.set("stale", 3, ttl=0)
+    assert await cache.get_many(["a", "b", "stale", "missing"]) == {"a": 1, "b": 2}
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_fetches():
+    cache = make_cache(enabled=False)
+    fetch = Fetcher()
+    await cache.get_or_fetch("k", fetch)
+    await cache.get_or_fetch("k", fetch)
+    assert fetch.calls == 2
+    assert await cache.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_hits_are_copies_callers_may_mutate():
+    cache = make_cache()
+    fetch = Fetcher({"rows": [[1, 2]]})
+    (await cache.get_or_fetch("k", fetch))["rows"].append([3, 4])
+    (await cache.get("k"))["rows"].clear()
+    (await cache.get_many(["k"]))["k"]["extra"] = True
+    assert await cache.get("k") == {"rows": [[1, 2]]}
+
+
+@pytest.mark.asyncio
+async def test_stale_local_entry_yields_to_fresher_redis_value(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        cache_service_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server),
+    )
+    here = CacheService("redis://cache", ttl=0, stale_ttl=60, max_local_entries=10)
+    other = CacheService("redis://cache", ttl=60, stale_ttl=60, max_local_entries=10)
+    await here.set("k", "old")
+    # Another instance refreshes the key behind this one's stale local copy
+    await other.set("k", "new")
+    fetch = Fetcher("fetched")
+
+    assert await here.get_or_fetch("k", fetch) == "new"
+    await asyncio.sleep(0.01)
+    assert fetch.calls == 0
+    assert here.stats["redis_hits"] == 1
+    assert await here.get("k") == "new"
+
+
+def test_hit_ratio():
+    cache = make_cache()
+    cache.stats.update(local_hits=3, misses=1)
+    assert cache.hit_ratio() == 0.75
@@ -0,0 +1,139 @@
+import gzip
+import zlib
+
+import brotli
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import (
+    CompressionMiddleware,
+    CompressionResponder,
+    negotiate_encoding,
+)
+
+BODY = b"spytube " * 500
+
+
+async def stream(media_type: str):
+    async def chunks():
+        for _ in range(3):
+            yield BODY
+
+    return StreamingResponse(chunks(), media_type=media_type)
+
+
+async def large(request):
+    return PlainTextResponse(BODY)
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def ndjson(request):
+    return await stream("application/x-ndjson")
+
+
+async def events(request):
+    return await stream("text/event-stream")
+
+
+async def encoded(request):
+    return PlainTextResponse(BODY, headers={"Content-Encoding": "identity"})
+
+
+app = Starlette(
+    routes=[
+        Route("/large", large),
+        Route("/small", small),
+        Route("/ndjson", ndjson),
+        Route("/events", events),
+        Route("/encoded", encoded),
+    ]
+)
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+client = TestClient(app)
+
+
+def get_raw(path: str, accept_encoding: str):
+    """Fetch without the client's transparent decoding"""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("identity", None),
+        ("*", "br"),
+        ("*;q=0.1, br;q=0", "gzip"),
+        ("GZIP;q=bogus, deflate", None),
+    ],
+)
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)]
+)
+def test_large_responses_are_compressed(encoding, decompress):
+    response, raw = get_raw("/large", encoding)
+
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == len(raw) < len(BODY)
+    assert decompress(raw) == BODY
+
+
+def test_small_and_unaccepted_responses_pass_through():
+    for path, accept in [("/small", "br"), ("/large", "identity")]:
+        response, raw = get_raw(path, accept)
+
+        assert "Content-Encoding" not in response.headers
+        assert raw in (b"ok", BODY)
+
+
+def test_streams_are_compressed_chunk_by_chunk():
+    response, raw = get_raw("/ndjson", "gzip")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(raw) == BODY * 3
+
+
+def test_event_streams_and_encoded_responses_are_untouched():
+    response, raw = get_raw("/events", "br")
+    assert "Content-Encoding" not in response.headers
+    assert raw == BODY * 3
+
+    response, raw = get_raw("/encoded", "br")
+    assert response.headers["Content-Encoding"] == "identity"
+    assert raw == BODY
+
+
+@pytest.mark.asyncio
+async def test_each_streamed_chunk_is_flushed():
+    middleware = CompressionMiddleware(None, minimum_size=100)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    responder = CompressionResponder(middleware, "gzip", send)
+    await responder.send({"type": "http.response.start", "status": 200, "headers": []})
+    await responder.send(
+        {"type": "http.response.body", "body": BODY, "more_body": True}
+    )
+
+    decompressor = zlib.decompressobj(31)
+    # The first chunk decodes completely before the stream ends
+    assert decompressor.decompress(sent[-1]["body"]) == BODY
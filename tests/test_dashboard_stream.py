@@ -0,0 +1,166 @@
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+
+from app.api.v1.endpoints.analytics import _encode_events
+from app.dependencies import CurrentUser, get_current_user, get_http_client
+from app.main import app
+from benchmarks import google_stub
+
+STUB_STATE = {
+    "latency_ms": 0,
+    "latency_jitter_ms": 0,
+    "error_rate": 0,
+    "video_count": 3,
+    "history_days": 120,
+    "country_count": 3,
+}
+URL = "/api/v1/analytics/dashboard/stream"
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """Google API calls answered in-process by the benchmark stub
+
+    Paths in broken get a 200 whose body is not JSON.
+    """
+
+    def __init__(self, broken=()):
+        self.stub = httpx.ASGITransport(app=google_stub.app)
+        self.broken = set(broken)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path in self.broken:
+            return httpx.Response(200, content=b"<html>upstream error</html>")
+        return await self.stub.handle_async_request(request)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    for name, value in STUB_STATE.items():
+        monkeypatch.setattr(google_stub.app.state, name, value, raising=False)
+    transport = StubTransport()
+    # A new user per test, so no upstream response is served from the cache
+    user = CurrentUser(
+        {"id": f"stream-{uuid.uuid4().hex}", "name": "Stream", "email": "s@x.com"},
+        {"access_token": "token", "expires_at": time.time() + 3600},
+    )
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_http_client] = lambda: httpx.AsyncClient(
+        transport=transport
+    )
+    yield transport
+    app.dependency_overrides.clear()
+
+
+def ndjson(body: bytes) -> list:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def sse(body: bytes) -> list:
+    events = []
+    for block in body.decode().strip().split("\n\n"):
+        event, data = block.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append(
+            {
+                "event": event[len("event: ") :],
+                "data": json.loads(data[len("data: ") :]),
+            }
+        )
+    return events
+
+
+def test_ndjson_stream_sends_summary_videos_then_done(stub):
+    response = TestClient(app).get(URL)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = ndjson(response.content)
+    assert [event["event"] for event in events] == [
+        "summary",
+        "video",
+        "video",
+        "video",
+        "done",
+    ]
+    assert events[0]["data"]["channelData"]["id"]
+    assert {event["data"]["id"] for event in events[1:4]} == {
+        "vid00000",
+        "vid00001",
+        "vid00002",
+    }
+    assert events[-1]["data"] == {"failedReports": []}
+
+
+@pytest.mark.parametrize("query", ["", "?format=sse"])
+def test_sse_stream_is_negotiated_and_left_uncompressed(stub, query):
+    response = TestClient(app).get(
+        URL + query,
+        headers={"Accept": "text/event-stream", "Accept-Encoding": "gzip, br"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "content-encoding" not in response.headers
+    events = sse(response.content)
+    assert events[0]["event"] == "summary"
+    assert [event["event"] for event in events[1:]] == ["video"] * 3 + ["done"]
+
+
+def test_format_wins_over_accept(stub):
+    response = TestClient(app).get(
+        URL + "?format=ndjson", headers={"Accept": "text/event-stream"}
+    )
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+
+def test_upstream_failure_mid_stream_is_sent_in_band(stub):
+    # videos.list is only called for the uploads, after the summary is out
+    stub.broken.add("/youtube/v3/videos")
+
+    response = TestClient(app).get(URL)
+
+    assert response.status_code == 200
+    events = ndjson(response.content)
+    assert [event["event"] for event in events] == ["summary", "error"]
+    assert events[-1]["data"]["message"] == "Error fetching analytics data"
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_closes_the_event_generator():
+    closed = asyncio.Event()
+    sent = []
+
+    async def events():
+        try:
+            yield "video", {"id": "a"}
+            # An upstream call that never finishes
+            await asyncio.Event().wait()
+        finally:
+            closed.set()
+
+    response = StreamingResponse(
+        _encode_events(("summary", {}), events(), sse=False),
+        media_type="application/x-ndjson",
+    )
+    two_events = asyncio.Event()
+
+    async def send(message):
+        sent.append(message)
+        if len(sent) == 3:
+            two_events.set()
+
+    async def receive():
+        await two_events.wait()
+        return {"type": "http.disconnect"}
+
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=5)
+
+    assert closed.is_set()
+    assert [json.loads(m["body"])["event"] for m in sent[1:]] == ["summary", "video"]
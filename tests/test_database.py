@@ -0,0 +1,219 @@
+"""
+The async session dependency, and DatabaseUserStorage on the async engine.
+
+The storage tests need Postgres (upserts, JSON operators) and are skipped
+unless TEST_DATABASE_URL points at a scratch database; everything they
+write is rolled back.
+"""
+
+import os
+import time
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app import database
+from app.database import Base, async_database_url, get_db
+from app.models.user import User
+from app.schemas.auth import GoogleUserInfo
+from app.utils.user_storage import DatabaseUserStorage
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+needs_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+
+@pytest.mark.asyncio
+async def test_get_db_yields_an_async_session_and_closes_it(monkeypatch):
+    closed = []
+    factory = database.AsyncSessionLocal
+
+    def tracked():
+        session = factory()
+        close = session.close
+
+        async def counting_close():
+            closed.append(session)
+            await close()
+
+        session.close = counting_close
+        return session
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", tracked)
+    dependency = get_db()
+
+    session = await anext(dependency)
+    assert isinstance(session, AsyncSession)
+    assert closed == []
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(dependency)
+    assert closed == [session]
+
+
+class FailingCommit:
+    """A session whose transaction fails to commit; reads see the stored row"""
+
+    def __init__(self):
+        now = datetime.utcnow()
+        self.stored = dict(
+            id="u", email="u@example.com", name="U", created_at=now, updated_at=now
+        )
+        self.stored_tokens = {"access_token": "old", "refresh_token": "r"}
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.committing and exc_type is None:
+            raise ConnectionError("commit failed")
+        return False
+
+    def begin(self):
+        self.committing = True
+        return self
+
+    def row(self) -> User:
+        return User(**self.stored, tokens=dict(self.stored_tokens))
+
+    async def flush(self):
+        pass
+
+    async def get(self, model, user_id):
+        self.committing = False
+        return self.row()
+
+    async def execute(self, statement):
+        row = self.row()
+
+        class Result:
+            def scalar_one_or_none(self):
+                return row
+
+            scalar_one = scalar_one_or_none
+
+        return Result()
+
+
+@pytest.mark.asyncio
+async def test_cache_is_only_updated_after_a_commit():
+    session = FailingCommit()
+    storage = DatabaseUserStorage(session, cache_ttl=60, max_entries=10)
+    assert (await storage.get_user_tokens("u"))["access_token"] == "old"
+
+    with pytest.raises(ConnectionError):
+        await storage.update_user_tokens("u", {"access_token": "new"})
+    assert (await storage.get_user_tokens("u"))["access_token"] == "old"
+
+    session.stored["name"] = "Committed elsewhere"
+    with pytest.raises(ConnectionError):
+        await storage.create_or_update_user(
+            GoogleUserInfo(id="u", email="u@example.com", name="New"),
+            {"access_token": "new"},
+        )
+    # Read back from the database, not from the failed upsert
+    assert "u" not in storage._cache
+    assert (await storage.get_user("u"))["name"] == "Committed elsewhere"
+
+
+def test_async_url_uses_asyncpg():
+    assert async_database_url("postgresql://u:p@db/spytube") == (
+        "postgresql+asyncpg://u:p@db/spytube"
+    )
+    assert async_database_url("sqlite:///x.db") == "sqlite:///x.db"
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine(async_database_url(TEST_DATABASE_URL))
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        # The storage's own commits become savepoints inside this transaction
+        yield async_sessionmaker(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        await transaction.rollback()
+    await engine.dispose()
+
+
+def google_user(user_id: str, name: str = "Name") -> GoogleUserInfo:
+    return GoogleUserInfo(id=user_id, email=f"{user_id}@example.com", name=name)
+
+
+def make_storage(session_factory) -> DatabaseUserStorage:
+    return DatabaseUserStorage(session_factory, cache_ttl=60, max_entries=10)
+
+
+@needs_postgres
+@pytest.mark.asyncio
+async def test_upsert_keeps_created_at(session_factory):
+    storage = make_storage(session_factory)
+
+    first = await storage.create_or_update_user(
+        google_user("db-1"), {"access_token": "a"}
+    )
+    second = await storage.create_or_update_user(
+        google_user("db-1", "Renamed"), {"access_token": "b"}
+    )
+
+    assert second["name"] == "Renamed"
+    assert second["created_at"] == first["created_at"]
+    # A storage without the cached copy reads the same row back
+    fresh = make_storage(session_factory)
+    assert (await fresh.get_user("db-1"))["name"] == "Renamed"
+    assert (await fresh.get_user_by_email("db-1@example.com"))["id"] == "db-1"
+    assert (await fresh.get_user_tokens("db-1"))["access_token"] == "b"
+    assert await fresh.get_user("missing") is None
+
+
+@needs_postgres
+@pytest.mark.asyncio
+async def test_token_updates_merge_into_the_stored_tokens(session_factory):
+    storage = make_storage(session_factory)
+    await storage.create_or_update_user(
+        google_user("db-2"), {"access_token": "old", "refresh_token": "r"}
+    )
+
+    await storage.update_user_tokens("db-2", {"access_token": "new", "expires_in": 60})
+
+    for reader in (storage, make_storage(session_factory)):
+        tokens = await reader.get_user_tokens("db-2")
+        assert tokens["access_token"] == "new"
+        assert tokens["refresh_token"] == "r"
+        assert tokens["expires_at"] == pytest.approx(time.time() + 60, abs=5)
+    assert "db-2" in await storage.list_user_ids()
+
+
+@needs_postgres
+@pytest.mark.asyncio
+async def test_list_expiring_tokens(session_factory):
+    storage = make_storage(session_factory)
+    users = {
+        "soon": {"refresh_token": "r", "expires_in": 60},
+        "later": {"refresh_token": "r", "expires_in": 7200},
+        "no-expiry": {"refresh_token": "r"},
+        "no-refresh": {"expires_in": 60},
+    }
+    for user_id, tokens in users.items():
+        await storage.create_or_update_user(
+            google_user(user_id), {"access_token": "a", **tokens}
+        )
+
+    expiring = await storage.list_expiring_tokens(time.time() + 600)
+
+    assert sorted(expiring.keys() & users.keys()) == ["no-expiry", "soon"]
+    assert expiring["soon"]["refresh_token"] == "r"
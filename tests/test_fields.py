@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from app.schemas.video import Series
+from app.utils.fields import format_fields, parse_fields, parse_names, prune, selects
+
+PAYLOAD = {
+    "channelData": {"views": 10, "subscribers": 2},
+    "detailed_videos": [
+        {"id": "a", "title": "A", "stats": {"views": 1, "likes": 0}},
+        {"id": "b", "title": "B", "stats": {"views": 2, "likes": 1}},
+    ],
+}
+
+
+@pytest.mark.parametrize("spec", [None, "", ",", " . , .."])
+def test_empty_specs_select_everything(spec):
+    assert parse_fields(spec) is None
+    assert prune(PAYLOAD, parse_fields(spec)) == PAYLOAD
+
+
+def test_shorter_paths_win_in_either_order():
+    expected = {"detailed_videos": None, "channelData": {"views": None}}
+
+    assert parse_fields("detailed_videos.id,detailed_videos,channelData.views") == (
+        expected
+    )
+    assert parse_fields("detailed_videos, detailed_videos.id ,channelData.views") == (
+        expected
+    )
+
+
+def test_prune_applies_the_tree_to_each_list_item():
+    tree = parse_fields("detailed_videos.id,detailed_videos.stats.likes,missing")
+
+    assert prune(PAYLOAD, tree) == {
+        "detailed_videos": [
+            {"id": "a", "stats": {"likes": 0}},
+            {"id": "b", "stats": {"likes": 1}},
+        ]
+    }
+
+
+def test_prune_leaves_scalars_under_a_nested_path():
+    assert prune({"views": 3}, parse_fields("views.total")) == {"views": 3}
+
+
+def test_prune_selects_series_columns():
+    series = Series(
+        ("date", "views", "likes"), (np.array(["d"]), np.array([1]), np.array([0]))
+    )
+
+    pruned = prune(
+        {"trendData": series}, parse_fields("trendData.views,trendData.date")
+    )
+
+    assert pruned["trendData"].records() == [{"date": "d", "views": 1}]
+
+
+def test_format_fields_is_canonical():
+    tree = parse_fields("b.y,a,b.x")
+
+    assert format_fields(tree) == "a,b.x,b.y"
+    assert parse_fields(format_fields(tree)) == tree
+    assert format_fields(None) == ""
+
+
+def test_parse_names():
+    assert parse_names(None, ["a"]) is None
+    assert parse_names(" a, ,b", ["a", "b"]) == {"a", "b"}
+    with pytest.raises(ValueError, match="c, d"):
+        parse_names("a,d,c", ["a"])
+
+
+def test_selects():
+    assert selects(None, "anything")
+    assert selects(parse_fields("a.b"), "a")
+    assert not selects(parse_fields("a.b"), "b")
@@ -0,0 +1,120 @@
+import httpx
+import pytest
+
+from app.services import http_client as http_client_module
+from app.services.http_client import HttpClientManager, RetryTransport
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays, recorded instead of slept"""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(http_client_module.asyncio, "sleep", sleep)
+    return delays
+
+
+def client_for(responses, max_retries=3, backoff_factor=0.5):
+    """A client whose upstream answers with responses in turn"""
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        outcome = responses[min(len(requests), len(responses)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    transport = RetryTransport(
+        httpx.MockTransport(handler),
+        max_retries=max_retries,
+        backoff_factor=backoff_factor,
+    )
+    return httpx.AsyncClient(transport=transport), requests
+
+
+@pytest.mark.asyncio
+async def test_retries_5xx_until_success(sleeps):
+    client, requests = client_for(
+        [httpx.Response(503), httpx.Response(500), httpx.Response(200, json={})]
+    )
+    response = await client.get("https://example.com/")
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert len(sleeps) == 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_retries(sleeps):
+    client, requests = client_for([httpx.Response(503)], max_retries=2)
+    response = await client.get("https://example.com/")
+    assert response.status_code == 503
+    assert len(requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_client_errors(sleeps):
+    client, requests = client_for([httpx.Response(403)])
+    response = await client.get("https://example.com/")
+    assert response.status_code == 403
+    assert len(requests) == 1
+    assert sleeps == []
+
+
+@pytest.mark.asyncio
+async def test_does_not_resend_non_idempotent_methods(sleeps):
+    client, requests = client_for([httpx.Response(503)])
+    response = await client.post("https://example.com/token")
+    assert response.status_code == 503
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_connection_failures_are_retried_for_any_method(sleeps):
+    client, requests = client_for(
+        [httpx.ConnectError("refused"), httpx.Response(200, json={})]
+    )
+    response = await client.post("https://example.com/token")
+    assert response.status_code == 200
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_connection_failure_raises_after_max_retries(sleeps):
+    client, requests = client_for([httpx.ConnectError("refused")], max_retries=1)
+    with pytest.raises(httpx.ConnectError):
+        await client.get("https://example.com/")
+    assert len(requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_honours_retry_after(sleeps):
+    client, _ = client_for(
+        [httpx.Response(429, headers={"Retry-After": "3"}), httpx.Response(200)]
+    )
+    await client.get("https://example.com/")
+    assert sleeps == [3.0]
+
+
+def test_backoff_is_jittered_and_capped():
+    transport = RetryTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)),
+        max_retries=10,
+        backoff_factor=0.5,
+        max_backoff=2.0,
+    )
+    for attempt in range(10):
+        assert 0 <= transport._backoff(attempt) <= min(2.0, 0.5 * 2**attempt)
+
+
+@pytest.mark.asyncio
+async def test_manager_shares_one_client():
+    manager = HttpClientManager()
+    await manager.start()
+    client = manager.client
+    assert manager.client is client
+    await manager.close()
+    assert manager._client is None
@@ -0,0 +1,118 @@
+import fakeredis
+import pytest
+from fastapi import HTTPException
+
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import JobQueue
+from app.worker import Worker
+
+
+@pytest.fixture
+def queue(monkeypatch) -> JobQueue:
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        job_queue_module.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server),
+    )
+    return JobQueue("redis://jobs", lease_seconds=60)
+
+
+async def drain(queue: JobQueue) -> list:
+    jobs = []
+    while (job := await queue.dequeue()) is not None:
+        jobs.append(job)
+    return jobs
+
+
+@pytest.mark.asyncio
+async def test_users_are_served_round_robin(queue):
+    for job_type in ("a", "b", "c"):
+        await queue.enqueue(job_type, "busy")
+    await queue.enqueue("a", "quiet")
+
+    jobs = await drain(queue)
+
+    assert [(job["user_id"], job["type"]) for job in jobs] == [
+        ("busy", "a"),
+        ("quiet", "a"),
+        ("busy", "b"),
+        ("busy", "c"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_pending_jobs_are_not_queued_twice(queue):
+    assert await queue.enqueue("dashboard", "u1")
+    assert not await queue.enqueue("dashboard", "u1")
+
+    (job,) = await drain(queue)
+    # Still leased while it runs
+    assert not await queue.enqueue("dashboard", "u1")
+
+    await queue.complete(job)
+    assert await queue.enqueue("dashboard", "u1")
+
+
+@pytest.mark.asyncio
+async def test_retries_wait_until_due(queue, monkeypatch):
+    await queue.enqueue("dashboard", "u1")
+    (job,) = await drain(queue)
+    now = job_queue_module.time.time()
+
+    await queue.retry(job, delay=30)
+    assert await queue.promote_due() == 0
+    assert await queue.size() == {"ready_users": 0, "delayed": 1}
+
+    monkeypatch.setattr(job_queue_module.time, "time", lambda: now + 31)
+    assert await queue.promote_due() == 1
+    (retried,) = await drain(queue)
+    assert retried["attempt"] == 1
+
+
+@pytest.mark.asyncio
+async def test_named_lock_is_taken_once(queue):
+    assert await queue.acquire_lock("schedule", 60)
+    assert not await queue.acquire_lock("schedule", 60)
+    assert await queue.acquire_lock("tokens", 60)
+
+
+def make_worker(queue: JobQueue, handler) -> Worker:
+    worker = Worker(
+        queue, 1, 60, 1, max_retries=2, retry_backoff=5, token_check_interval=60
+    )
+    worker.handlers = {"dashboard": handler}
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried_then_dropped(queue):
+    async def flaky(user_id):
+        raise HTTPException(status_code=503)
+
+    worker = make_worker(queue, flaky)
+    await queue.enqueue("dashboard", "u1")
+    (job,) = await drain(queue)
+
+    await worker.run_job(job)
+    await worker.run_job({**job, "attempt": 2})
+
+    assert worker.stats == {"completed": 0, "retried": 1, "failed": 1}
+    assert await queue.size() == {"ready_users": 0, "delayed": 1}
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_dropped_without_retry(queue):
+    async def revoked(user_id):
+        raise HTTPException(status_code=401, detail="No token found")
+
+    worker = make_worker(queue, revoked)
+    await queue.enqueue("dashboard", "u1")
+    (job,) = await drain(queue)
+
+    await worker.run_job(job)
+
+    assert worker.stats["failed"] == 1
+    assert await queue.size() == {"ready_users": 0, "delayed": 0}
+    # The lease was released, so the next interval can queue it again
+    assert await queue.enqueue("dashboard", "u1")
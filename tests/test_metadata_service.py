@@ -0,0 +1,153 @@
+import httpx
+import pytest
+
+from app.services.analytics_service import AnalyticsService
+from app.services.cache_service import CacheService
+from app.services.metadata_service import CHANNEL_PARTS, MetadataService
+
+PARTS = ("snippet", "statistics")
+
+
+class KeyedApi:
+    """videos.list served by ID, except hidden IDs and failing parts"""
+
+    def __init__(self, hidden=(), failing=False):
+        self.hidden = set(hidden)
+        self.failing = failing
+        self.calls = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        ids = request.url.params["id"].split(",")
+        parts = request.url.params["part"].split(",")
+        self.calls.append((parts, ids))
+        if self.failing:
+            return httpx.Response(403)
+        items = [
+            {"id": video_id, **{part: f"{part}-{video_id}" for part in parts}}
+            for video_id in ids
+            if video_id not in self.hidden
+        ]
+        return httpx.Response(200, json={"items": items})
+
+
+class Fallback:
+    """The user's own listing, recording which IDs reached it"""
+
+    def __init__(self):
+        self.ids = []
+
+    async def __call__(self, ids):
+        self.ids.extend(ids)
+        return {"items": [{"id": video_id, "snippet": "own"} for video_id in ids]}
+
+
+def make_service(cache: CacheService = None) -> MetadataService:
+    return MetadataService(
+        api_key="key", cache=cache or CacheService(None, 60, 60, 1000), enabled=True
+    )
+
+
+async def lookup(service, api, ids, fallback=None):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        return await service.list(
+            client, "u", "videos", ids, PARTS, fallback or Fallback()
+        )
+
+
+@pytest.mark.asyncio
+async def test_ids_are_fetched_in_batches_once_for_every_user():
+    service = make_service()
+    api = KeyedApi()
+    ids = [f"v{i}" for i in range(120)]
+
+    first = await lookup(service, api, ids)
+    second = await lookup(service, api, list(reversed(ids)))
+
+    assert [len(call_ids) for _, call_ids in api.calls] == [50, 50, 20]
+    assert [item["id"] for item in first["items"]] == ids
+    assert second["items"][0] == {
+        "id": "v119",
+        "snippet": "snippet-v119",
+        "statistics": "statistics-v119",
+    }
+
+
+@pytest.mark.asyncio
+async def test_only_stale_parts_are_refetched():
+    service = make_service()
+    api = KeyedApi()
+    await lookup(service, api, ["a", "b"])
+
+    service.part_ttls["statistics"] = 0
+    result = await lookup(service, api, ["a", "b"])
+
+    assert api.calls[-1] == (["statistics"], ["a", "b"])
+    assert result["items"][0]["snippet"] == "snippet-a"
+
+
+@pytest.mark.asyncio
+async def test_ids_the_key_cannot_see_go_to_the_fallback_uncached():
+    service = make_service()
+    api = KeyedApi(hidden={"private"})
+    fallback = Fallback()
+
+    result = await lookup(service, api, ["a", "private"], fallback)
+    await lookup(service, api, ["a", "private"], fallback)
+
+    assert result["items"][1] == {"id": "private", "snippet": "own"}
+    assert fallback.ids == ["private", "private"]
+    assert api.calls[-1] == (list(PARTS), ["private"])
+
+
+@pytest.mark.asyncio
+async def test_failed_keyed_call_keeps_stale_parts():
+    service = make_service()
+    await lookup(service, KeyedApi(), ["a"])
+    service.part_ttls["statistics"] = 0
+    fallback = Fallback()
+
+    result = await lookup(service, KeyedApi(failing=True), ["a", "new"], fallback)
+
+    assert result["items"][0]["statistics"] == "statistics-a"
+    assert fallback.ids == ["new"]
+
+
+class OwnChannel(AnalyticsService):
+    """channels?mine=true answered with owner-only fields"""
+
+    async def fetch_data(self, client, user_id, resource, headers, params):
+        return {
+            "items": [
+                {
+                    "id": "UC1",
+                    "snippet": "own",
+                    "statistics": {"subscriberCount": "10", "hidden": True},
+                    "brandingSettings": {
+                        "channel": {"trackingAnalyticsAccountId": "x"}
+                    },
+                }
+            ]
+        }
+
+
+@pytest.mark.asyncio
+async def test_own_channel_listing_stays_out_of_the_shared_cache():
+    cache = CacheService(None, 60, 60, 1000)
+    metadata = make_service(cache)
+    owner = OwnChannel(cache=cache, metadata=metadata)
+    api = KeyedApi()
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        own = await owner.fetch_channel(client, "owner", {})
+        assert own["items"][0]["statistics"]["hidden"]
+        assert api.calls == []
+
+        # Read by ID (by the owner next time, or anyone else) with the key
+        shared = await metadata.list(
+            client, "other", "channels", ["UC1"], CHANNEL_PARTS, Fallback()
+        )
+        again = await owner.fetch_channel(client, "owner", {})
+
+    assert api.calls == [(list(CHANNEL_PARTS), ["UC1"])]
+    assert shared["items"][0]["statistics"] == "statistics-UC1"
+    assert again == shared
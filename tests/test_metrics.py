@@ -0,0 +1,98 @@
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.metrics import (
+    UNMATCHED_ROUTE,
+    CacheStatsCollector,
+    MetricsMiddleware,
+    observe_upstream,
+    report_type,
+)
+from app.services.cache_service import CacheService
+
+
+async def channel(request):
+    return PlainTextResponse("x" * 10)
+
+
+app = Starlette(routes=[Route("/channel/{channel_id}", channel)])
+app.add_middleware(MetricsMiddleware)
+client = TestClient(app)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.parametrize(
+    "method, path, route, status",
+    [
+        ("GET", "/channel/UC1", "/channel/{channel_id}", "200"),
+        # Right path, wrong method: still the route's template
+        ("POST", "/channel/UC1", "/channel/{channel_id}", "405"),
+        ("GET", "/nothing/here", UNMATCHED_ROUTE, "404"),
+    ],
+)
+def test_routes_are_labelled_by_template(method, path, route, status):
+    labels = {"method": method, "route": route, "status": status}
+    before = sample("spytube_http_requests_total", **labels)
+
+    client.request(method, path)
+
+    assert sample("spytube_http_requests_total", **labels) == before + 1
+
+
+def test_response_size_is_recorded():
+    labels = {"method": "GET", "route": "/channel/{channel_id}"}
+    before = sample("spytube_http_response_bytes_sum", **labels)
+
+    client.get("/channel/UC2")
+
+    assert sample("spytube_http_response_bytes_sum", **labels) == before + 10
+    assert sample("spytube_http_requests_in_progress", **labels) == 0
+
+
+@pytest.mark.asyncio
+async def test_observe_upstream_counts_status_and_failures():
+    labels = {"api": "test", "endpoint": "reports", "report": "day"}
+
+    async def ok():
+        return httpx.Response(200, content=b"abc")
+
+    async def broken():
+        raise httpx.ConnectError("down")
+
+    await observe_upstream("test", "reports", "day", ok())
+    with pytest.raises(httpx.ConnectError):
+        await observe_upstream("test", "reports", "day", broken())
+
+    assert sample("spytube_upstream_requests_total", **labels, status="200") == 1
+    assert sample("spytube_upstream_requests_total", **labels, status="error") == 1
+    assert sample("spytube_upstream_response_bytes_total", **labels) == 3
+    assert sample("spytube_upstream_requests_in_flight", api="test") == 0
+
+
+def test_report_type():
+    assert report_type({"dimensions": "day,country"}) == "day,country"
+    assert report_type({}) == "none"
+
+
+def test_cache_collector_exports_lookups_and_errors():
+    cache = CacheService(None, 60, 60, 10)
+    cache.stats.update(local_hits=3, misses=1, redis_errors=2)
+
+    samples = {
+        (s.name, s.labels.get("result")): s.value
+        for family in CacheStatsCollector(cache).collect()
+        for s in family.samples
+    }
+
+    assert samples[("spytube_cache_lookups_total", "local_hits")] == 3
+    assert samples[("spytube_cache_lookups_total", "misses")] == 1
+    assert samples[("spytube_cache_redis_errors_total", None)] == 2
+    assert ("spytube_cache_lookups_total", "redis_errors") not in samples
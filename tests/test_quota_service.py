@@ -0,0 +1,151 @@
+import fakeredis
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.metrics import QuotaStatsCollector
+from app.services import quota_service
+from app.services.http_client import RetryTransport
+from app.services.quota_service import (
+    BACKGROUND,
+    INTERACTIVE,
+    YOUTUBE_ANALYTICS_API,
+    YOUTUBE_DATA_API,
+    QuotaLimiter,
+)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        quota_service.redis,
+        "from_url",
+        lambda url, **kwargs: fakeredis.aioredis.FakeRedis(server=server),
+    )
+    return server
+
+
+def make_limiter(**kwargs) -> QuotaLimiter:
+    options = {
+        "redis_url": "redis://quota",
+        "daily_limits": {YOUTUBE_DATA_API: 1000, YOUTUBE_ANALYTICS_API: 1000},
+        "burst": 10,
+        "refill_per_second": 0.001,
+        "background_reserve": 0.5,
+        "max_wait": {INTERACTIVE: 0, BACKGROUND: 0},
+    }
+    options.update(kwargs)
+    return QuotaLimiter(**options)
+
+
+@pytest.mark.asyncio
+async def test_bucket_runs_dry_and_rejects_with_retry_after(fake_redis):
+    limiter = make_limiter()
+
+    for _ in range(10):
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports")
+    with pytest.raises(HTTPException) as error:
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports")
+
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) >= 1
+    assert limiter.stats["granted"] == 10
+    assert limiter.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_daily_budget_exhaustion(fake_redis):
+    limiter = make_limiter(
+        daily_limits={YOUTUBE_DATA_API: 150, YOUTUBE_ANALYTICS_API: 1000},
+        burst=1000,
+    )
+
+    await limiter.acquire(YOUTUBE_DATA_API, "search")
+    with pytest.raises(HTTPException) as error:
+        await limiter.acquire(YOUTUBE_DATA_API, "search")
+
+    assert error.value.status_code == 429
+    assert "Daily" in error.value.detail
+    # Cheaper calls still fit in what is left
+    await limiter.acquire(YOUTUBE_DATA_API, "videos")
+
+
+@pytest.mark.asyncio
+async def test_background_calls_leave_the_reserve_to_interactive(fake_redis):
+    limiter = make_limiter()
+
+    for _ in range(5):
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports", BACKGROUND)
+    with pytest.raises(HTTPException):
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports", BACKGROUND)
+    for _ in range(5):
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports", INTERACTIVE)
+
+
+@pytest.mark.asyncio
+async def test_processes_share_one_bucket(fake_redis):
+    first, second = make_limiter(), make_limiter()
+
+    for _ in range(5):
+        await first.acquire(YOUTUBE_ANALYTICS_API, "reports")
+        await second.acquire(YOUTUBE_ANALYTICS_API, "reports")
+
+    with pytest.raises(HTTPException):
+        await first.acquire(YOUTUBE_ANALYTICS_API, "reports")
+    snapshot = await second.snapshot()
+    assert snapshot["apis"][YOUTUBE_ANALYTICS_API]["dailyUsed"] == 10
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_fails_open():
+    limiter = make_limiter(redis_url="redis://127.0.0.1:1")
+
+    await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports")
+
+    assert limiter.stats["redis_errors"] == 1
+    assert limiter.stats["granted"] == 0
+
+
+@pytest.mark.asyncio
+async def test_collector_exports_remaining_tokens_and_daily_units(fake_redis):
+    limiter = make_limiter()
+    for _ in range(3):
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports")
+
+    samples = {
+        (sample.name, sample.labels.get("api")): sample.value
+        for family in QuotaStatsCollector(limiter).collect()
+        for sample in family.samples
+    }
+
+    assert samples[("spytube_quota_daily_used_units", YOUTUBE_ANALYTICS_API)] == 3
+    assert (
+        samples[("spytube_quota_daily_remaining_units", YOUTUBE_ANALYTICS_API)] == 997
+    )
+    assert samples[("spytube_quota_bucket_tokens", YOUTUBE_ANALYTICS_API)] < 7.1
+    assert samples[("spytube_quota_bucket_tokens", YOUTUBE_DATA_API)] == 10
+    assert samples[("spytube_quota_rejections_total", None)] == 0
+
+
+@pytest.mark.asyncio
+async def test_retried_attempts_are_charged(fake_redis):
+    limiter = make_limiter()
+    statuses = iter([503, 503, 200])
+    transport = RetryTransport(
+        httpx.MockTransport(lambda request: httpx.Response(next(statuses))),
+        max_retries=3,
+        backoff_factor=0,
+        on_retry=limiter.charge_retry,
+    )
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        charged = limiter.extensions(YOUTUBE_ANALYTICS_API, "reports", INTERACTIVE)
+        await limiter.acquire(YOUTUBE_ANALYTICS_API, "reports")
+        response = await client.get("https://example.com", extensions=charged)
+        # Calls outside the quota (token refreshes, user info) aren't charged
+        statuses = iter([503, 200])
+        await client.get("https://example.com")
+
+    assert response.status_code == 200
+    assert limiter.stats["units"] == 3
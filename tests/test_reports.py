@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.utils.reports import ReportTable, pack_column, row_decoder
+
+REPORT = {
+    "columnHeaders": [
+        {"name": "day", "dataType": "STRING"},
+        {"name": "views", "dataType": "INTEGER"},
+        {"name": "estimatedRevenue", "dataType": "CURRENCY"},
+        {"name": "likes", "dataType": "INTEGER"},
+    ],
+    "rows": [
+        ["2024-01-01", 1000, 2.5, 10],
+        ["2024-01-02", 0, 0.0, None],
+        ["2024-01-03", 2000, None, 30],
+    ],
+}
+
+
+def test_row_decoder_follows_the_layout():
+    row = ["a", "b", "c"]
+
+    assert row_decoder((("x", 2), ("y", 0)))(row) == {"x": "c", "y": "a"}
+    assert row_decoder((("x", 1),))(row) == {"x": "b"}
+    assert row_decoder(())(row) == {}
+
+
+def test_row_decoder_fills_missing_columns_in_order():
+    decode = row_decoder((("a", None), ("b", 1), ("c", None)))
+
+    decoded = decode(["x", "y"])
+
+    assert decoded == {"a": 0, "b": "y", "c": 0}
+    assert list(decoded) == ["a", "b", "c"]
+    assert row_decoder((("a", None),))(["x"]) == {"a": 0}
+
+
+def test_records_map_output_keys_by_column_name():
+    table = ReportTable.from_report(REPORT)
+
+    records = table.records({"date": "day", "views": "views", "shares": "shares"})
+
+    assert records[0] == {"date": "2024-01-01", "views": 1000, "shares": 0}
+    assert table.first({"v": "views"}) == {"v": 1000}
+    assert ReportTable.from_report({}).first({"v": "views"}) == {}
+
+
+def test_columns_read_nulls_as_zero():
+    table = ReportTable.from_report(REPORT)
+
+    assert table["likes"].tolist() == [10, 0, 30]
+    assert table["estimatedRevenue"].tolist() == [2.5, 0.0, 0.0]
+    assert table.total("views") == 3000
+    assert table.total("comments") == 0
+    assert pack_column([1, 2.5], None).dtype == np.float64
+    assert pack_column(["a", 1], None).dtype == object
+
+
+def test_derived_metrics_skip_zero_views():
+    table = ReportTable.from_report(REPORT)
+
+    assert table.rpm().tolist() == [2.5, 0.0, 0.0]
+    assert table.engagement_rate().tolist() == [1.0, 0.0, 1.5]
+
+
+def test_slices_share_packed_columns():
+    table = ReportTable.from_report(REPORT)
+    views = table["views"]
+
+    tail = table.slice(1)
+
+    assert tail["views"].base is views
+    assert tail.records({"date": "day"}) == [
+        {"date": "2024-01-02"},
+        {"date": "2024-01-03"},
+    ]
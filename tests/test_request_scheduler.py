@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.services.request_scheduler import (
+    RequestScheduler,
+    gather_dict,
+    prefetch,
+    rebatch,
+)
+
+
+class Probe:
+    """Records how many calls run at once, overall and per user"""
+
+    def __init__(self):
+        self.running = {}
+        self.peak = {}
+        self.total_peak = 0
+
+    def call(self, user_id: str):
+        async def run():
+            self.running[user_id] = self.running.get(user_id, 0) + 1
+            self.peak[user_id] = max(self.peak.get(user_id, 0), self.running[user_id])
+            self.total_peak = max(self.total_peak, sum(self.running.values()))
+            await asyncio.sleep(0.001)
+            self.running[user_id] -= 1
+            return user_id
+
+        return run
+
+
+@pytest.mark.asyncio
+async def test_run_respects_global_and_per_user_limits():
+    scheduler = RequestScheduler(max_concurrency=4, per_user_concurrency=2)
+    probe = Probe()
+    results = await asyncio.gather(
+        *(
+            scheduler.run(user_id, probe.call(user_id))
+            for user_id in ["a", "b", "c"]
+            for _ in range(6)
+        )
+    )
+    assert sorted(set(results)) == ["a", "b", "c"]
+    assert max(probe.peak.values()) == 2
+    assert probe.total_peak == 4
+
+
+@pytest.mark.asyncio
+async def test_run_drops_idle_user_slots():
+    scheduler = RequestScheduler(max_concurrency=4, per_user_concurrency=2)
+    await scheduler.run("a", Probe().call("a"))
+    assert scheduler._user_slots == {}
+    assert scheduler._user_refs == {}
+
+
+@pytest.mark.asyncio
+async def test_run_releases_slots_when_call_fails():
+    scheduler = RequestScheduler(max_concurrency=1, per_user_concurrency=1)
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await scheduler.run("a", fail)
+    assert await scheduler.run("a", Probe().call("a")) == "a"
+
+
+@pytest.mark.asyncio
+async def test_gather_dict_splits_results_and_errors():
+    async def ok():
+        return 1
+
+    async def fail():
+        raise ValueError("bad report")
+
+    results, errors = await gather_dict({"ok": ok, ("video", "trend"): fail})
+    assert results == {"ok": 1}
+    assert list(errors) == [("video", "trend")]
+    assert isinstance(errors["video", "trend"], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_gather_dict_runs_calls_concurrently():
+    async def slow():
+        await asyncio.sleep(0.05)
+        return True
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results, _ = await gather_dict({i: slow for i in range(10)})
+    assert len(results) == 10
+    assert loop.time() - started < 0.4
+
+
+@pytest.mark.asyncio
+async def test_gather_dict_propagates_cancellation():
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        await gather_dict({"a": cancelled})
+
+
+async def pages(*items, log=None, fail=False):
+    for item in items:
+        if log is not None:
+            log.append(f"produced {item}")
+        yield item
+    if fail:
+        raise RuntimeError("page failed")
+
+
+@pytest.mark.asyncio
+async def test_prefetch_produces_the_next_item_while_one_is_consumed():
+    log = []
+
+    async for item in prefetch(pages(1, 2, 3, log=log)):
+        await asyncio.sleep(0)
+        log.append(f"consumed {item}")
+
+    assert log.index("produced 2") < log.index("consumed 1")
+    assert [entry for entry in log if entry.startswith("consumed")] == [
+        "consumed 1",
+        "consumed 2",
+        "consumed 3",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_raises_the_source_error_after_earlier_items():
+    seen = []
+
+    with pytest.raises(RuntimeError):
+        async for item in prefetch(pages(1, 2, fail=True)):
+            seen.append(item)
+
+    assert seen == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_stops_the_producer_when_the_consumer_stops():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.set()
+
+    async for _ in prefetch(endless()):
+        break
+
+    await asyncio.wait_for(closed.wait(), 1)
+
+
+@pytest.mark.asyncio
+async def test_rebatch_regroups_pages():
+    batches = [batch async for batch in rebatch(pages([1, 2, 3], [], [4, 5, 6, 7]), 3)]
+
+    assert batches == [[1, 2, 3], [4, 5, 6], [7]]
+    assert [batch async for batch in rebatch(pages(), 3)] == []
@@ -0,0 +1,142 @@
+import json
+from datetime import date
+from email.utils import formatdate
+
+import numpy as np
+import orjson
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import analytics
+from app.core import responses
+from app.core.responses import (
+    FastJSONResponse,
+    dumps,
+    etag,
+    is_not_modified,
+    json_response,
+    not_modified_response,
+)
+from app.dependencies import CurrentUser, get_current_user
+from app.main import app
+from app.schemas.video import Series
+
+PAYLOAD = {
+    "date": date(2024, 1, 2),
+    "views": np.int64(1200),
+    "rpm": np.array([1.5, 2.0]),
+    "trendData": Series(
+        ("date", "views"), (np.array(["2024-01-01"], dtype=object), np.array([7]))
+    ),
+}
+EXPECTED = {
+    "date": "2024-01-02",
+    "views": 1200,
+    "rpm": [1.5, 2.0],
+    "trendData": [{"date": "2024-01-01", "views": 7}],
+}
+
+
+def test_fast_path_renders_numpy_dates_and_packed_series():
+    response = json_response(PAYLOAD, headers={"X-Test": "1"})
+
+    assert isinstance(response, FastJSONResponse)
+    assert orjson.loads(response.body) == EXPECTED
+    assert response.headers["X-Test"] == "1"
+
+
+def test_default_path_encodes_the_same_payload(monkeypatch):
+    monkeypatch.setattr(responses.settings, "FAST_JSON_RESPONSES", False)
+
+    assert json_response({"views": 1, "trendData": PAYLOAD["trendData"]}) == {
+        "views": 1,
+        "trendData": EXPECTED["trendData"],
+    }
+    response = json_response({"views": 1}, status_code=201, headers={"X-Test": "1"})
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 201
+
+
+def test_dumps_matches_either_encoder(monkeypatch):
+    content = {"trendData": PAYLOAD["trendData"], "views": 3}
+
+    fast = dumps(content)
+    monkeypatch.setattr(responses.settings, "FAST_JSON_RESPONSES", False)
+
+    assert orjson.loads(fast) == json.loads(dumps(content))
+
+
+VERSION = {"etag": etag({"views": 1}), "lastModified": 1_700_000_000}
+
+
+def test_etag_ignores_key_order_and_is_weak():
+    assert etag({"a": 1, "b": [1, 2]}) == etag({"b": [1, 2], "a": 1})
+    assert etag({"a": 1}) != etag({"a": 2})
+    assert etag({"a": 1}).startswith('W/"')
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({}, False),
+        ({"if-none-match": VERSION["etag"]}, True),
+        # Weak comparison: a strong tag with the same value matches
+        ({"if-none-match": VERSION["etag"].removeprefix("W/")}, True),
+        ({"if-none-match": f'"other", {VERSION["etag"]}'}, True),
+        ({"if-none-match": '"other"'}, False),
+        ({"if-none-match": " * "}, True),
+        # If-None-Match wins over a matching If-Modified-Since
+        (
+            {
+                "if-none-match": '"other"',
+                "if-modified-since": formatdate(1_800_000_000, usegmt=True),
+            },
+            False,
+        ),
+        ({"if-modified-since": formatdate(1_700_000_000, usegmt=True)}, True),
+        ({"if-modified-since": formatdate(1_600_000_000, usegmt=True)}, False),
+        ({"if-modified-since": "not a date"}, False),
+    ],
+)
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(headers, VERSION) is expected
+
+
+def test_if_modified_since_needs_a_last_modified():
+    headers = {"if-modified-since": formatdate(1_800_000_000, usegmt=True)}
+
+    assert not is_not_modified(headers, {"etag": VERSION["etag"]})
+
+
+def test_not_modified_response_repeats_the_validators():
+    response = not_modified_response(VERSION)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["ETag"] == VERSION["etag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["Last-Modified"] == formatdate(1_700_000_000, usegmt=True)
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser({"id": "u"})
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_dashboard_answers_a_matching_poll_with_304(client, monkeypatch):
+    async def cached_version(user_id, fieldset):
+        return VERSION
+
+    monkeypatch.setattr(
+        analytics.analytics_service, "get_dashboard_version", cached_version
+    )
+
+    response = client.get(
+        "/api/v1/analytics/dashboard", headers={"If-None-Match": VERSION["etag"]}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == VERSION["etag"]
@@ -0,0 +1,192 @@
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import CurrentUser, get_current_user
+from app.main import app
+from app.services.growth_service import GrowthService
+from app.utils.series import (
+    ROWS,
+    DailySeries,
+    bucket_end,
+    bucket_start,
+    grain_for,
+    growth,
+    last_days,
+    previous_period,
+    year_ago,
+)
+
+FIRST = date(2024, 1, 1)
+LAST = date(2024, 4, 30)
+METRICS = ("views", "revenue")
+
+
+def random_rows(seed: int = 7) -> list:
+    """(key, day, views, revenue) rows with gaps, for a channel and two videos"""
+    rng = random.Random(seed)
+    rows = []
+    for offset in range((LAST - FIRST).days + 1):
+        for key in ("", "a", "b"):
+            if rng.random() < 0.8:
+                day = FIRST + timedelta(days=offset)
+                rows.append((key, day, rng.randint(0, 500), rng.random() * 3))
+    return rows
+
+
+def naive_total(rows: list, metric: str, period, key: str = ""):
+    position = 2 + METRICS.index(metric)
+    return sum(
+        row[position]
+        for row in rows
+        if row[0] == key and period[0] <= row[1] <= period[1]
+    )
+
+
+def test_totals_match_a_naive_sum_over_random_windows():
+    rows = random_rows()
+    series = DailySeries.from_rows(rows, METRICS, FIRST, LAST)
+    rng = random.Random(1)
+
+    for _ in range(200):
+        # Windows may start before or end after the loaded span
+        start = FIRST + timedelta(days=rng.randint(-20, 130))
+        period = (start, start + timedelta(days=rng.randint(0, 60)))
+        for key in ("", "a", "b"):
+            assert series.total("views", period, key) == naive_total(
+                rows, "views", period, key
+            )
+            assert series.total("revenue", period, key) == pytest.approx(
+                naive_total(rows, "revenue", period, key)
+            )
+
+
+def test_compare_matches_naive_sums():
+    rows = random_rows()
+    series = DailySeries.from_rows(rows, METRICS, FIRST, LAST)
+    current = last_days(28, LAST)
+
+    for baseline in (previous_period(current), (FIRST, FIRST + timedelta(days=27))):
+        comparison = series.compare(METRICS, current, baseline, key="a")
+        now = naive_total(rows, "views", current, "a")
+        before = naive_total(rows, "views", baseline, "a")
+        assert comparison["views"] == {
+            "current": now,
+            "previous": before,
+            "change": now - before,
+            "growth": pytest.approx((now - before) * 100 / before),
+        }
+
+
+def test_totals_daily_and_rows_for_every_key():
+    rows = [("a", FIRST, 5, 1.0), ("b", FIRST, 7, 2.0), ("a", LAST, 1, 0.5)]
+    series = DailySeries.from_rows(rows, METRICS, FIRST, LAST)
+
+    assert series.totals("views", (FIRST, LAST)).tolist() == [6, 7]
+    assert series.total(ROWS, (FIRST, LAST), "a") == 2
+    assert series.total("views", (FIRST, LAST), "missing") == 0
+    first_days = (FIRST, FIRST + timedelta(days=2))
+    assert series.daily("views", first_days, "a").tolist() == [5, 0, 0]
+    assert "a" in series and "c" not in series
+
+
+def test_empty_series():
+    series = DailySeries.from_rows([], METRICS, FIRST, LAST)
+
+    comparison = series.compare(["views"], (FIRST, LAST), (FIRST, LAST))
+
+    assert series.total("views", (FIRST, LAST)) == 0
+    assert comparison["views"]["growth"] == 0.0
+
+
+def test_comparison_periods():
+    assert previous_period((date(2024, 3, 1), date(2024, 3, 31))) == (
+        date(2024, 1, 30),
+        date(2024, 2, 29),
+    )
+    assert year_ago((date(2024, 2, 29), date(2024, 3, 1))) == (
+        date(2023, 2, 28),
+        date(2023, 3, 1),
+    )
+    with pytest.raises(OverflowError):
+        previous_period((date(1, 1, 2), date(1, 1, 5)))
+    with pytest.raises(ValueError):
+        year_ago((date(1, 1, 1), date(1, 1, 5)))
+
+
+def test_bucket_bounds_and_growth():
+    day = date(2024, 2, 14)
+
+    assert bucket_start(day, "week") == date(2024, 2, 12)
+    assert bucket_end(day, "week") == date(2024, 2, 18)
+    assert bucket_end(day, "month") == date(2024, 2, 29)
+    assert bucket_start(day, "year") == date(2024, 1, 1)
+    assert growth(np.array([150, 5]), np.array([100, 0])).tolist() == [50.0, 0.0]
+
+
+@pytest.mark.parametrize("grain", ["day", "week", "month", "year"])
+def test_buckets_partition_the_calendar(grain):
+    """Consecutive days share a bucket exactly when neither crosses its bounds"""
+    day = date(2023, 12, 1)
+    while day < date(2025, 3, 1):
+        start, end = bucket_start(day, grain), bucket_end(day, grain)
+        assert start <= day <= end
+        assert bucket_start(start, grain) == start and bucket_end(end, grain) == end
+        following = day + timedelta(days=1)
+        assert (bucket_start(following, grain) == start) == (day != end)
+        day = following
+
+
+def test_grain_for_keeps_charts_near_100_points():
+    def span(days):
+        return (FIRST, FIRST + timedelta(days=days - 1))
+
+    assert [grain_for(span(days)) for days in (1, 92, 93, 731, 732, 3660, 3661)] == [
+        "day",
+        "day",
+        "week",
+        "week",
+        "month",
+        "month",
+        "year",
+    ]
+
+
+def test_video_comparisons_sorted_by_first_metric():
+    totals = {
+        "revenue": np.array([[1.0, 2.0], [3.0, 1.0]]),
+        "views": np.array([[10, 0], [20, 10]]),
+    }
+
+    videos = GrowthService._videos(["a", "b"], totals, ["revenue", "views"])
+
+    assert [video["videoId"] for video in videos] == ["b", "a"]
+    assert videos[0]["revenue"] == {"current": 3.0, "previous": 1.0, "growth": 200.0}
+    assert videos[1]["views"] == {"current": 10, "previous": 0, "growth": 0.0}
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser({"id": "u"})
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "start=2000-01-01&end=2024-01-01",
+        "days=3651",
+        "days=30&end=0001-01-05",
+        "start=0001-01-02&end=0001-01-05",
+        "start=0001-01-01&end=0001-01-05&compare=year",
+        "start=2024-02-01&end=2024-01-01",
+    ],
+)
+def test_revenue_rejects_out_of_range_periods(client, query):
+    response = client.get(f"/api/v1/analytics/revenue?{query}")
+
+    assert response.status_code == 422
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models.sync_state import SyncState
+from app.services.sync_service import DAILY_REPORT, SyncService
+
+TODAY = date(2024, 3, 31)
+
+
+def state(synced_from: date, synced_through: date, video_id: str = "") -> SyncState:
+    return SyncState(
+        channel_id="UC",
+        video_id=video_id,
+        report=DAILY_REPORT,
+        synced_from=synced_from,
+        synced_through=synced_through,
+    )
+
+
+@pytest.fixture
+def sync() -> SyncService:
+    return SyncService(
+        channel_history_days=365, video_history_days=90, restatement_days=3
+    )
+
+
+def test_first_sync_fetches_the_whole_history(sync):
+    assert sync.channel_window({}, TODAY) == (TODAY - timedelta(days=365), TODAY)
+    assert sync.video_window({}, "a", TODAY) == (TODAY - timedelta(days=90), TODAY)
+
+
+def test_synced_history_only_refetches_new_and_restated_days(sync):
+    states = {("", DAILY_REPORT): state(date(2023, 1, 1), date(2024, 3, 29))}
+
+    # The last 3 stored days may still be restated
+    assert sync.channel_window(states, TODAY) == (date(2024, 3, 27), TODAY)
+
+
+def test_a_gap_before_the_mark_refetches_everything(sync):
+    # Stored history starts after the window does, so days are missing
+    states = {("a", DAILY_REPORT): state(date(2024, 2, 1), date(2024, 3, 30), "a")}
+
+    assert sync.video_window(states, "a", TODAY) == (
+        TODAY - timedelta(days=90),
+        TODAY,
+    )
+
+
+def test_a_mark_older_than_the_history_refetches_everything(sync):
+    states = {("", DAILY_REPORT): state(date(2020, 1, 1), date(2021, 1, 1))}
+
+    assert sync.channel_window(states, TODAY) == (TODAY - timedelta(days=365), TODAY)
+
+
+def test_restatement_covers_at_least_today():
+    sync = SyncService(365, 90, restatement_days=0)
+    states = {("", DAILY_REPORT): state(date(2023, 1, 1), TODAY)}
+
+    assert sync.channel_window(states, TODAY) == (TODAY, TODAY)
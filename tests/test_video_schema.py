@@ -0,0 +1,107 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.schemas.video import (
+    DETAILED_VIDEO_FIELDS,
+    DetailedVideo,
+    Series,
+    decode_state,
+    encode_state,
+)
+from app.utils.reports import ReportTable
+
+TREND = [
+    {"date": "2024-01-01", "views": 10, "revenue": 0.5},
+    {"date": "2024-01-02", "views": 0, "revenue": 0.0},
+]
+
+
+def make_video(**overrides) -> DetailedVideo:
+    fields = {name: None for name in DETAILED_VIDEO_FIELDS}
+    fields.update(
+        id="a",
+        title="A",
+        tags=["x", "y"],
+        statistics={"viewCount": "10"},
+        trendData=Series.from_records(TREND, ("date", "views", "revenue")),
+        geography=Series.from_records([], ("country", "views")),
+    )
+    fields.update(overrides)
+    return DetailedVideo(**fields)
+
+
+def test_series_round_trips_its_records():
+    series = Series.from_records(TREND, ("date", "views", "revenue"))
+
+    assert series.records() == TREND
+    assert len(series) == 2
+    assert series["views"].dtype.kind == "i"
+    assert series.select({"revenue", "date"}).fields == ("date", "revenue")
+
+
+def test_series_from_a_report_table():
+    table = ReportTable.from_report(
+        {
+            "columnHeaders": [
+                {"name": "day", "dataType": "STRING"},
+                {"name": "views", "dataType": "INTEGER"},
+            ],
+            "rows": [["2024-01-01", 10], ["2024-01-02", None]],
+        }
+    )
+
+    series = Series.from_table(table, {"date": "day", "views": "views"})
+
+    assert series.records() == [
+        {"date": "2024-01-01", "views": 10},
+        {"date": "2024-01-02", "views": 0},
+    ]
+
+
+def test_labels_are_interned_across_series():
+    first = Series.from_records([{"date": "".join(["2024-", "01-01"])}], ("date",))
+    second = Series.from_records([{"date": "".join(["2024-0", "1-01"])}], ("date",))
+
+    assert first["date"][0] is second["date"][0]
+
+
+def test_detailed_video_reads_like_its_dict():
+    video = make_video()
+
+    assert list(video) == list(DETAILED_VIDEO_FIELDS)
+    assert video["title"] == "A" and video.get("missing") is None
+    with pytest.raises(KeyError):
+        video["missing"]
+    assert not hasattr(video, "__dict__")
+    assert video.to_dict()["trendData"] == TREND
+    assert video.to_dict()["geography"] == []
+
+
+def test_detailed_video_needs_every_field():
+    with pytest.raises(KeyError):
+        DetailedVideo(id="a")
+
+
+def test_state_round_trip_keeps_series_packed():
+    video = make_video()
+    payload = {"channel": {"views": 1}, "videos": [video]}
+
+    restored = json.loads(
+        json.dumps(payload, default=encode_state), object_hook=decode_state
+    )
+
+    (copy,) = restored["videos"]
+    assert isinstance(copy, DetailedVideo)
+    assert isinstance(copy.trendData, Series)
+    assert copy.to_dict() == video.to_dict()
+    assert restored["channel"] == {"views": 1}
+    for original, column in zip(video.trendData.columns, copy.trendData.columns):
+        assert column.dtype == original.dtype
+        np.testing.assert_array_equal(column, original)
+
+
+def test_encode_state_rejects_other_objects():
+    with pytest.raises(TypeError):
+        json.dumps({"value": object()}, default=encode_state)
@@ -0,0 +1,160 @@
+"""
+Warehouse SQL against a real Postgres, which the upserts and date_trunc need.
+
+Skipped unless TEST_DATABASE_URL points at a scratch database; each test
+runs in a transaction that is rolled back.
+"""
+
+import os
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base, async_database_url
+from app.models.channel import Channel
+from app.models.user import User
+from app.services.sync_service import SyncService
+from app.services.warehouse_service import warehouse_service
+from app.utils.series import bucket_start
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+CHANNEL_ID = "UCrollups"
+FIRST = date(2023, 11, 20)
+LAST = date(2024, 2, 10)
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine(async_database_url(TEST_DATABASE_URL))
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection)
+        now = datetime.utcnow()
+        for user_id in ("u", "v"):
+            session.add(
+                User(
+                    id=user_id,
+                    email=f"{user_id}@example.com",
+                    name=user_id,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+        await session.flush()
+        session.add(Channel(id=CHANNEL_ID, title="C", updated_at=now))
+        await session.flush()
+        yield session
+        await session.close()
+        await transaction.rollback()
+    await engine.dispose()
+
+
+def daily_rows(first: date, last: date, seed: int) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for offset in range((last - first).days + 1):
+        for video_id in ("", "a"):
+            rows.append(
+                {
+                    "channel_id": CHANNEL_ID,
+                    "video_id": video_id,
+                    "dimension": "",
+                    "dimension_value": "",
+                    "day": first + timedelta(days=offset),
+                    "views": rng.randint(0, 500),
+                }
+            )
+    return rows
+
+
+def naive_buckets(rows: list, grain: str, video_id: str) -> list:
+    totals = defaultdict(int)
+    for row in rows:
+        if row["video_id"] == video_id:
+            totals[bucket_start(row["day"], grain)] += row["views"]
+    return [{"date": str(day), "views": totals[day]} for day in sorted(totals)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("grain", ["week", "month", "year"])
+async def test_rollups_match_summed_days(db, grain):
+    rows = daily_rows(FIRST, LAST, seed=1)
+    await warehouse_service.upsert_daily_rows(db, rows)
+
+    for video_id in ("", "a"):
+        trend = await warehouse_service.trend(
+            db, CHANNEL_ID, grain, FIRST, LAST, ["views"], video_id
+        )
+        assert trend == naive_buckets(rows, grain, video_id)
+
+
+@pytest.mark.asyncio
+async def test_restated_days_refresh_only_their_buckets(db):
+    rows = daily_rows(FIRST, LAST, seed=1)
+    await warehouse_service.upsert_daily_rows(db, rows)
+    # Restate the last days of January, without re-sending the rest
+    restated = daily_rows(date(2024, 1, 29), date(2024, 1, 31), seed=2)
+    await warehouse_service.upsert_daily_rows(db, restated)
+
+    latest = {(row["video_id"], row["day"]): row for row in rows + restated}
+    for grain in ("week", "month", "year"):
+        trend = await warehouse_service.trend(
+            db, CHANNEL_ID, grain, FIRST, LAST, ["views"]
+        )
+        assert trend == naive_buckets(list(latest.values()), grain, "")
+
+
+@pytest.mark.asyncio
+async def test_sync_marks_extend_contiguous_history(db):
+    sync = SyncService(
+        channel_history_days=30, video_history_days=30, restatement_days=2
+    )
+    today = date(2024, 3, 31)
+    await sync.mark_synced(db, CHANNEL_ID, {"": sync.channel_window({}, today)}, {})
+
+    states = await sync.load_states(db, CHANNEL_ID)
+    tomorrow = today + timedelta(days=1)
+    window = sync.channel_window(states, tomorrow)
+    assert window == (today - timedelta(days=1), tomorrow)
+    await sync.mark_synced(db, CHANNEL_ID, {"": window, "a": window}, states)
+
+    # Each sync loads its marks in a fresh session
+    db.expire_all()
+    states = await sync.load_states(db, CHANNEL_ID)
+    channel, video = states["", "daily"], states["a", "daily"]
+    assert (channel.synced_from, channel.synced_through) == (
+        today - timedelta(days=30),
+        tomorrow,
+    )
+    # A video without earlier history only covers the window just fetched
+    assert (video.synced_from, video.synced_through) == window
+
+
+@pytest.mark.asyncio
+async def test_every_manager_of_a_channel_keeps_access(db):
+    channel = {"id": "UCshared", "snippet": {"title": "Shared"}}
+    await warehouse_service.upsert_channel(db, "u", channel)
+    await warehouse_service.upsert_channel(
+        db, "v", {**channel, "snippet": {"title": "Renamed"}}
+    )
+
+    for user_id in ("u", "v"):
+        assert await warehouse_service.user_channel_id(db, user_id) == "UCshared"
+        stored = await warehouse_service.get_channel(db, user_id, "UCshared")
+        assert stored.title == "Renamed"
+    assert await warehouse_service.get_channel(db, "u", CHANNEL_ID) is None
+
+    # A user's most recently synced channel wins
+    await warehouse_service.upsert_channel(db, "u", {"id": "UCother"})
+    assert await warehouse_service.user_channel_id(db, "u") == "UCother"
+    assert await warehouse_service.user_channel_id(db, "v") == "UCshared"
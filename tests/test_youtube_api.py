@@ -0,0 +1,103 @@
+import pytest
+
+from app.services.youtube_service import YouTubeService
+
+BASE = {
+    "ids": "channel==MINE",
+    "startDate": "2024-01-01",
+    "endDate": "2024-01-30",
+}
+
+
+def summary(video_id: str) -> dict:
+    return {**BASE, "metrics": "views,likes", "filters": f"video=={video_id}"}
+
+
+def trend(video_id: str) -> dict:
+    return {**summary(video_id), "dimensions": "day"}
+
+
+def test_summaries_merge_into_one_report_per_chunk():
+    planner = YouTubeService(max_videos_per_report=2)
+    requests = {("summary", v): summary(v) for v in ["a", "b", "c"]}
+
+    plans = planner.plan_reports(requests)
+
+    assert [plan["params"]["filters"] for plan in plans] == ["video==a,b", "video==c"]
+    assert plans[0]["params"]["dimensions"] == "video"
+    assert plans[0]["params"]["sort"] == "-views"
+    assert plans[0]["params"]["maxResults"] == 2
+    assert plans[1]["targets"] == {"c": [("summary", "c")]}
+
+
+def test_breakdowns_and_sorted_reports_run_alone():
+    planner = YouTubeService()
+    requests = {
+        "trend": trend("a"),
+        "top": {**summary("a"), "sort": "-views"},
+        "channel": {**BASE, "metrics": "views"},
+    }
+
+    plans = planner.plan_reports(requests)
+
+    assert sorted(plan["key"] for plan in plans) == ["channel", "top", "trend"]
+    assert all("targets" not in plan for plan in plans)
+
+
+def test_other_filters_and_params_split_batches():
+    planner = YouTubeService()
+    requests = {
+        "us": {**summary("a"), "filters": "video==a;country==US"},
+        "us-b": {**summary("b"), "filters": "video==b;country==US"},
+        "other-range": {**summary("c"), "endDate": "2024-01-31"},
+    }
+
+    plans = planner.plan_reports(requests)
+
+    filters = sorted(plan["params"]["filters"] for plan in plans)
+    assert filters == ["video==a,b;country==US", "video==c"]
+
+
+def test_demultiplex_matches_single_video_reports():
+    planner = YouTubeService()
+    requests = {"a": summary("a"), "b": summary("b"), "missing": summary("z")}
+    (plan,) = planner.plan_reports(requests)
+    report = {
+        "kind": "youtubeAnalytics#resultTable",
+        "columnHeaders": [
+            {"name": "video"},
+            {"name": "views"},
+            {"name": "likes"},
+        ],
+        "rows": [["b", 20, 2], ["a", 10, 1], ["unrequested", 5, 0]],
+    }
+
+    results = planner.demultiplex(plan, report)
+
+    assert results["a"]["columnHeaders"] == [{"name": "views"}, {"name": "likes"}]
+    assert results["a"]["rows"] == [[10, 1]]
+    assert results["b"]["rows"] == [[20, 2]]
+    assert results["missing"]["rows"] == []
+    assert results["a"]["kind"] == report["kind"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_reports_fans_results_and_errors_back_out():
+    planner = YouTubeService()
+    requests = {"a": summary("a"), "b": summary("b"), "trend": trend("a")}
+    fetched = []
+
+    async def fetch(params):
+        fetched.append(params["filters"])
+        if params.get("dimensions") == "day":
+            raise RuntimeError("report failed")
+        return {
+            "columnHeaders": [{"name": "video"}, {"name": "views"}],
+            "rows": [["a", 1], ["b", 2]],
+        }
+
+    results, errors = await planner.fetch_reports(fetch, requests)
+
+    assert sorted(fetched) == ["video==a", "video==a,b"]
+    assert results["b"]["rows"] == [[2]]
+    assert isinstance(errors["trend"], RuntimeError)